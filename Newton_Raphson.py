@@ -5,7 +5,9 @@ This script allows the user to find the real roots of
 Nth degree polynomial
 
 This script requires that `math` be installed within the Python
-environment you are running this script in.
+environment you are running this script in, and the local module
+`polynomial` to evaluate the function and it's derivative in one pass, and
+`seeding` to start Newton's method near a real root.
 
 This file contains the following function:
 
@@ -14,6 +16,7 @@ This file contains the following function:
     * poly_eval - Evaluating a given polynomial and returns it's sign for x= infinity and -infinity
     * no_real_roots - This function allows the user to find the number of real roots
     * newton - Approximate solution of f(x)=0 by Newton's method.
+    * solve - Finds a real root of the polynomial of the given coefficients
     * main - the main function of the script
 
 """
@@ -21,6 +24,9 @@ This file contains the following function:
 
 import math
 
+from polynomial import Polynomial
+from seeding import initial_guess
+
 
 def eval_horner(coef, x):
     """Horner's method for polynomial evaluation
@@ -185,7 +191,7 @@ def no_real_roots(coef, dfun_terms):
     return c2 - c1
 
 
-def newton(f, df, e, n, x0, debug=False):
+def newton(f, df, e, n, x0, debug=False, fdf=None):
     """Approximate solution of f(x)=0 by Newton's method.
 
     Parameters
@@ -206,6 +212,8 @@ def newton(f, df, e, n, x0, debug=False):
             * Function value
             * Gradient value
             * Residual error
+    fdf : function, optional
+        Returns f(x) and df(x) together in one pass, used instead of f and df when given.
 
     Returns
     -------
@@ -220,8 +228,11 @@ def newton(f, df, e, n, x0, debug=False):
 
     xn = x0
     for i in range(0, n):
-        fxn = f(xn)
-        dfxn = df(xn)
+        if fdf is not None:
+            fxn, dfxn = fdf(xn)
+        else:
+            fxn = f(xn)
+            dfxn = df(xn)
         if dfxn == 0:
             print('Zero derivative. No solution found.')
             return None
@@ -244,17 +255,29 @@ def newton(f, df, e, n, x0, debug=False):
     return None
 
 
-def main():
-    """
-    Main function to Check the balance, using the count of the opening and closing braces
+def solve(coef, max_iter, stop_value, debug=True):
+    """Finds a real root of the polynomial of the given coefficients
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient value.
+        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
+    max_iter : integer
+        Maximum number of iterations of Newton's method.
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value.
+    debug : boolean
+        When set to True prints every iteration, see newton
+
+    Returns
+    -------
+    root : number
+        The root found by newton, None when it did not converge. An exception
+        is raised when the polynomial has no real roots.
     """
 
-    poly = input('Please enter the coefficients separated by "," ')
-    coef = poly.split(',')
     deg = len(coef) - 1
-    max_iter = int(input('Please enter the Maximum number of iteration: '))
-    stop_value = float(input('Please enter the stopping criteria value: '))
-    print('\n-------------------------------------------------\n')
 
     # Converting the string values of coefficients to float value
     coef = list(map((lambda x: float(x)), coef))
@@ -262,9 +285,8 @@ def main():
     # Finding the derivative of the given function
     dfun_terms = [coef[i] * (deg - i) for i in range(deg)]
 
-    # Defining the function which returns the evaluated value
-    fun = lambda x, coe=coef: sum((coe[i] * (x ** (deg - i)) for i in range(deg + 1)))
-    dfun = lambda x, coe=coef: sum((coe[i] * (deg - i) * (x ** (deg - i - 1)) for i in range(deg)))
+    # Defining the polynomial, which evaluates the function and it's derivative in one Horner pass
+    poly = Polynomial(coef)
 
     # Checking if real roots exist, It is to be noted that a polynomial of odd degree must have
     # atleast one real root, hence we need to check for existence of real roots only for even number degree
@@ -273,9 +295,23 @@ def main():
         if no_real == 0:
             raise Exception("The polynomial has no real roots")
 
-    # Finding the root with initial value of 2
-    x0 = 2
-    root = newton(fun, dfun, stop_value, max_iter, x0, True)
+    # Finding the root from the seed of the sign scan inside the root bounds
+    x0 = initial_guess(coef)
+    return newton(poly, poly.derivative, stop_value, max_iter, x0, debug, poly.value_and_derivative)
+
+
+def main():
+    """
+    Main function to Check the balance, using the count of the opening and closing braces
+    """
+
+    poly = input('Please enter the coefficients separated by "," ')
+    coef = poly.split(',')
+    max_iter = int(input('Please enter the Maximum number of iteration: '))
+    stop_value = float(input('Please enter the stopping criteria value: '))
+    print('\n-------------------------------------------------\n')
+
+    root = solve(coef, max_iter, stop_value)
     print(f'The root of the equation is : {root}')
 
 
@@ -4,16 +4,23 @@
 This script allows the user to find the real roots of
 Nth degree polynomial
 
-This script requires that `math` be installed within the Python
+This script requires that `math` and `numpy` be installed within the Python
 environment you are running this script in.
 
 This file contains a class of name Newton with the following methods:
 
     * eval_horner - This function allows the user to evaluate a given polynomial in O(n) time
+    * evaluate - Evaluates the polynomial (and it's derivative) for an array of x values at once
     * poly_div - This function allows the user to perform synthetic division on polynomials
     * poly_eval - Evaluating a given polynomial for x= infinity and -infinity and returns it's sign
     * no_real_roots - This function allows the user to find the number of real roots
-    * newton - Approximate solution of f(x)=0 by Newton's method.
+    * count_roots - Counts the distinct real roots inside an interval
+    * newton - Approximate solution of f(x)=0 by Newton's, Halley's or Laguerre's method.
+    * data - The recorded iterations as a list of dictionaries
+    * solve_batch - Solves many problems in lockstep with the vectorized Newton's method
+    * cache_key - Hash of the inputs which decide the root, used by the result cache
+    * solve_all - Finds every real root with the Sturm isolation, companion matrix or deflation engine
+    * deflate_roots - Finds every real root by Newton's method and deflation
     * main - the main function of the script
 
 """
@@ -23,18 +30,71 @@ import logging
 import argparse
 import json
 import logging.config
+import os
+import sys
 import yaml
 
+# The shared polynomial helpers live in the root of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from polynomial import Polynomial, eval_horner_vector
+import adaptive_precision
+import newton_batch
+import iteration_methods
+from iteration_methods import METHODS
+from newton_trace import FIELDS, IterationTrace
+from result_cache import cache_key
+from solver_metrics import METRICS
+import root_engines
+from seeding import initial_guess, initial_guess_sparse
+from sparse_polynomial import SparsePolynomial
+import sturm
+
 
 class Newton:
 
-    def __init__(self, max_iter: int, stop_value: float, coef: list):
-        self.coef = coef
+    def __init__(self, max_iter: int, stop_value: float, coef: list = None, trace: str = 'full', trace_size: int = 100,
+                 trace_sink=None, exact: bool = False, method: str = 'newton', x0: float = None, terms: list = None,
+                 cache=None, adaptive: str = None):
+        if (coef is None) == (terms is None):
+            raise Exception("Either the coefficients or the terms of the polynomial must be given")
+        # A polynomial given by it's (exponent, coefficient) terms is solved in time
+        # proportional to the number of terms (see sparse_polynomial.py)
+        self.sparse = terms is not None
+        self.poly = SparsePolynomial(terms) if self.sparse else Polynomial(coef)
         self.stop_value = stop_value
         self.max_iter = max_iter
-        self.deg = len(coef) - 1
-        self.dfun_terms = [coef[i] * ((len(coef) - 1) - i) for i in range((len(coef) - 1))]
-        self.data = []
+        self.deg = self.poly.deg
+        # The trace level is one of 'off', 'summary', 'ring' (last trace_size iterations)
+        # and 'full' (every iteration, streamed to trace_sink when one is given)
+        self.trace = IterationTrace(trace, trace_size, trace_sink)
+        # When set the Sturm sequence is built over the integers, which keeps
+        # the root counts right for high degree polynomials
+        self.exact = exact
+        if method not in METHODS:
+            raise Exception(f"The method must be one of {list(METHODS)}")
+        # The iteration used by _newton and the number of iterations of the last solve
+        self.method = method
+        self.iterations = 0
+        # Initial guess, None picks one near a real root from the root bounds (see seeding.py)
+        self.x0 = x0
+        # A result_cache.ResultCache, solve looks the root up there before solving
+        self.cache = cache
+        # None iterates in float64 only, 'decimal' or 'fraction' escalate to that arithmetic when
+        # float64 runs into trouble (see adaptive_precision.py), escalation describes the last one
+        if adaptive is not None and adaptive not in adaptive_precision.ARITHMETICS:
+            raise Exception(f"The adaptive arithmetic must be one of {adaptive_precision.ARITHMETICS}")
+        self.adaptive = adaptive
+        self.escalation = None
+
+    @property
+    def coef(self):
+        """The dense list of coefficients, expanded from the terms on first use for a sparse polynomial"""
+        return self.poly.coef
+
+    @property
+    def dfun_terms(self):
+        """The dense list of coefficients of the derivative"""
+        return self.poly.dfun_terms
 
     @staticmethod
     def _eval_horner(coefficients, x):
@@ -57,11 +117,31 @@ class Newton:
             Implements horner's method to evaluate the given polynomial
         """
 
+        if METRICS.enabled:
+            METRICS.count('eval_horner_calls')
         _result = coefficients[0]
         for i in range(1, len(coefficients)):
             _result = (_result * x) + coefficients[i]
         return _result
 
+    def evaluate(self, x, derivative=False):
+        """Evaluates the polynomial for many x values in one vectorized pass
+
+        Parameters
+        ----------
+        x : list, numpy.ndarray, buffer
+            The values for which the function needs to be evaluated f(x).
+
+        derivative : boolean
+            When set to True the derivative f'(x) is returned as well
+
+        Returns
+        -------
+        result : numpy.ndarray or tuple of numpy.ndarray
+            f(x) for every x value, or (f(x), f'(x)) when derivative is True
+        """
+        return eval_horner_vector(self.coef, x, derivative)
+
     @staticmethod
     def _poly_div(dividend, divisor):
         """Polynomial synthetic division
@@ -85,6 +165,8 @@ class Newton:
 
         """
 
+        if METRICS.enabled:
+            METRICS.count('poly_div_calls')
         _out = list(dividend)
         _normalizer = divisor[0]
         for i in range(len(dividend) - (len(divisor) - 1)):
@@ -161,16 +243,14 @@ class Newton:
         """
 
         # Sturm list stores the sequence of sturm terms
-        _sturm = [self.coef, self.dfun_terms]
-
         # The first two terms of strum's sequence are the function itself and it's derivative
         # The 3rd term is found out by dividing the first term with the second term
         # And multiplied by -1 and so on for the remaining terms until the polynomial has only one term
-        while len(_sturm[-1]) != 1:
-            _remainder = self._poly_div(_sturm[-2], _sturm[-1])[-1]
-            for i in range(len(_remainder)):
-                _remainder[i] = -1 * _remainder[i]
-            _sturm.append(_remainder)
+        # The sequence is built once per polynomial and then reused from the cache
+        _sturm = sturm.cached_sturm_sequence(self.coef, self.exact)
+        if self.exact:
+            # The int terms can be too large for the float evaluation at infinity
+            return sturm.count_roots(_sturm)
 
         # Eva evaluates all the sturm terms with x= infinity and -infinity and generates a list of sign changes
         # in the strum's sequence
@@ -190,6 +270,21 @@ class Newton:
 
         return _c2 - _c1
 
+    def count_roots(self, a=-math.inf, b=math.inf):
+        """Counts the distinct real roots inside the interval (a, b]
+
+        Parameters
+        ----------
+        a, b : int, float
+            The ends of the interval, by default the whole real line
+
+        Returns
+        -------
+        count : int
+            The number of distinct real roots, using the cached Sturm sequence
+        """
+        return sturm.count_roots(sturm.cached_sturm_sequence(self.coef, self.exact), a, b)
+
     def _newton(self):
         """Approximate solution of f(x)=0 by Newton's method.
 
@@ -202,20 +297,38 @@ class Newton:
             Continue until abs(x(n+1)-x(n)) < epsilon and return xn.
             If df(xn) == 0, return None. If the number of iterations
             exceeds max_iter, then return None.
+            With method set to 'halley' or 'laguerre' the step uses the
+            second derivative as well (see iteration_methods.py).
+            The iteration starts from x0, or from the seed of the sign
+            scan inside the root bounds when x0 is None. In adaptive mode
+            the iteration is repeated at a higher precision when float64
+            runs into trouble.
         """
 
-        xn = 2
+        # Looking up the recorder once, so nothing is done per iteration when tracing is off
+        _record = self.trace.record if self.trace.level != 'off' else None
+        _step = METHODS[self.method]
+        if self.x0 is not None:
+            xn = self.x0
+        elif self.sparse:
+            xn = initial_guess_sparse(self.poly)
+        else:
+            xn = initial_guess(self.coef)
+        if self.adaptive is not None:
+            _root, self.iterations, self.escalation = adaptive_precision.solve(
+                self.poly, xn, self.stop_value, self.max_iter, self.method, self.adaptive, record=_record)
+            if _root is None:
+                print(f"No solution found, {self.escalation['reason']} at every precision")
+            return _root
         for i in range(0, self.max_iter):
-            fxn = self._eval_horner(self.coef, xn)
-            dfxn = self._eval_horner(self.dfun_terms, xn)
-            if dfxn == 0:
+            self.iterations = i + 1
+            fxn, dfxn, _nxn = _step(self.poly, xn)
+            if _nxn is None:
                 print('Zero derivative. No solution found.')
                 return None
-            _nxn = xn - (fxn / dfxn)
             error = abs(xn - _nxn)
-            info_ = {"Value of Xn": round(xn, 5), "Value of Function(Xn)": round(fxn, 5),\
-                     "Value of Derivative-Function(Xn)": round(dfxn, 5), "The residual error": round(error, 5)}
-            self.data.append(info_)
+            if _record is not None:
+                _record(xn, fxn, dfxn, error)
 
             if error < self.stop_value:
                 return _nxn
@@ -225,27 +338,169 @@ class Newton:
         print('Exceeded maximum iterations')
         return None
 
+    def cache_key(self):
+        """Hash of the polynomial, the stopping criteria and the options which decide the root"""
+        _polynomial = {'terms': self.poly.terms} if self.sparse else {'coef': self.coef}
+        return cache_key(dict(_polynomial, stop_value=self.stop_value, max_iter=self.max_iter),
+                         method=self.method, x0=self.x0, exact=self.exact or None, adaptive=self.adaptive)
+
     def solve(self):
         """
         Solves the Given polynomial and prints out it's roots
+
+        With a cache the result of an earlier solve of the same inputs is
+        reused, including the "no real roots" outcome, and no iteration is
+        recorded in the trace.
         """
+        with METRICS.timer('solve'):
+            _key = self.cache_key() if self.cache is not None else None
+            _result = self.cache.get(_key) if _key is not None else None
+            if _result is not None:
+                METRICS.count('cache_hits')
+            else:
+                _result = self._solve()
+                if _key is not None:
+                    self.cache.put(_key, _result)
+        METRICS.count('solves')
+        if 'error' in _result:
+            METRICS.count('no_real_roots')
+            raise Exception(_result['error'])
+
+        root = _result['root']
+        self.iterations = _result['iterations']
+        if root is None:
+            raise Exception("No root found, Newton's method did not converge")
+        print(f'The root of the equation is : {round(root, 5)}')
+        return root
+
+    def _solve(self):
+        """Solves the Given polynomial, the result is a dictionary of the root and the iterations, or of the error"""
         if self.deg % 2 == 0:
-            _no_real = self._no_real_roots()
-            if _no_real == 0:
-                raise Exception("The polynomial has no real roots")
+            # The terms of a sparse polynomial decide first, it's Sturm sequence is dense (see has_real_root)
+            _real = self.poly.has_real_root(self.exact) if self.sparse else self._no_real_roots() > 0
+            if not _real:
+                return {'error': "The polynomial has no real roots"}
 
         root = self._newton()
-        print(f'The root of the equation is : {round(root, 5)}')
+        METRICS.count('iterations', self.iterations)
+        if root is None:
+            METRICS.count('convergence_failures')
+        return {'root': root, 'iterations': self.iterations}
+
+    def solve_all(self, engine='sturm'):
+        """
+        Finds every real root of the given polynomial and prints them out
+
+        With the 'sturm' engine the roots are isolated with the Sturm sequence
+        and polished with a safeguarded Newton's method, with the 'eigen'
+        engine they are the real eigenvalues of the companion matrix, polished
+        and merged down to the Sturm count. The 'auto' engine picks one of
+        them from the degree (see root_engines.py), and the 'deflation'
+        engine is deflate_roots.
+
+        Parameters
+        ----------
+        engine : str
+            One of 'auto', 'sturm', 'eigen' and 'deflation'
+
+        Returns
+        -------
+        roots : list
+            Sorted list of the distinct real roots
+        """
+        with METRICS.timer('solve_all'):
+            if engine == 'deflation':
+                roots = self.deflate_roots()
+            else:
+                roots = root_engines.real_roots(self.coef, self.stop_value, self.max_iter, engine, exact=self.exact)
+        if not roots:
+            raise Exception("The polynomial has no real roots")
+        print(f'The roots of the equation are : {[round(root, 5) for root in roots]}')
+        return roots
+
+    def deflate_roots(self):
+        """Finds every real root by Newton's method and deflation
+
+        After each root the polynomial is divided by (x - root) with the
+        synthetic division of _poly_div, and the next root is searched for on
+        the quotient, so the work is about O(n^2) for all the roots. The
+        deflated polynomials carry the rounding errors of the roots found
+        before, so every root is polished at the end with Newton's method on
+        the original polynomial. The search stops once as many distinct real
+        roots were found as the Sturm sequence counts.
+
+        Returns
+        -------
+        roots : list
+            Sorted list of the distinct real roots
+        """
+        _record = self.trace.record if self.trace.level != 'off' else None
+        _n_real = self.count_roots()
+        _poly = [float(c) for c in self.coef]
+        _found = []
+        while len(_poly) > 1 and len(_distinct(_found, self.count_roots, self.stop_value)) < _n_real:
+            # The rounding errors of the deflation can keep the steps above stop_value for good, but with a
+            # quadratic convergence a step below it's square root already leaves an error about stop_value
+            _root, _used = iteration_methods.solve(Polynomial(_poly), initial_guess(_poly),
+                                                   math.sqrt(self.stop_value), self.max_iter, self.method, _record)
+            METRICS.count('iterations', _used)
+            if _root is None:
+                METRICS.count('convergence_failures')
+                print('Deflation stopped, no further root found')
+                break
+            _found.append(_root)
+            _poly, _ = self._poly_div(_poly, [1, -_root])
+
+        _roots = []
+        for _root in _found:
+            _polished, _used = iteration_methods.solve(self.poly, _root, self.stop_value, self.max_iter, self.method)
+            METRICS.count('iterations', _used)
+            _roots.append(_root if _polished is None else _polished)
+        return _distinct(_roots, self.count_roots, self.stop_value)
+
+    @property
+    def data(self):
+        """The kept iterations of the trace, as a list of dictionaries of rounded values"""
+        return [{key: round(value, 5) for key, value in zip(FIELDS, values)} for _, values in self.trace.records()]
+
+    @staticmethod
+    def solve_batch(problems):
+        """Solves many problems at once with the vectorized Newton's method
+
+        Parameters
+        ----------
+        problems : list
+            List of dictionaries in the format of data.json
+
+        Returns
+        -------
+        roots : list
+            The root found for each problem, None where no root was found
+        """
+        _roots, _, _converged = newton_batch.solve_batch(problems)
+        return [float(root) if ok else None for root, ok in zip(_roots, _converged)]
 
     def __str__(self):
-        _data = ""
-        for i in range(len(self.data)):
-            _data += f"\nIteration: {i}\n"
-            for keys, values in self.data[i].items():
-                _data += f"{keys}: {values}\n"
-            _data += "----------------------------------------"
+        return str(self.trace)
 
-        return _data
+
+def _distinct(roots, count_roots, tolerance):
+    """Sorts the roots and merges the copies of a multiple root
+
+    A multiple root is found once per multiplicity, and only to about the
+    square root of the precision of a simple one. Two neighbours closer than
+    that are only merged when the Sturm sequence counts a single root around
+    both of them, so close simple roots are kept apart. The count is taken
+    over the interval widened by the same radius on both sides, where the
+    Sturm sequence is not evaluated right at the cluster.
+    """
+    _radius = math.sqrt(tolerance)
+    _roots = []
+    for _root in sorted(roots):
+        if (not _roots or _root - _roots[-1] > _radius
+                or count_roots(_roots[-1] - _radius, _root + _radius) > 1):
+            _roots.append(_root)
+    return _roots
 
 
 def get_data(file):
@@ -289,6 +544,8 @@ def main():
     try:
         newton.solve()
         logger.info("Successfully Solved")
+        if METRICS.enabled:
+            logger.info(f"Metrics: {json.dumps(METRICS.summary())}")
     except Exception:
         logger.error("Error Occurred", exc_info=True)
         return
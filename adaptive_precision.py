@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+""" Adaptive precision for ill-conditioned roots
+
+This script allows the user to run Newton's (or Halley's, or Laguerre's)
+method in float64 and to pay for multiprecision only when float64 runs into
+trouble. The trouble is one of:
+
+    * zero derivative - the step is undefined at an iterate
+    * stagnation - the steps stop shrinking at the level of the rounding
+      error, neither the steps nor abs(f(x)) shrink for STAGNATION
+      iterations in a row, or the maximum number of iterations is exceeded
+    * clustered roots - the iteration converged, but the rounding error of
+      float64 around the root (machine epsilon times the sum of the absolute
+      values of the terms, over abs(f'(root))) is larger than the stopping
+      criteria, which happens for multiple and clustered roots
+
+Only then the iteration is repeated from the last float64 iterate with
+`Decimal` numbers, or with `Fraction` numbers whose denominators are
+limited after every step, at each precision of PRECISIONS in turn until
+the trouble is gone. The escalations iterate Newton's method on f/f'
+(see multiple_root_step) whatever the method, it's roots are the roots of
+f but all simple, so it converges quadratically on the multiple roots
+where the other methods only converge linearly.
+
+This script requires that `decimal` and `fractions` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * multiple_root_step - One iteration of Newton's method on f/f'
+    * trouble - Runs one iteration and tells whether it ran into trouble
+    * solve - Finds a root in float64, escalating the precision only when needed
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import math
+import sys
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+from iteration_methods import METHODS
+from polynomial import Polynomial
+from seeding import initial_guess
+from sparse_polynomial import SparsePolynomial
+
+# Number of significant digits of the escalated arithmetic, tried in turn
+PRECISIONS = (40, 80, 160)
+# Number of iterations in a row without a shrinking step or abs(f(x)) which count as stagnation
+STAGNATION = 5
+# A step this many times the rounding error of the root or less is rounding noise
+NOISE = 100
+ARITHMETICS = ('decimal', 'fraction')
+
+
+def _convert(poly, number):
+    """The polynomial with every coefficient converted exactly by number (Decimal or Fraction)"""
+    if isinstance(poly, SparsePolynomial):
+        return SparsePolynomial([(e, number(c)) for e, c in poly.terms])
+    return Polynomial([number(c) for c in poly.coef])
+
+
+def _magnitude(poly, x):
+    """The sum of the absolute values of the terms at x, the scale of the rounding error of f(x)"""
+    _x = abs(x)
+    if isinstance(poly, SparsePolynomial):
+        return sum(abs(c) * _x ** e for e, c in poly.terms)
+    result = 0 * _x
+    for c in poly.coef:
+        result = result * _x + abs(c)
+    return result
+
+
+def multiple_root_step(poly, xn):
+    """One iteration of Newton's method on f/f', see iteration_methods.newton_step
+
+    x = xn - ff' / (f'^2 - ff''), a root of multiplicity m of f is a simple root of f/f'
+    """
+
+    fxn, dfxn, d2fxn = poly.value_and_derivative(xn, second=True)
+    _denominator = dfxn * dfxn - fxn * d2fxn
+    if _denominator == 0:
+        return fxn, dfxn, None
+    return fxn, dfxn, xn - fxn * dfxn / _denominator
+
+
+STEPS = dict(METHODS, multiple=multiple_root_step)
+
+
+def trouble(poly, x0, stop_value, max_iter, method='newton', epsilon=sys.float_info.epsilon, record=None,
+            rounding=None, patience=STAGNATION):
+    """Runs one iteration and tells whether it ran into trouble
+
+    Parameters
+    ----------
+    poly : polynomial.Polynomial, sparse_polynomial.SparsePolynomial
+        The polynomial whose root is searched for, it's coefficients set the number type
+    x0 : float, Decimal, Fraction
+        Initial guess
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations
+    method : str
+        One of 'newton', 'halley', 'laguerre' and 'multiple' (multiple_root_step)
+    epsilon : float
+        The relative rounding error of the arithmetic
+    record : function, optional
+        Called with (xn, fxn, dfxn, error) on every iteration
+    rounding : function, optional
+        Applied to every iterate, it keeps the denominators of Fraction iterates bounded
+    patience : int
+        Number of iterations in a row where neither the step nor abs(f(x))
+        shrink which count as stagnation, None to let the iteration run
+
+    Returns
+    -------
+    xn, iterations, reason, errors : tuple
+        The last iterate, the number of iterations, the trouble ('zero
+        derivative', 'stagnation' or 'clustered roots', None when there was
+        none) and the list of the absolute values of the steps
+    """
+
+    step = STEPS[method]
+    xn = x0
+    errors = []
+    stagnant = 0
+    _previous = None
+    for i in range(max_iter):
+        fxn, dfxn, _nxn = step(poly, xn)
+        if fxn == 0 and epsilon < sys.float_info.epsilon:
+            # An exact zero of the escalated arithmetic, which may be a multiple root with a zero derivative
+            return xn, i + 1, None, errors
+        if _nxn is None:
+            return xn, i + 1, 'zero derivative', errors
+        if rounding is not None:
+            _nxn = rounding(_nxn)
+        error = abs(xn - _nxn)
+        if record is not None:
+            record(xn, fxn, dfxn, error)
+        errors.append(error)
+        if error < stop_value:
+            # Converged, but the root is only known to the rounding error over the slope (taken at the last iterate)
+            _slope = abs(dfxn)
+            if _slope == 0 or epsilon * float(_magnitude(poly, xn) / _slope) > stop_value:
+                return _nxn, i + 1, 'clustered roots', errors
+            return _nxn, i + 1, None, errors
+        if len(errors) > 1 and error >= errors[-2]:
+            # A step which stopped shrinking inside the rounding error of f(x) over the slope can not get smaller
+            if dfxn != 0 and error < NOISE * epsilon * float(_magnitude(poly, xn) / abs(dfxn)):
+                return _nxn, i + 1, 'stagnation', errors
+            # An iteration moving away from a flat point has growing steps, but a shrinking abs(f(x))
+            stagnant = stagnant + 1 if abs(fxn) >= _previous else 0
+        else:
+            stagnant = 0
+        _previous = abs(fxn)
+        if patience is not None and stagnant >= patience:
+            return _nxn, i + 1, 'stagnation', errors
+        xn = _nxn
+    return xn, max_iter, 'stagnation', errors
+
+
+def solve(poly, x0, stop_value, max_iter, method='newton', arithmetic='decimal', precisions=PRECISIONS,
+          record=None):
+    """Finds a root in float64, escalating the precision only when needed
+
+    Parameters
+    ----------
+    poly : polynomial.Polynomial, sparse_polynomial.SparsePolynomial
+        The polynomial whose root is searched for
+    x0 : float
+        Initial guess
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations per precision
+    method : str
+        One of 'newton', 'halley' and 'laguerre'
+    arithmetic : str
+        'decimal' or 'fraction', the arithmetic of the escalations
+    precisions : tuple
+        The numbers of significant digits of the escalations, in increasing order
+    record : function, optional
+        Called with (xn, fxn, dfxn, error) on every iteration, of every precision
+
+    Returns
+    -------
+    root, iterations, escalation : tuple
+        The root as a float (None if every precision ran into trouble), the
+        number of iterations over every precision, and None when float64 was
+        enough, otherwise a dictionary with the trouble of float64 ('reason'),
+        the arithmetic and number of digits the root was found with and the
+        root at that precision as a string ('value')
+    """
+
+    if arithmetic not in ARITHMETICS:
+        raise Exception(f"The arithmetic must be one of {ARITHMETICS}")
+    xn, iterations, reason, _ = trouble(poly, x0, stop_value, max_iter, method, record=record)
+    if reason is None:
+        return xn, iterations, None
+
+    escalation = {'reason': reason, 'arithmetic': arithmetic, 'digits': None, 'value': None}
+    for digits in precisions:
+        epsilon = 10.0 ** -digits
+        # A zero derivative stays zero at the same point in any precision, the start is moved off it
+        start = xn + math.sqrt(stop_value) * (1 + abs(xn)) if poly.derivative(xn) == 0 else xn
+        with localcontext() as context:
+            context.prec = digits
+            if arithmetic == 'decimal':
+                _poly, _x0, rounding = _convert(poly, Decimal), Decimal(start), None
+            else:
+                _poly, _x0 = _convert(poly, Fraction), Fraction(start)
+
+                def rounding(x, _limit=10 ** digits):
+                    return Fraction(x).limit_denominator(_limit)
+            # The iterates near a cluster of roots move slowly at first, they get the whole budget
+            _root, _iterations, _reason, _ = trouble(_poly, _x0, stop_value, max_iter, 'multiple', epsilon, record,
+                                                     rounding, None)
+        iterations += _iterations
+        if _reason is None:
+            escalation.update(digits=digits, value=str(_root))
+            return float(_root), iterations, escalation
+    return None, iterations, escalation
+
+
+def main():
+    """
+    Main function to find a root of the polynomial of a json file with adaptive precision
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--x0', action='store', type=float, default=None)
+    my_parser.add_argument('--method', action='store', type=str, default='newton', choices=list(METHODS))
+    my_parser.add_argument('--arithmetic', action='store', type=str, default='decimal', choices=ARITHMETICS)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    poly = SparsePolynomial(data['terms']) if 'terms' in data else Polynomial([float(c) for c in data['coef']])
+    x0 = args.x0 if args.x0 is not None else initial_guess(poly.coef)
+    root, iterations, escalation = solve(poly, x0, data['stop_value'], data['max_iter'], args.method,
+                                         args.arithmetic)
+    print(f'The root of the equation is : {root} after {iterations} iterations')
+    if escalation is not None:
+        print(f"float64 ran into trouble ({escalation['reason']}), "
+              f"escalated to {escalation['arithmetic']} with {escalation['digits']} digits: {escalation['value']}")
+
+
+if __name__ == '__main__':
+    main()
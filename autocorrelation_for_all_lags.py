@@ -5,18 +5,40 @@ This script allows the user to compute the autocorrelation value
 of a given signal for lags = 1, 2, 3.....N-2, where N is the length
 of the signal
 
-This file contains the following function:
+The direct formula takes O(N^2) operations, autocorrelation_fft gets every
+lag at once from the power spectrum of the zero padded signal in
+O(N log N) operations, which is what makes signals of millions of samples
+practical.
 
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * autocorrelation_lambda - The autocorrelation for every lag by the direct formula
+    * autocorrelation_fft - The autocorrelation for every lag from the real FFT
+    * autocorrelation_batch - The autocorrelation for every lag of every channel of a 2-D array
+    * check_equivalence - Compares the two implementations on a signal
     * main - the main function of the script
 
 """
 
+import numpy as np
 
-def main():
-    """
-    Main function to find the autocorrelation for lags = 1,2,3.....N-2
+
+def autocorrelation_lambda(signal):
+    """The autocorrelation for lags = 1, 2, 3.....N-2 by the direct formula
+
+    Parameters
+    ----------
+    signal : list
+        The values of the signal
+
+    Returns
+    -------
+    corrs : list
+        The autocorrelation of every lag, starting with lag 1
     """
-    signal = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 
     n = len(signal)
     mean = sum(signal)/n
@@ -35,9 +57,156 @@ def main():
     corrs = list(map((lambda k: sum(((signal[i] - mean) * (signal[i+k] - mean)
                                      for i in range(n-k)))/variance),
                      range(1, n-1)))
+    return corrs
+
+
+def autocorrelation_fft(signal):
+    """The autocorrelation for lags = 1, 2, 3.....N-2 from the real FFT
+
+    The sums of the lagged products of the centered signal are the inverse
+    transform of it's power spectrum. The signal is zero padded to a power of
+    two of at least 2N - 1 samples, so the products do not wrap around, and
+    the sums are divided by the variance without the division by N, like in
+    autocorrelation_lambda.
+
+    Parameters
+    ----------
+    signal : list, numpy.ndarray
+        The values of the signal
+
+    Returns
+    -------
+    corrs : numpy.ndarray
+        The autocorrelation of every lag, starting with lag 1
+    """
+
+    x = np.asarray(signal, dtype=np.float64)
+    n = x.size
+    if n < 3:
+        return np.empty(0)
+    # Checked on the samples, the variance of a constant signal is rounded slightly off zero once centered
+    if np.ptp(x) == 0:
+        raise Exception("The autocorrelation of a constant signal is undefined")
+    x = x - x.mean()
+    return _lagged_sums(x)[1:n - 1] / np.dot(x, x)
+
+
+def _lagged_sums(x):
+    """The sums of the lagged products of every row of x, lag 0 to N-1, from the zero padded real FFT"""
+
+    n = x.shape[-1]
+    size = 1 << (2 * n - 2).bit_length()
+    spectrum = np.fft.rfft(x, size, axis=-1)
+    # The power spectrum is written over the spectrum, so no other array of it's size is allocated
+    re, im = spectrum.real, spectrum.imag
+    re *= re
+    im *= im
+    re += im
+    im[...] = 0
+    return np.fft.irfft(spectrum, size, axis=-1)[..., :n]
+
+
+def autocorrelation_batch(signals, dtype=np.float64, chunk_size=None):
+    """The autocorrelation for lags = 1, 2, 3.....N-2 of every channel of a 2-D array
+
+    Every channel is transformed in the same vectorized pass, see
+    autocorrelation_fft. The transforms of a chunk need about 24 * P bytes
+    per channel, P being the padded length (a power of two of at least
+    2N - 1), so chunk_size bounds the peak memory.
+
+    Parameters
+    ----------
+    signals : numpy.ndarray
+        2-D array of the signals, one channel per row (channels x samples)
+    dtype : numpy.dtype
+        numpy.float64, or numpy.float32 which halves the memory of the
+        centered signals, the spectra and the result, for about 7
+        significant digits
+    chunk_size : int
+        Number of channels transformed at a time, at least 1, None transforms
+        all of them at once
+
+    Returns
+    -------
+    corrs : numpy.ndarray
+        Array of dtype with one row per channel and one column per lag,
+        starting with lag 1. The rows of the constant channels are nan.
+    """
+
+    signals = np.asarray(signals)
+    if signals.ndim != 2:
+        raise Exception("The signals must be a 2-D array of channels x samples")
+    if chunk_size is not None and chunk_size < 1:
+        raise Exception("The chunk size must be at least 1 channel")
+    channels, n = signals.shape
+    corrs = np.empty((channels, max(n - 2, 0)), dtype=dtype)
+    if n < 3 or channels == 0:
+        return corrs
+    chunk_size = chunk_size or channels
+    for start in range(0, channels, chunk_size):
+        x = signals[start:start + chunk_size].astype(dtype)
+        # Found on the samples, the variance of a constant channel is rounded slightly off zero once centered
+        constant = np.ptp(x, axis=1) == 0
+        x -= x.mean(axis=1, keepdims=True)
+        sums = _lagged_sums(x)
+        del x
+        # The sum of the lag 0 products is the variance
+        variance = sums[:, :1]
+        _corrs = corrs[start:start + chunk_size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(sums[:, 1:n - 1], variance, out=_corrs)
+        _corrs[constant] = np.nan
+    return corrs
+
+
+def check_equivalence(signal, tolerance=1e-9):
+    """Compares autocorrelation_fft with autocorrelation_lambda on a signal
+
+    Parameters
+    ----------
+    signal : list
+        The values of the signal
+    tolerance : float
+        Largest absolute difference allowed, the autocorrelation is between -1 and 1
+
+    Returns
+    -------
+    difference : float
+        The largest absolute difference over every lag
+    """
+
+    direct = np.asarray(autocorrelation_lambda(signal))
+    fast = autocorrelation_fft(signal)
+    if direct.shape != fast.shape:
+        raise Exception(f"The implementations return {direct.size} and {fast.size} lags")
+    difference = float(np.max(np.abs(direct - fast), initial=0.0))
+    if difference > tolerance:
+        raise Exception(f"The implementations differ by {difference}, more than {tolerance}")
+    return difference
+
+
+def main():
+    """
+    Main function to find the autocorrelation for lags = 1,2,3.....N-2
+    """
+    signal = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    corrs = autocorrelation_fft(signal)
 
     # Printing the lag value and corresponding correlation
-    print(list(enumerate(corrs, 1)))
+    print(list(enumerate(corrs.tolist(), 1)))
+
+    # The FFT must give the direct formula, on the signal above and on a random walk with a trend
+    walk = np.cumsum(np.random.default_rng(0).normal(size=1000)) + np.linspace(0, 10, 1000)
+    for name, values in (('signal', signal), ('random walk', walk.tolist())):
+        print(f'Largest difference from the direct formula on the {name}: {check_equivalence(values):.3e}')
+
+    # The channels of a batch must give the autocorrelation of each channel alone
+    channels = np.cumsum(np.random.default_rng(1).normal(size=(16, 500)), axis=1)
+    single = np.array([autocorrelation_fft(channel) for channel in channels])
+    for dtype, chunk_size in ((np.float64, None), (np.float64, 5), (np.float32, 5)):
+        difference = np.max(np.abs(autocorrelation_batch(channels, dtype, chunk_size) - single))
+        print(f'Largest difference of the batch of {len(channels)} channels in {np.dtype(dtype).name} '
+              f'with chunks of {chunk_size or len(channels)}: {difference:.3e}')
 
 
 if __name__ == '__main__':
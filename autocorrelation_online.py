@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+""" Computing the autocorrelation of an unbounded stream
+
+This script allows the user to compute the autocorrelation of a signal
+for lags = 1, 2, 3.....max_lag while the samples are still coming in, from
+an iterator, a file or a socket. The samples are not kept, the estimator
+only holds
+
+    * the count, the sum and the sum of squares of the samples
+    * the sums of the lagged products x(i) * x(i+k) for every lag k
+    * the first max_lag samples and a ring buffer of the last max_lag ones,
+      which correct the lagged sums for the mean of the whole signal
+
+so the memory is O(max_lag), and the autocorrelation reported at any time is
+the one autocorrelation.py computes on every sample seen so far. Every
+sample is stored minus the first one, which keeps the sums small and
+their rounding errors low for signals far away from zero.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the class OnlineAutocorrelation and the following functions:
+
+    * read_samples - Reads the numbers of a text stream one by one
+    * main - the main function of the script
+
+"""
+
+import argparse
+import itertools
+import re
+import socket
+import sys
+
+import numpy as np
+
+# Number of samples of an iterable added per vectorized pass of extend
+CHUNK_SIZE = 4096
+
+
+class OnlineAutocorrelation:
+    """It represents the autocorrelation of a stream for lags 1..max_lag
+         It has the following methods
+                *update(): Adds one sample
+                *extend(): Adds every sample of an iterable, in chunks
+                *acf(): Returns the autocorrelation of every lag so far
+    """
+
+    def __init__(self, max_lag):
+        if max_lag < 1:
+            raise Exception("The maximum lag must be at least 1")
+        self.max_lag = max_lag
+        self.count = 0
+        self._shift = 0.0
+        self._sum = 0.0
+        self._squares = 0.0
+        # Sums of the lagged products, index k for the lag k
+        self._cross = np.zeros(max_lag + 1)
+        self._head = []
+        # The last max_lag samples are ring[pos:pos + max_lag], oldest first, every sample is written twice
+        self._ring = np.zeros(2 * max_lag)
+        self._pos = 0
+
+    @property
+    def window(self):
+        """The last max_lag samples (minus the first sample), oldest first and zero before the start"""
+        return self._ring[self._pos:self._pos + self.max_lag]
+
+    def update(self, x):
+        """Adds one sample, in O(max_lag) operations"""
+
+        if self.count == 0:
+            self._shift = float(x)
+        z = float(x) - self._shift
+        # The newest sample of the window is the partner of lag 1, the oldest one of lag max_lag
+        self._cross[1:] += z * self.window[::-1]
+        self._ring[self._pos] = self._ring[self._pos + self.max_lag] = z
+        self._pos = (self._pos + 1) % self.max_lag
+        if self.count < self.max_lag:
+            self._head.append(z)
+        self.count += 1
+        self._sum += z
+        self._squares += z * z
+
+    def extend(self, samples):
+        """Adds every sample of an iterable, CHUNK_SIZE samples per vectorized pass
+
+        Parameters
+        ----------
+        samples : iterable
+            The samples, an unbounded iterator is read until it ends
+        """
+
+        samples = iter(samples)
+        while True:
+            chunk = np.fromiter(itertools.islice(samples, CHUNK_SIZE), dtype=np.float64)
+            if chunk.size == 0:
+                break
+            if self.count == 0:
+                self._shift = float(chunk[0])
+            chunk -= self._shift
+            m = chunk.size
+            # The window in front of the chunk gives the partners of it's first samples
+            joined = np.concatenate((self.window, chunk))
+            for k in range(1, self.max_lag + 1):
+                self._cross[k] += np.dot(joined[self.max_lag - k:self.max_lag - k + m], chunk)
+            self._ring[:self.max_lag] = self._ring[self.max_lag:] = joined[-self.max_lag:]
+            self._pos = 0
+            if self.count < self.max_lag:
+                self._head.extend(chunk[:self.max_lag - self.count].tolist())
+            self.count += m
+            self._sum += float(chunk.sum())
+            self._squares += float(np.dot(chunk, chunk))
+
+    def acf(self):
+        """Returns the autocorrelation of every lag so far
+
+        Returns
+        -------
+        corrs : numpy.ndarray
+            The autocorrelation of lags = 1, 2, 3.....min(max_lag, N-2), N
+            being the number of samples seen, normalized like autocorrelation.py
+        """
+
+        n = self.count
+        lags = min(self.max_lag, n - 2)
+        if lags < 1:
+            return np.empty(0)
+        mean = self._sum / n
+        variance = self._squares - self._sum * mean
+        if variance <= 0:
+            raise Exception("The autocorrelation of a constant signal is undefined")
+        k = np.arange(1, lags + 1)
+        # sum((x(i) - mean) * (x(i+k) - mean)) = cross(k) - mean * (sum without the last k samples
+        # + sum without the first k samples) + (n - k) * mean^2
+        first = np.cumsum(self._head)[:lags]
+        last = np.cumsum(self.window[::-1])[:lags]
+        sums = self._cross[1:lags + 1] - mean * (2 * self._sum - first - last) + (n - k) * mean * mean
+        return sums / variance
+
+    def __str__(self):
+        return str(list(enumerate(self.acf().tolist(), 1)))
+
+
+def read_samples(stream):
+    """Reads the numbers of a text stream one by one
+
+    Parameters
+    ----------
+    stream : file
+        A text file, sys.stdin or the file of a socket (socket.makefile('r')),
+        the numbers may be separated by commas, spaces or new lines
+
+    Returns
+    -------
+    result : generator
+        Yields every number as a float as soon as it's line is read
+    """
+
+    for line in stream:
+        for value in re.split(r'[,\s]+', line.strip()):
+            if value:
+                yield float(value)
+
+
+def main():
+    """
+    Main function to compute the autocorrelation of a stream read from a file, stdin or a socket
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--max-lag', action='store', type=int, required=True)
+    my_parser.add_argument('--file', action='store', type=str, default='-',
+                           help='text file of the samples, - reads stdin')
+    my_parser.add_argument('--connect', action='store', type=str, default=None, metavar='HOST:PORT',
+                           help='read the samples from a TCP socket instead of --file')
+    my_parser.add_argument('--every', action='store', type=int, default=0,
+                           help='print the autocorrelation after every this many samples')
+
+    args = my_parser.parse_args()
+
+    estimator = OnlineAutocorrelation(args.max_lag)
+    if args.connect is not None:
+        host, port = args.connect.rsplit(':', 1)
+        connection = socket.create_connection((host, int(port)))
+        stream = connection.makefile('r')
+    else:
+        connection = None
+        stream = sys.stdin if args.file == '-' else open(args.file)
+    try:
+        samples = read_samples(stream)
+        if args.every > 0:
+            for chunk in iter(lambda: list(itertools.islice(samples, args.every)), []):
+                estimator.extend(chunk)
+                print(f'{estimator.count} samples: {estimator}', flush=True)
+        else:
+            estimator.extend(samples)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if connection is not None:
+            connection.close()
+
+    print(f'The autocorrelation of the {estimator.count} samples for lags 1 to {args.max_lag} is {estimator}')
+
+
+if __name__ == '__main__':
+    main()
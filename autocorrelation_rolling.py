@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+""" Computing the autocorrelation over a sliding window
+
+This script allows the user to follow the autocorrelation of a signal for
+a few lags over a sliding window of W samples, at every step, to see the
+periodicity drift. Recomputing the formula of autocorrelation.py for every
+window takes O(W) operations per step and lag, here the sums it needs
+
+    * the sum and the sum of squares of the window, for the mean and the variance
+    * the sum of the lagged products x(i) * x(i+k) inside the window
+    * the sums of the first k and of the last k samples of the window
+
+are updated in O(1) operations per lag when a sample enters the window and
+the oldest one leaves it. RollingAutocorrelation does it one sample at a
+time for streams, rolling_autocorrelation does it for a whole array at once
+with cumulative sums restarted every W samples, so a window sum only adds the
+samples of it's window and a quiet part of the signal keeps it's precision
+after a loud one. The running sums are recomputed from the window every
+REFRESH windows, so their rounding errors do not pile up over long streams.
+The constant windows are found by counting the equal samples in a row, not
+from the variance, which rounding leaves slightly off zero.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the class RollingAutocorrelation and the following functions:
+
+    * rolling_autocorrelation - The autocorrelation of every window of an array
+    * main - the main function of the script
+
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from autocorrelation_online import read_samples
+
+# Number of windows between two recomputations of the running sums of RollingAutocorrelation
+REFRESH = 16
+
+
+def _lags(lags, window):
+    """The lags as an array of int, checked against the window"""
+
+    lags = np.atleast_1d(np.asarray(lags, dtype=np.int64))
+    if window < 3:
+        raise Exception("The window must hold at least 3 samples")
+    if lags.size == 0 or lags.min() < 1 or lags.max() > window - 2:
+        raise Exception("K takes value between 1 and W-2")
+    return lags
+
+
+def _window_sums(values, length):
+    """The sums of every run of length consecutive values
+
+    The values are cut in blocks of length, and summed forward and backward
+    within each block. A run starting inside a block is the end of that block
+    plus the start of the next one, so it is never the difference of two sums
+    over earlier values.
+    """
+
+    _blocks = -(-values.size // length)
+    padded = np.zeros(_blocks * length)
+    padded[:values.size] = values
+    padded = padded.reshape(_blocks, length)
+    forward = np.cumsum(padded, axis=1).ravel()
+    backward = np.cumsum(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(values.size - length + 1)
+    # A run starting on a block is the whole block
+    return backward[starts] + np.where(starts % length == 0, 0.0, forward[starts + length - 1])
+
+
+def _centered(cross, first, last, total, squares, window, lags):
+    """The sums of the lagged products and the variance of the windows, both around the mean of the window
+
+    sum((x(i) - mean) * (x(i+k) - mean)) = cross - mean * (2 * total - first - last) + (W - k) * mean^2
+    """
+
+    mean = total / window
+    return cross - mean * (2 * total - first - last) + (window - lags) * mean * mean, squares - total * mean
+
+
+def rolling_autocorrelation(signal, window, lags):
+    """The autocorrelation of every window of an array
+
+    Parameters
+    ----------
+    signal : list, numpy.ndarray
+        The values of the signal
+    window : int
+        Number of samples W of the sliding window
+    lags : int, list
+        One lag, or a list of lags, between 1 and W-2
+
+    Returns
+    -------
+    corrs : numpy.ndarray
+        One row per window position, the window of row t being the samples
+        t to t+W-1, with one column per lag, or one value per row when lags
+        is a single int. The constant windows give nan.
+    """
+
+    single = np.ndim(lags) == 0
+    lags = _lags(lags, window)
+    x = np.asarray(signal, dtype=np.float64)
+    if x.size < window:
+        return np.empty((0,) if single else (0, lags.size))
+    # The autocorrelation does not change with the mean, removing it keeps the sums small
+    x = x - x.mean()
+    positions = np.arange(x.size - window + 1)
+    total = _window_sums(x, window)
+    squares = _window_sums(x * x, window)
+    # A window is constant when no sample in it differs from the one before it
+    changes = np.concatenate(([0], np.cumsum(x[1:] != x[:-1])))
+    constant = changes[positions + window - 1] == changes[positions]
+    corrs = np.empty((positions.size, lags.size))
+    for j, k in enumerate(lags):
+        cross = _window_sums(x[:-k] * x[k:], window - k)
+        _edges = _window_sums(x, k)
+        first = _edges[positions]
+        last = _edges[positions + window - k]
+        _sums, variance = _centered(cross, first, last, total, squares, window, k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corrs[:, j] = np.where(constant, np.nan, _sums / variance)
+    return corrs[:, 0] if single else corrs
+
+
+class RollingAutocorrelation:
+    """It represents the autocorrelation over the last W samples of a stream
+         It has the following methods
+                *update(): Adds one sample and returns the autocorrelation of the new window
+                *acf(): Returns the autocorrelation of the current window
+    """
+
+    def __init__(self, window, lags):
+        self.single = np.ndim(lags) == 0
+        self.lags = _lags(lags, window)
+        self.window = window
+        # Index in the window of the partner of the leaving sample and of the entering one, per lag
+        self._leaving = self.lags
+        self._entering = window - self.lags
+        self.count = 0
+        self._shift = 0.0
+        # Number of equal samples in a row ending with the last one, the window is constant when it reaches W
+        self._run = 0
+        # The last W samples are ring[pos:pos + W], oldest first, every sample is written twice
+        self._ring = np.zeros(2 * window)
+        self._pos = 0
+
+    @property
+    def samples(self):
+        """The samples of the current window (minus the first sample of the stream), oldest first"""
+        return self._ring[self._pos:self._pos + self.window]
+
+    def _recompute(self):
+        """Computes the running sums from the samples of the window"""
+
+        w = self.samples
+        self._total = w.sum()
+        self._squares = np.dot(w, w)
+        self._cross = np.array([np.dot(w[:-k], w[k:]) for k in self.lags])
+        _sums = np.concatenate(([0.0], np.cumsum(w)))
+        self._first = _sums[self.lags]
+        self._last = _sums[-1] - _sums[self._entering]
+
+    def update(self, x):
+        """Adds one sample, in O(1) operations per lag
+
+        Returns
+        -------
+        corrs : numpy.ndarray, float
+            The autocorrelation of the window ending with this sample (see
+            acf), None while the first window is not full yet
+        """
+
+        if self.count == 0:
+            self._shift = float(x)
+        z = float(x) - self._shift
+        full = self.count >= self.window
+        if full:
+            w = self.samples
+            old = w[0]
+            # The pairs of the leaving sample go, the new sample pairs with the samples k steps before it
+            _leaving = w[self._leaving]
+            _entering = w[self._entering]
+            self._cross += z * _entering - old * _leaving
+            self._first += _leaving - old
+            self._last += z - _entering
+            self._total += z - old
+            self._squares += z * z - old * old
+        self._run = self._run + 1 if self.count > 0 and z == self._ring[self._pos - 1 + self.window] else 1
+        self._ring[self._pos] = self._ring[self._pos + self.window] = z
+        self._pos = (self._pos + 1) % self.window
+        self.count += 1
+        if self.count == self.window or (full and self.count % (REFRESH * self.window) == 0):
+            self._recompute()
+        return self.acf() if self.count >= self.window else None
+
+    def acf(self):
+        """Returns the autocorrelation of the current window
+
+        Returns
+        -------
+        corrs : numpy.ndarray, float
+            The autocorrelation of every lag, one value when the lags were a
+            single int, nan for a constant window
+        """
+
+        if self.count < self.window:
+            raise Exception(f"The window is not full yet, {self.count} of {self.window} samples")
+        _sums, variance = _centered(self._cross, self._first, self._last, self._total, self._squares, self.window,
+                                    self.lags)
+        corrs = np.full(self.lags.size, np.nan) if self._run >= self.window else _sums / variance
+        return float(corrs[0]) if self.single else corrs
+
+
+def main():
+    """
+    Main function to compute the autocorrelation over a sliding window of the samples of a file or stdin
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--window', action='store', type=int, required=True)
+    my_parser.add_argument('--lag', action='store', type=int, nargs='+', required=True)
+    my_parser.add_argument('--file', action='store', type=str, default='-',
+                           help='text file of the samples, - reads stdin')
+    my_parser.add_argument('--output', action='store', type=str, default=None,
+                           help='save the autocorrelation of every window to this .npy file')
+
+    args = my_parser.parse_args()
+
+    stream = sys.stdin if args.file == '-' else open(args.file)
+    with stream:
+        signal = np.fromiter(read_samples(stream), dtype=np.float64)
+
+    corrs = rolling_autocorrelation(signal, args.window, args.lag)
+    if args.output is not None:
+        np.save(args.output, corrs)
+        print(f'Saved the autocorrelation of {len(corrs)} windows to {args.output}')
+        return
+    for t, row in enumerate(corrs.reshape(len(corrs), -1)):
+        print(f'Samples {t} to {t + args.window - 1}: {list(zip(args.lag, row.tolist()))}')
+
+
+if __name__ == '__main__':
+    main()
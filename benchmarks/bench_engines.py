@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+""" Benchmark and threshold tuning of the root finding engines
+
+This script times the 'newton', 'sturm' and 'eigen' engines of root_engines.py
+over a generated corpus, prints the results and the thresholds derived from
+them, and with --write saves the thresholds to engine_thresholds.json where
+root_engines.select_engine picks them up.
+
+Usage:
+    python benchmarks/bench_engines.py --write
+
+This file contains the following functions:
+
+    * time_per_polynomial - Average wall time per polynomial of an engine on a corpus
+    * newton_success_rate - Fraction of a corpus on which Newton's method from the seeds converges
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import root_engines
+import sturm
+from corpus import make_corpus
+
+DEGREES = [2, 3, 4, 6, 8, 10, 12, 16, 20, 24, 32, 48, 64]
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+def time_per_polynomial(engine, corpus, batch_size, repeat=3):
+    """Average wall time per polynomial of an engine on a corpus, the best of a few runs
+
+    Parameters
+    ----------
+    engine : str
+        One of 'newton', 'sturm' and 'eigen'
+    corpus : list
+        List of coefficient lists
+    batch_size : int
+        Number of polynomials passed to root_engines.solve_many per call
+    repeat : int
+        Number of runs, the fastest one is kept
+
+    Returns
+    -------
+    seconds : float
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        # Every run starts from an empty cache, so Sturm sequences are built and not looked up
+        sturm.STURM_CACHE.clear()
+        start = time.perf_counter()
+        for i in range(0, len(corpus), batch_size):
+            root_engines.solve_many(corpus[i:i + batch_size], 1e-12, 100, engine)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus)
+
+
+def newton_success_rate(corpus):
+    """Fraction of the corpus on which Newton's method from the seeds of seeding.py converges to a root"""
+
+    roots = root_engines.solve_many(corpus, 1e-12, 100, 'newton')
+    return sum(1 for r in roots if r) / len(corpus)
+
+
+def main():
+    """
+    Main function to benchmark the engines and derive the thresholds
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--size', action='store', type=int, default=1024,
+                           help='number of polynomials per degree')
+    my_parser.add_argument('--write', action='store_true',
+                           help='save the thresholds to engine_thresholds.json')
+    args = my_parser.parse_args()
+
+    # Sturm isolation against the eigenvalue solve, one polynomial at a time
+    print('Degree -- sturm (ms) -- eigen (ms) -- newton success')
+    sturm_max_degree = 0
+    sturm_wins = True
+    newton_max_degree = 0
+    newton_reliable = True
+    for degree in DEGREES:
+        corpus = make_corpus(degree, min(args.size, 256), seed=degree, complex_pairs=degree // 4)
+        t_sturm = time_per_polynomial('sturm', corpus, 1)
+        t_eigen = time_per_polynomial('eigen', corpus, 1)
+        rate = newton_success_rate(corpus)
+        print(f'{degree:>6} -- {t_sturm * 1e3:>10.4f} -- {t_eigen * 1e3:>10.4f} -- {rate:>14.1%}')
+        sturm_wins = sturm_wins and t_sturm < t_eigen
+        if sturm_wins:
+            sturm_max_degree = degree
+        newton_reliable = newton_reliable and rate >= 0.95
+        if newton_reliable:
+            newton_max_degree = degree
+
+    # The stacked eigenvalue solve against Sturm isolation for growing batches, on the degrees where
+    # Sturm isolation wins alone, both engines return the same polished distinct roots
+    print(f'\nBatch -- sturm (ms) -- eigen (ms)  (per polynomial, sum over degree 2 to {sturm_max_degree})')
+    eigen_min_batch = BATCH_SIZES[-1] * 2 if sturm_max_degree else 1
+    corpora = [make_corpus(degree, args.size, seed=degree) for degree in DEGREES if degree <= sturm_max_degree]
+    for batch_size in BATCH_SIZES if corpora else []:
+        t_sturm = sum(time_per_polynomial('sturm', corpus, batch_size) for corpus in corpora)
+        t_eigen = sum(time_per_polynomial('eigen', corpus, batch_size) for corpus in corpora)
+        print(f'{batch_size:>5} -- {t_sturm * 1e3:>10.4f} -- {t_eigen * 1e3:>10.4f}')
+        if t_eigen < t_sturm:
+            eigen_min_batch = min(eigen_min_batch, batch_size)
+
+    thresholds = {
+        "newton_max_degree": newton_max_degree,
+        "sturm_max_degree": sturm_max_degree,
+        "eigen_min_batch": eigen_min_batch,
+    }
+    print(f'\nThresholds: {thresholds}')
+
+    if args.write:
+        with open(root_engines.THRESHOLDS_FILE, 'w') as f:
+            json.dump(thresholds, f, indent=2)
+        print(f'Saved to {root_engines.THRESHOLDS_FILE}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of scalar vs vectorized Horner evaluation
+
+This script compares evaluating a polynomial point by point with the
+scalar `eval_horner` of newton_argparse.py against the vectorized
+`eval_horner_vector` of polynomial.py
+
+Usage:
+    python benchmarks/bench_horner.py --points 1000000 --degree 10
+
+This file contains the following function:
+
+    * main - the main function of the script
+
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from newton_argparse import eval_horner
+from polynomial import eval_horner_vector
+
+
+def main():
+    """
+    Main function to time both evaluators over the same points
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--points', action='store', type=int, default=10 ** 6)
+    my_parser.add_argument('--degree', action='store', type=int, default=10)
+    my_parser.add_argument('--repeat', action='store', type=int, default=3)
+    args = my_parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    coef = list(rng.uniform(-1, 1, args.degree + 1))
+    x = rng.uniform(-1, 1, args.points)
+    x_list = x.tolist()
+    d_coef = [coef[i] * (args.degree - i) for i in range(args.degree)]
+
+    timings = {
+        'scalar f': lambda: [eval_horner(coef, v) for v in x_list],
+        'scalar f, df': lambda: [(eval_horner(coef, v), eval_horner(d_coef, v)) for v in x_list],
+        'vector f': lambda: eval_horner_vector(coef, x),
+        'vector f, df': lambda: eval_horner_vector(coef, x, derivative=True),
+    }
+
+    print(f'Degree: {args.degree} -- Points: {args.points}')
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:<14}: {best:.4f} s -- {args.points / best:,.0f} points/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+""" Benchmark and threshold tuning of the polynomial kernels
+
+This script times every kernel of poly_kernels.py against the plain one it
+replaces, over degrees 8 to 16384, prints the results and the crossover
+degrees, and with --write saves them to kernel_thresholds.json where
+poly_kernels, polynomial.Polynomial and sturm.sturm_sequence pick them up:
+
+    * evaluation - fused Horner pass of Polynomial.value_and_derivative against two Estrin evaluations
+    * multiplication - numpy.convolve against the FFT, two factors of the same degree
+    * Sturm step - sturm.poly_div against the vectorized long division, quotient of degree 1
+    * division - vectorized long division against the power series inverse, quotient of half the degree
+
+Usage:
+    python benchmarks/bench_kernels.py --write
+
+This file contains the following functions:
+
+    * best_time - Best wall time of a function over a few runs
+    * crossover - The smallest degree from which the fast kernel stays faster
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import poly_kernels
+import sturm
+from polynomial import Polynomial
+
+DEGREES = [8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384]
+
+
+def best_time(func, repeat):
+    """Best wall time of a function over a few runs
+
+    Parameters
+    ----------
+    func : function
+        Called without arguments
+    repeat : int
+        Number of runs
+
+    Returns
+    -------
+    seconds : float
+        The fastest run, the number of calls per run is picked so a run lasts about 20 ms
+    """
+
+    number = 1
+    while timeit.timeit(func, number=number) < 0.02 and number < 10 ** 5:
+        number *= 10
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def crossover(timings):
+    """The smallest degree from which the fast kernel stays faster
+
+    Parameters
+    ----------
+    timings : list
+        List of (degree, plain seconds, fast seconds) tuples, sorted by degree
+
+    Returns
+    -------
+    degree : int
+        The crossover degree, twice the largest degree when the fast kernel never wins
+    """
+
+    degree = 2 * timings[-1][0]
+    for deg, t_plain, t_fast in reversed(timings):
+        if t_fast >= t_plain:
+            break
+        degree = deg
+    return degree
+
+
+def main():
+    """
+    Main function to benchmark the kernels and derive the thresholds
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--repeat', action='store', type=int, default=3)
+    my_parser.add_argument('--max-degree', action='store', type=int, default=16384)
+    my_parser.add_argument('--write', action='store_true',
+                           help='save the thresholds to kernel_thresholds.json')
+    args = my_parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Every kernel is compared on it's own, so the selection thresholds are turned off
+    never = {key: 10 ** 9 for key in poly_kernels.DEFAULT_THRESHOLDS}
+    always = {key: 0 for key in poly_kernels.DEFAULT_THRESHOLDS}
+    results = {'estrin_min_degree': [], 'fft_min_degree': [],
+               'vector_div_min_degree': [], 'newton_div_min_quotient': []}
+
+    print('Degree -- horner / estrin (us) -- convolve / fft (us) -- '
+          'sturm step: python / numpy (us) -- division: long / newton (us)')
+    for degree in [degree for degree in DEGREES if degree <= args.max_degree]:
+        coef = rng.uniform(-1, 1, degree + 1)
+        # A dominant leading coefficient keeps the power series inverse of the divisor bounded
+        divisor = np.concatenate([[1], rng.uniform(-1, 1, degree // 2) / degree])
+        poly = Polynomial(coef.tolist())
+        poly_list = coef.tolist()
+        d_list = poly.dfun_terms
+
+        poly._estrin = False
+        t_horner = best_time(lambda: poly.value_and_derivative(0.99), args.repeat)
+        poly._estrin = True
+        t_estrin = best_time(lambda: poly.value_and_derivative(0.99), args.repeat)
+        t_convolve = best_time(lambda: poly_kernels.poly_mul(coef, coef, never), args.repeat)
+        t_fft = best_time(lambda: poly_kernels.poly_mul(coef, coef, always), args.repeat)
+        t_python = best_time(lambda: sturm.poly_div(poly_list, d_list), args.repeat)
+        t_numpy = best_time(lambda: poly_kernels.poly_divmod_long(poly_list, d_list), args.repeat)
+        t_long = best_time(lambda: poly_kernels.poly_divmod(coef, divisor, never), args.repeat)
+        t_newton = best_time(lambda: poly_kernels.poly_divmod(coef, divisor, always), args.repeat)
+
+        results['estrin_min_degree'].append((degree, t_horner, t_estrin))
+        results['fft_min_degree'].append((degree, t_convolve, t_fft))
+        results['vector_div_min_degree'].append((degree, t_python, t_numpy))
+        results['newton_div_min_quotient'].append((degree - degree // 2, t_long, t_newton))
+        print(f'{degree:>6} -- {t_horner * 1e6:>9.1f} / {t_estrin * 1e6:<9.1f} -- '
+              f'{t_convolve * 1e6:>9.1f} / {t_fft * 1e6:<9.1f} -- '
+              f'{t_python * 1e6:>9.1f} / {t_numpy * 1e6:<9.1f} -- '
+              f'{t_long * 1e6:>9.1f} / {t_newton * 1e6:<9.1f}')
+
+    thresholds = {key: crossover(timings) for key, timings in results.items()}
+    print(f'\nThresholds: {thresholds}')
+
+    if args.write:
+        with open(poly_kernels.THRESHOLDS_FILE, 'w') as f:
+            json.dump(thresholds, f, indent=2)
+        print(f'Saved to {poly_kernels.THRESHOLDS_FILE}')
+
+
+if __name__ == '__main__':
+    main()
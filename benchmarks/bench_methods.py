@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the Newton, Halley and Laguerre iterations
+
+This script solves the standard corpus (see corpus.py) from x0 = 2 with
+every method of iteration_methods.py and reports, per degree and method,
+the share of polynomials solved, the average number of iterations and the
+average wall time per solve.
+
+Usage:
+    python benchmarks/bench_methods.py --size 200
+
+This file contains the following function:
+
+    * main - the main function of the script
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import iteration_methods
+from corpus import make_corpus
+from polynomial import Polynomial
+
+DEGREES = [3, 5, 10, 20, 40]
+
+
+def main():
+    """
+    Main function to compare the methods on the standard corpus
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--size', action='store', type=int, default=200,
+                           help='number of polynomials per degree')
+    my_parser.add_argument('--stop-value', action='store', type=float, default=1e-10)
+    my_parser.add_argument('--max-iter', action='store', type=int, default=100)
+    args = my_parser.parse_args()
+
+    print('Degree -- method   -- solved -- iterations -- time (us)')
+    for degree in DEGREES:
+        corpus = [Polynomial(coef) for coef in make_corpus(degree, args.size, seed=degree, complex_pairs=degree // 4)]
+        for method in iteration_methods.METHODS:
+            solved = 0
+            iterations = 0
+            start = time.perf_counter()
+            for poly in corpus:
+                root, count = iteration_methods.solve(poly, 2, args.stop_value, args.max_iter, method)
+                solved += root is not None
+                iterations += count
+            elapsed = (time.perf_counter() - start) / len(corpus)
+            print(f'{degree:>6} -- {method:<8} -- {solved / len(corpus):>6.1%} -- '
+                  f'{iterations / len(corpus):>10.2f} -- {elapsed * 1e6:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
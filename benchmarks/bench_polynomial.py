@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the fused Polynomial evaluation against the lambdas
+
+This script compares three ways of getting f(x) and f'(x) at the same point:
+
+    * lambdas - the `fun` and `dfun` lambdas newton_argparse.py used to define, one pow per term
+    * horner - two separate Horner passes over the coefficients and the derivative coefficients
+    * fused - Polynomial.value_and_derivative, one Horner pass for both
+
+Usage:
+    python benchmarks/bench_polynomial.py --points 20000
+
+This file contains the following function:
+
+    * main - the main function of the script
+
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from newton_argparse import eval_horner
+from polynomial import Polynomial
+
+DEGREES = [2, 5, 10, 20, 50, 100]
+
+
+def main():
+    """
+    Main function to time the three evaluations for several degrees
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--points', action='store', type=int, default=20000)
+    my_parser.add_argument('--repeat', action='store', type=int, default=3)
+    args = my_parser.parse_args()
+
+    rng = random.Random(0)
+    points = [rng.uniform(-1, 1) for _ in range(args.points)]
+
+    print('Degree -- lambdas (us) -- horner (us) -- fused (us)   (per point)')
+    for deg in DEGREES:
+        coef = [rng.uniform(-1, 1) for _ in range(deg + 1)]
+        fun = lambda x, coe=coef: sum((coe[i] * (x ** (deg - i)) for i in range(deg + 1)))
+        dfun = lambda x, coe=coef: sum((coe[i] * (deg - i) * (x ** (deg - i - 1)) for i in range(deg)))
+        poly = Polynomial(coef)
+
+        timings = [
+            lambda: [(fun(x), dfun(x)) for x in points],
+            lambda: [(eval_horner(poly.coef, x), eval_horner(poly.dfun_terms, x)) for x in points],
+            lambda: [poly.value_and_derivative(x) for x in points],
+        ]
+        best = [min(timeit.repeat(func, number=1, repeat=args.repeat)) / args.points * 1e6 for func in timings]
+        print(f'{deg:>6} -- {best[0]:>12.3f} -- {best[1]:>11.3f} -- {best[2]:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
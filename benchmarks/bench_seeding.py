@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the root bound seeding against x0 = 2
+
+This script solves generated polynomials (see corpus.py) with the batched
+Newton's method twice, once from the old fixed initial guess x0 = 2 and
+once from the seeds of seeding.initial_guess_batch, and reports per degree
+and root layout the share of polynomials solved, the average number of
+iterations of the solved ones and the wall time, seeding included.
+
+Usage:
+    python benchmarks/bench_seeding.py --size 2000
+
+This file contains the following functions:
+
+    * run - Solves a corpus from the given initial guesses
+    * main - the main function of the script
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from corpus import make_corpus
+from newton_batch import newton_batch, pack_coefficients
+
+DEGREES = [3, 5, 10, 20]
+# (center, spacing) of the real roots, the first ones are around x0 = 2 and the last ones far from it
+CASES = [(0.0, 1.0), (0.0, 10.0), (-10.0, 1.0), (50.0, 10.0), (-500.0, 100.0)]
+
+
+def run(coefs, stop_value, max_iter, x0):
+    """Solves a corpus from the given initial guesses
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, see newton_batch.pack_coefficients
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations
+    x0 : float
+        Initial guess, None for the seeds of the sign scan
+
+    Returns
+    -------
+    solved, iterations, seconds : float
+        Share of polynomials solved, average iterations of the solved ones and
+        the wall time of the whole corpus
+    """
+
+    start = time.perf_counter()
+    _, iterations, converged = newton_batch(coefs, stop_value, max_iter, x0)
+    seconds = time.perf_counter() - start
+    return converged.mean(), iterations[converged].mean() if converged.any() else float('nan'), seconds
+
+
+def main():
+    """
+    Main function to compare the fixed and the seeded initial guess
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--size', action='store', type=int, default=2000,
+                           help='number of polynomials per degree and root layout')
+    my_parser.add_argument('--stop-value', action='store', type=float, default=1e-10)
+    my_parser.add_argument('--max-iter', action='store', type=int, default=100)
+    args = my_parser.parse_args()
+
+    print('Degree -- center, spacing -- x0 = 2: solved, iterations, time (ms) -- seeded: solved, iterations, time (ms)')
+    for degree in DEGREES:
+        for center, spacing in CASES:
+            coefs = pack_coefficients(make_corpus(degree, args.size, seed=degree, spacing=spacing,
+                                                  complex_pairs=degree // 4, center=center))
+            fixed = run(coefs, args.stop_value, args.max_iter, 2)
+            seeded = run(coefs, args.stop_value, args.max_iter, None)
+            print(f'{degree:>6} -- {center:>6g}, {spacing:>7g} -- '
+                  f'{fixed[0]:>6.1%} {fixed[1]:>6.2f} {fixed[2] * 1e3:>8.2f} -- '
+                  f'{seeded[0]:>6.1%} {seeded[1]:>6.2f} {seeded[2] * 1e3:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the float and the exact Sturm sequences
+
+This script builds the Sturm sequence of generated polynomials of degree 10
+to 200 with sturm.sturm_sequence (float synthetic division) and with
+sturm.sturm_sequence_exact (primitive pseudo-remainder sequence over the
+integers), and reports the time taken and how often the number of real roots
+counted from the sequence is right. The polynomials are products of integer
+roots and irreducible quadratics, so their coefficients (and the right count)
+are exact.
+
+The exact sequence grows like the size of the subresultants (about degree
+times the size of the input coefficients), use --max-degree to stop early.
+
+Usage:
+    python benchmarks/bench_sturm.py --size 3 --max-degree 100
+
+This file contains the following functions:
+
+    * integer_polynomial - Builds an int polynomial from integer roots and irreducible quadratics
+    * run - Times one way of building the sequence and counts the correct root counts
+    * main - the main function of the script
+
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sturm
+
+DEGREES = [10, 20, 30, 50, 75, 100, 150, 200]
+
+
+def integer_polynomial(degree, rng):
+    """Builds an int polynomial from integer roots and irreducible quadratics
+
+    Parameters
+    ----------
+    degree : int
+        Degree of the polynomial, half of the roots are real
+    rng : random.Random
+        Source of the random roots
+
+    Returns
+    -------
+    coef, n_real : list, int
+        The int coefficient values and the number of real roots
+    """
+
+    pairs = degree // 4
+    n_real = degree - 2 * pairs
+    factors = [[1, -r] for r in rng.sample(range(-degree, degree + 1), n_real)]
+    factors += [[1, rng.randint(-degree, degree), degree ** 2] for _ in range(pairs)]
+    coef = [1]
+    for factor in factors:
+        product = [0] * (len(coef) + len(factor) - 1)
+        for i, a in enumerate(coef):
+            for j, b in enumerate(factor):
+                product[i + j] += a * b
+        coef = product
+    return coef, n_real
+
+
+def run(build, corpus):
+    """Times one way of building the Sturm sequence
+
+    Parameters
+    ----------
+    build : function
+        sturm.sturm_sequence or sturm.sturm_sequence_exact
+    corpus : list
+        List of (coefficient list, number of real roots) tuples
+
+    Returns
+    -------
+    seconds, correct : float, int
+        Average time per polynomial and the number of right root counts
+    """
+
+    correct = 0
+    start = time.perf_counter()
+    for coef, n_real in corpus:
+        try:
+            correct += sturm.count_roots(build(coef)) == n_real
+        except (OverflowError, ZeroDivisionError):
+            # The float sequence overflows (or divides by a zero coefficient) at high degree
+            pass
+    return (time.perf_counter() - start) / len(corpus), correct
+
+
+def main():
+    """
+    Main function to compare the float and the exact Sturm sequences
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--size', action='store', type=int, default=3,
+                           help='number of polynomials per degree')
+    my_parser.add_argument('--max-degree', action='store', type=int, default=200)
+    args = my_parser.parse_args()
+
+    print('Degree -- float (ms) -- float correct -- exact (ms) -- exact correct')
+    for degree in [degree for degree in DEGREES if degree <= args.max_degree]:
+        rng = random.Random(degree)
+        corpus = [integer_polynomial(degree, rng) for _ in range(args.size)]
+        t_float, ok_float = run(sturm.sturm_sequence, corpus)
+        t_exact, ok_exact = run(sturm.sturm_sequence_exact, corpus)
+        print(f'{degree:>6} -- {t_float * 1e3:>10.3f} -- {ok_float:>7}/{len(corpus):<5} -- '
+              f'{t_exact * 1e3:>10.3f} -- {ok_exact:>7}/{len(corpus):<5}')
+
+
+if __name__ == '__main__':
+    main()
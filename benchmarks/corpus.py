@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+""" Generated polynomial corpus for the benchmarks
+
+This file contains the following functions:
+
+    * random_polynomial - Builds a polynomial from random real roots and complex pairs
+    * make_corpus - Builds a list of polynomials of the same degree
+
+"""
+
+import numpy as np
+
+
+def random_polynomial(degree, rng, spacing=1.0, complex_pairs=0, center=0.0):
+    """Builds a polynomial from random roots
+
+    Parameters
+    ----------
+    degree : int
+        Degree of the polynomial
+    rng : numpy.random.Generator
+        Source of the random roots
+    spacing : float
+        Average distance between neighbouring real roots
+    complex_pairs : int
+        Number of complex conjugate root pairs, the remaining roots are real
+    center : float
+        Mean of the real roots, the complex pairs are spread around it too
+
+    Returns
+    -------
+    coef : list
+        The coefficient values, leading coefficient first
+    """
+
+    n_real = degree - 2 * complex_pairs
+    real = np.cumsum(rng.uniform(0.5, 1.5, n_real) * spacing)
+    real += center - (real.mean() if n_real else 0)
+    coef = np.poly(real) if n_real else np.ones(1)
+    for _ in range(complex_pairs):
+        middle = center + rng.uniform(-1, 1) * spacing * max(n_real, 1) / 2
+        width = rng.uniform(0.5, 1.5) * spacing
+        coef = np.polymul(coef, [1, -2 * middle, middle ** 2 + width ** 2])
+    return list(coef * rng.uniform(0.5, 2))
+
+
+def make_corpus(degree, size, seed=0, spacing=1.0, complex_pairs=0, center=0.0):
+    """Builds a list of polynomials of the same degree
+
+    Parameters
+    ----------
+    degree : int
+        Degree of every polynomial
+    size : int
+        Number of polynomials
+    seed : int
+        Seed of the random generator, the same seed gives the same corpus
+    spacing : float
+        Average distance between neighbouring real roots
+    complex_pairs : int
+        Number of complex conjugate root pairs per polynomial
+    center : float
+        Mean of the real roots of every polynomial
+
+    Returns
+    -------
+    corpus : list
+        List of coefficient lists
+    """
+
+    rng = np.random.default_rng(seed)
+    return [random_polynomial(degree, rng, spacing, complex_pairs, center) for _ in range(size)]
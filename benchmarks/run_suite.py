@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+""" Benchmark suite of the three Newton implementations
+
+This script runs Newton_Raphson.py, newton_argparse.py and the Newton class
+of Q2/NewtonClassLog.py, with each of their engines, over a generated
+corpus (see corpus.py) spanning the degree, the spacing of the real roots
+and, for the engines which solve many polynomials per call, the batch size.
+For every case it records:
+
+    * the wall time per polynomial, the best of --repeat runs
+    * the mean number of iterations per polynomial, where the engine reports them
+    * the number of polynomials without a root found
+    * the peak memory allocated during one run, measured by tracemalloc in a
+      separate run so it does not slow the timed ones
+
+The results are saved as JSON, by default to benchmarks/results/<commit>.json,
+and two result files are compared with --compare, which exits with status 1
+when a case got slower by more than --threshold.
+
+Usage:
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --compare benchmarks/results/old.json benchmarks/results/new.json
+
+This file contains the following functions:
+
+    * cases - The implementations and engines, with the function running each one
+    * run_case - Times one case on one corpus
+    * run_suite - Runs every case over the corpus grid
+    * compare - Prints the changes between two result files
+    * main - the main function of the script
+
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import Newton_Raphson
+import newton_argparse
+import sturm
+from corpus import make_corpus
+from solver_metrics import METRICS
+
+# The Newton class lives in Q2, next to it's logging configuration
+sys.path.append(os.path.join(ROOT, 'Q2'))
+from NewtonClassLog import Newton
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+DEGREES = [3, 6, 10, 16]
+SPACINGS = [0.1, 1.0, 10.0]
+BATCH_SIZES = [1, 32, 1024]
+STOP_VALUE = 1e-10
+MAX_ITER = 100
+
+
+def _raphson_solve(coef):
+    """Newton_Raphson.solve, with it's own Sturm check and seed"""
+    return Newton_Raphson.solve(coef, MAX_ITER, STOP_VALUE)
+
+
+def _argparse_solve(coef):
+    """newton_argparse.solve_one, the single problem mode of it's command line"""
+    return newton_argparse.solve_one({'coef': coef, 'stop_value': STOP_VALUE, 'max_iter': MAX_ITER}).get('root')
+
+
+def _scalar_solve(solve):
+    """Case running the solver of Newton_Raphson.py or newton_argparse.py on every polynomial"""
+
+    def run(corpus, batch, counted):
+        failures = 0
+        _output = io.StringIO()
+        with contextlib.redirect_stdout(_output):
+            for coef in corpus:
+                try:
+                    root = solve(coef)
+                except Exception:
+                    root = None
+                failures += root is None
+        # Both solvers print every iteration, as their command lines do, the counted run counts the printed ones
+        return _output.getvalue().count('Iteration: ') if counted else None, failures
+
+    return run
+
+
+def _batch_newton(corpus, batch, counted):
+    """Case running newton_argparse.solve_chunk, the --batch mode, on chunks of batch polynomials"""
+
+    iterations = 0
+    failures = 0
+    problems = [(None, {'coef': coef, 'stop_value': STOP_VALUE, 'max_iter': MAX_ITER}) for coef in corpus]
+    for i in range(0, len(problems), batch):
+        for result in newton_argparse.solve_chunk(problems[i:i + batch]):
+            iterations += result['iterations']
+            failures += result['root'] is None
+    return iterations, failures
+
+
+def _class_solve(method):
+    """Case running Newton(...).solve() of Q2/NewtonClassLog.py with one iteration method"""
+
+    def run(corpus, batch, counted):
+        iterations = 0
+        failures = 0
+        for coef in corpus:
+            newton = Newton(MAX_ITER, STOP_VALUE, coef, trace='off', method=method)
+            try:
+                root = newton.solve()
+            except Exception:
+                root = None
+            failures += root is None
+            iterations += newton.iterations
+        return iterations, failures
+
+    return run
+
+
+def _class_solve_all(engine):
+    """Case running Newton(...).solve_all() of Q2/NewtonClassLog.py with one engine"""
+
+    def run(corpus, batch, counted):
+        failures = 0
+        for coef in corpus:
+            try:
+                Newton(MAX_ITER, STOP_VALUE, coef, trace='off').solve_all(engine)
+            except Exception:
+                failures += 1
+        # The engines report their iterations to the metrics, which are only enabled in the counted run
+        return METRICS.counters.get('iterations') if counted else None, failures
+
+    return run
+
+
+def cases():
+    """The implementations and engines, with the function running each one
+
+    Returns
+    -------
+    cases : list
+        List of (implementation, engine, batched, function) tuples. The
+        function is called with (corpus, batch, counted) and returns the total
+        number of iterations (None when not counted or not reported) and the
+        number of polynomials without a root found. Only the batched cases
+        depend on the batch size.
+    """
+
+    return [('Newton_Raphson', 'newton', False, _scalar_solve(_raphson_solve)),
+            ('newton_argparse', 'newton', False, _scalar_solve(_argparse_solve)),
+            ('newton_argparse', 'batch', True, _batch_newton),
+            ('NewtonClassLog', 'newton', False, _class_solve('newton')),
+            ('NewtonClassLog', 'halley', False, _class_solve('halley')),
+            ('NewtonClassLog', 'laguerre', False, _class_solve('laguerre')),
+            ('NewtonClassLog', 'sturm', False, _class_solve_all('sturm')),
+            ('NewtonClassLog', 'eigen', False, _class_solve_all('eigen')),
+            ('NewtonClassLog', 'deflation', False, _class_solve_all('deflation'))]
+
+
+def _run_once(function, corpus, batch, counted):
+    """One run from an empty Sturm cache, with the printing of the solvers silenced"""
+
+    sturm.STURM_CACHE.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(corpus, batch, counted)
+
+
+def run_case(function, corpus, batch=1, repeat=3):
+    """Times one case on one corpus
+
+    Parameters
+    ----------
+    function : function
+        The function of the case, see cases
+    corpus : list
+        List of coefficient lists
+    batch : int
+        Number of polynomials per call of the batched cases
+    repeat : int
+        Number of timed runs, the fastest one is kept
+
+    Returns
+    -------
+    result : dict
+        The keys 'seconds' (per polynomial), 'iterations' (mean per
+        polynomial, None when the engine does not report them), 'failures'
+        and 'peak_memory' (bytes)
+    """
+
+    # The counted run is also the memory run, neither one is timed
+    _enabled = METRICS.enabled
+    METRICS.reset()
+    METRICS.enable()
+    tracemalloc.start()
+    try:
+        iterations, failures = _run_once(function, corpus, batch, True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        METRICS.reset()
+        if not _enabled:
+            METRICS.disable()
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run_once(function, corpus, batch, False)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return {'seconds': best / len(corpus), 'iterations': None if iterations is None else iterations / len(corpus),
+            'failures': failures, 'peak_memory': peak}
+
+
+def run_suite(size=128, repeat=3, degrees=DEGREES, spacings=SPACINGS, batch_sizes=BATCH_SIZES, only=None,
+              progress=None):
+    """Runs every case over the corpus grid
+
+    Parameters
+    ----------
+    size : int
+        Number of polynomials per corpus, the batched cases use at least one batch
+    repeat : int
+        Number of timed runs per case, see run_case
+    degrees, spacings, batch_sizes : list
+        The grid of the corpus, see corpus.make_corpus
+    only : list
+        Names of the implementations to run, None runs every one
+    progress : function, optional
+        Called with every result as soon as it is measured
+
+    Returns
+    -------
+    results : list
+        One dictionary per case and corpus with the keys 'implementation',
+        'engine', 'degree', 'spacing', 'batch', 'size' and the ones of run_case
+    """
+
+    results = []
+    for degree in degrees:
+        for spacing in spacings:
+            for implementation, engine, batched, function in cases():
+                if only and implementation not in only:
+                    continue
+                for batch in (batch_sizes if batched else [1]):
+                    _size = max(size, batch) if batched else size
+                    # The same seed for every case, so they all solve the same polynomials
+                    corpus = make_corpus(degree, _size, seed=degree, spacing=spacing)
+                    result = dict(implementation=implementation, engine=engine, degree=degree, spacing=spacing,
+                                  batch=batch, size=_size, **run_case(function, corpus, batch, repeat))
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return results
+
+
+def _git(*args):
+    """Output of a git command in the repository, None when git is not available"""
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    """The commit and the versions the results were measured with"""
+
+    return {'commit': _git('rev-parse', '--short', 'HEAD'),
+            'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform()}
+
+
+def _key(result):
+    return result['implementation'], result['engine'], result['degree'], result['spacing'], result['batch']
+
+
+def compare(old_file, new_file, threshold=0.1):
+    """Prints the changes between two result files
+
+    Parameters
+    ----------
+    old_file, new_file : str
+        Paths of result files written by main
+    threshold : float
+        Relative slowdown above which a case counts as a regression
+
+    Returns
+    -------
+    regressions : int
+        Number of cases slower by more than threshold
+    """
+
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    print(f"Old: {old['environment']['commit']} ({old['environment']['date']}), "
+          f"new: {new['environment']['commit']} ({new['environment']['date']})")
+    print('Implementation -- engine -- degree -- spacing -- batch -- old (us) -- new (us) -- ratio '
+          '-- iterations -- memory (KiB)')
+
+    previous = {_key(result): result for result in old['results']}
+    regressions = 0
+    for result in new['results']:
+        before = previous.pop(_key(result), None)
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        slower = ratio > 1 + threshold
+        regressions += slower
+        _iterations = ('-' if result['iterations'] is None or before['iterations'] is None
+                       else f"{before['iterations']:.2f} -> {result['iterations']:.2f}")
+        print(f"{result['implementation']:>15} -- {result['engine']:>9} -- {result['degree']:>3} -- "
+              f"{result['spacing']:>6} -- {result['batch']:>5} -- {before['seconds'] * 1e6:>9.1f} -- "
+              f"{result['seconds'] * 1e6:>9.1f} -- {ratio:>5.2f} -- {_iterations} -- "
+              f"{before['peak_memory'] / 1024:.0f} -> {result['peak_memory'] / 1024:.0f}"
+              f"{'  REGRESSION' if slower else ''}")
+    if previous:
+        print(f'{len(previous)} case(s) of the old file are not in the new one')
+    print(f'\n{regressions} case(s) slower by more than {threshold:.0%}')
+    return regressions
+
+
+def main():
+    """
+    Main function to run the benchmark suite, or to compare two result files
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--size', action='store', type=int, default=128,
+                           help='number of polynomials per corpus')
+    my_parser.add_argument('--repeat', action='store', type=int, default=3,
+                           help='number of timed runs per case, the fastest one is kept')
+    my_parser.add_argument('--degrees', action='store', type=int, nargs='+', default=DEGREES)
+    my_parser.add_argument('--spacings', action='store', type=float, nargs='+', default=SPACINGS)
+    my_parser.add_argument('--batch-sizes', action='store', type=int, nargs='+', default=BATCH_SIZES)
+    my_parser.add_argument('--only', action='store', type=str, nargs='+', default=None,
+                           choices=['Newton_Raphson', 'newton_argparse', 'NewtonClassLog'],
+                           help='run only these implementations')
+    my_parser.add_argument('--output', action='store', type=str, default=None,
+                           help='JSON file of the results, benchmarks/results/<commit>.json when not given')
+    my_parser.add_argument('--compare', action='store', type=str, nargs=2, default=None, metavar=('OLD', 'NEW'),
+                           help='compare two result files instead of running the suite')
+    my_parser.add_argument('--threshold', action='store', type=float, default=0.1,
+                           help='relative slowdown counted as a regression by --compare')
+    args = my_parser.parse_args()
+
+    if args.compare is not None:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    environment = _environment()
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        _name = f"{environment['commit'] or 'unknown'}{'-dirty' if environment['dirty'] else ''}.json"
+        output = os.path.join(RESULTS_DIR, _name)
+
+    print('Implementation -- engine -- degree -- spacing -- batch -- time (us) -- iterations -- failures '
+          '-- memory (KiB)')
+
+    def progress(result):
+        _iterations = '-' if result['iterations'] is None else f"{result['iterations']:.2f}"
+        print(f"{result['implementation']:>15} -- {result['engine']:>9} -- {result['degree']:>3} -- "
+              f"{result['spacing']:>6} -- {result['batch']:>5} -- {result['seconds'] * 1e6:>9.1f} -- "
+              f"{_iterations:>6} -- {result['failures']:>4} -- {result['peak_memory'] / 1024:>8.1f}", flush=True)
+
+    results = run_suite(args.size, args.repeat, args.degrees, args.spacings, args.batch_sizes, args.only, progress)
+    config = {'size': args.size, 'repeat': args.repeat, 'stop_value': STOP_VALUE, 'max_iter': MAX_ITER}
+    with open(output, 'w') as f:
+        json.dump({'environment': environment, 'config': config, 'results': results}, f, indent=2)
+    print(f'\nSaved to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+""" Warm started continuation for families of polynomials
+
+This script allows the user to find the real roots of a family of
+polynomials whose coefficients vary smoothly with a parameter, like the
+constant term of [1, 0, 36] swept from 36 down to -36. The points are solved
+in order and every root is followed from one point to the next:
+
+    * the seed of a root is it's previous value moved along the secant of
+      the last step (predictor), Newton's method polishes it (corrector), so
+      a smooth sweep takes one to three iterations per root and point
+    * when a corrector does not converge within CORRECTOR_ITER iterations,
+      or two roots end up on the same value, or a root jumps to another
+      branch, the root is lost. If the Sturm sequence still counts the lost
+      roots as real, the parameter step is halved (it grows again after a
+      successful step), otherwise they met another root and left the real
+      line as a complex pair, and they are dropped. Roots which are still
+      lost after MAX_HALVINGS halvings between two points are dropped as
+      well, and found again by the restart below if they are still real
+    * the Sturm sequence of every point tells when new real roots appear,
+      the point is then solved from scratch
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * coefficient_family - The family of polynomials sweeping one coefficient
+    * sweep - Solves a family of polynomials over a list of parameter values
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import math
+
+import numpy as np
+
+import iteration_methods
+import sturm
+from polynomial import Polynomial
+
+# Maximum number of iterations of a corrector before the step is halved
+CORRECTOR_ITER = 8
+# Maximum number of halvings of the parameter step between two points before a lost root is dropped
+MAX_HALVINGS = 10
+
+
+def coefficient_family(coef, index):
+    """The family of polynomials sweeping one coefficient
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    index : int
+        Index of the swept coefficient in coef, -1 is the constant term
+
+    Returns
+    -------
+    family : function
+        Returns the coefficient list of the polynomial for a parameter value
+    """
+
+    coef = [float(c) for c in coef]
+
+    def family(param):
+        _coef = list(coef)
+        _coef[index] = param
+        return _coef
+
+    return family
+
+
+def _correct(poly, seeds, stop_value, max_iter, method):
+    """Polishes every seed, returns the roots (None where lost) and the iterations used"""
+
+    roots = []
+    iterations = 0
+    for seed in seeds:
+        root, used = iteration_methods.solve(poly, seed, stop_value, max_iter, method)
+        roots.append(root)
+        iterations += used
+    return roots, iterations
+
+
+def _lost(previous, predicted, roots, stop_value):
+    """Index of the roots which did not converge, merged or jumped to another branch"""
+
+    _lost_roots = set(i for i, root in enumerate(roots) if root is None)
+    _order = sorted((root, i) for i, root in enumerate(roots) if root is not None)
+    for (a, i), (b, j) in zip(_order, _order[1:]):
+        # Two roots on the same value are a double root, which is only counted once
+        if b - a < math.sqrt(stop_value):
+            _lost_roots.add(j)
+    for i, root in enumerate(roots):
+        if root is not None and i not in _lost_roots:
+            # The root must stay nearer to it's own prediction than to the previous value of any other root
+            _own = abs(root - predicted[i])
+            if any(abs(root - other) < _own for j, other in enumerate(previous) if j != i):
+                _lost_roots.add(i)
+    return _lost_roots
+
+
+def sweep(family, params, stop_value=1e-12, max_iter=100, method='newton', roots=None):
+    """Solves a family of polynomials over a list of parameter values
+
+    Parameters
+    ----------
+    family : function
+        Returns the coefficient list of the polynomial for a parameter value,
+        see coefficient_family
+    params : list
+        The parameter values, in the order of the sweep
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations of the solves from scratch
+    method : str
+        One of 'newton', 'halley' and 'laguerre' (see iteration_methods.py)
+    roots : list
+        The real roots at the first parameter value, found from scratch when not given
+
+    Returns
+    -------
+    points : list
+        One dictionary per parameter value with the keys 'param', 'roots'
+        (sorted), 'iterations' (of the correctors), 'steps' (the number of
+        parameter steps taken to reach the point) and 'restart' (True when
+        the point was solved from scratch)
+    """
+
+    points = []
+    velocity = []
+    previous_param = None
+    for param in params:
+        param = float(param)
+        iterations = 0
+        steps = 0
+        if roots is None or previous_param is None:
+            roots, velocity = _restart(family(param), stop_value, max_iter, roots)
+            points.append({'param': param, 'roots': sorted(roots), 'iterations': 0, 'steps': 0, 'restart': True})
+            previous_param = param
+            continue
+
+        # Marching from the previous point to this one, with halved steps where a root is lost
+        at = previous_param
+        step = step_max = param - previous_param
+        halvings = 0
+        while at != param:
+            _h = step if abs(step) < abs(param - at) else param - at
+            _predicted = [root + v * _h for root, v in zip(roots, velocity)]
+            _poly = Polynomial(family(at + _h))
+            _new, _used = _correct(_poly, _predicted, stop_value, min(CORRECTOR_ITER, max_iter), method)
+            iterations += _used
+            _lost_roots = _lost(roots, _predicted, _new, stop_value)
+            # Lost roots may only be dropped once the Sturm sequence shows that they left the real line.
+            # When it counts more roots than are followed new ones appeared, they are found at the restart below
+            if _lost_roots and halvings < MAX_HALVINGS and len(roots) - len(_lost_roots) < sturm.count_roots(
+                    sturm.sturm_sequence(family(at + _h))) <= len(roots):
+                step = _h / 2
+                halvings += 1
+                continue
+            # The roots lost with enough left, or still lost at the smallest step, have turned complex
+            _kept = [i for i in range(len(roots)) if i not in _lost_roots]
+            velocity = [(_new[i] - roots[i]) / _h for i in _kept]
+            roots = [_new[i] for i in _kept]
+            at = at + _h if abs(_h) < abs(param - at) else param
+            steps += 1
+            if abs(_h) < abs(step_max):
+                step = 2 * _h
+
+        # New real roots come out of complex pairs, the Sturm sequence counts them
+        _coef = family(param)
+        restart = sturm.count_roots(sturm.sturm_sequence(_coef)) > len(roots)
+        if restart:
+            roots, velocity = _restart(_coef, stop_value, max_iter, roots, velocity)
+        points.append({'param': param, 'roots': sorted(roots), 'iterations': iterations, 'steps': steps,
+                       'restart': restart})
+        previous_param = param
+    return points
+
+
+def _restart(coef, stop_value, max_iter, roots=None, velocity=None):
+    """Solves a point from scratch, the roots already followed keep their velocity"""
+
+    roots = list(roots or [])
+    velocity = list(velocity or [0.0] * len(roots))
+    for root in sturm.real_roots(coef, stop_value, max_iter):
+        if all(abs(root - other) >= math.sqrt(stop_value) for other in roots):
+            roots.append(root)
+            velocity.append(0.0)
+    return roots, velocity
+
+
+def main():
+    """
+    Main function to sweep one coefficient of the polynomial of a json file
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--index', action='store', type=int, default=-1,
+                           help='index of the swept coefficient, -1 is the constant term')
+    my_parser.add_argument('--stop', action='store', type=float, required=True,
+                           help='last value of the swept coefficient, the first one is the value in the file')
+    my_parser.add_argument('--points', action='store', type=int, default=101)
+    my_parser.add_argument('--method', action='store', type=str, default='newton',
+                           choices=list(iteration_methods.METHODS))
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    family = coefficient_family(data['coef'], args.index)
+    params = np.linspace(float(data['coef'][args.index]), args.stop, args.points)
+    points = sweep(family, params, data['stop_value'], data['max_iter'], args.method)
+
+    # The same points solved one by one from the old fixed start x0 = 2, for comparison
+    cold = sum(iteration_methods.solve(Polynomial(family(point['param'])), 2, data['stop_value'], data['max_iter'],
+                                       args.method)[1] for point in points)
+    warm = sum(point['iterations'] for point in points if not point['restart'])
+    warm_solves = sum(len(point['roots']) for point in points if not point['restart'])
+
+    for point in points:
+        print(f"{point['param']:>12.5f} -- roots {[round(root, 5) for root in point['roots']]} -- "
+              f"{point['iterations']} iterations in {point['steps']} steps{' (restart)' if point['restart'] else ''}")
+    print(f'\nWarm started: {warm / max(warm_solves, 1):.2f} iterations per root and point, '
+          f'from x0 = 2: {cold / len(points):.2f} iterations per point')
+
+
+if __name__ == '__main__':
+    main()
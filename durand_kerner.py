@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+""" Simultaneous iteration for all the complex roots
+
+This script allows the user to find every root, real and complex, of a Nth
+degree polynomial. All the n root estimates z are updated at once with NumPy
+complex arrays, by one of the following methods:
+
+    * durand_kerner - z = z - f(z) / prod(z - zj) over the other estimates zj (Weierstrass), quadratic convergence
+    * aberth - z = z - w / (1 - w * sum(1 / (z - zj))) with w = f(z) / f'(z), cubic convergence
+
+The estimates start on a circle of the radius of the root bound, and a root
+stops moving once it's correction is below the stopping criteria. An
+estimate whose correction is not finite (an overflow, a zero derivative or
+two equal estimates) restarts on the circle at another angle and is never
+taken as converged. Many polynomials of the same degree are iterated
+together as the rows of 2-D arrays, the problems of a batch are grouped by
+degree.
+
+The input is the one of Q2/data.json ("coef", "max_iter", "stop_value").
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the class DurandKerner and the following functions:
+
+    * initial_estimates - Starting estimates on a circle around the origin
+    * simultaneous_roots - All the roots of many polynomials of the same degree
+    * solve_batch - All the roots of a list of problems given in the format of data.json
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from newton_trace import IterationTrace
+from seeding import root_bounds
+from solver_metrics import METRICS
+
+METHODS = ('aberth', 'durand_kerner')
+
+# Angle added to the starting angle of an estimate each time it restarts, in radians
+RESTART_ANGLE = 2.4
+
+# Names of the values recorded per iteration in the trace
+FIELDS = ("Roots converged", "Largest abs(Function(z))", "Mean abs(Function(z))", "The residual error")
+
+
+def initial_estimates(coefs):
+    """Starting estimates on a circle around the origin
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, one polynomial of degree n per row, the
+        leading coefficients non zero
+
+    Returns
+    -------
+    z : numpy.ndarray
+        Complex array of shape (rows, n), evenly spread on the circle of the
+        root bound of each row. The angles are shifted so that no estimate is
+        real, and the real polynomials do not keep their estimates conjugate.
+    """
+
+    n = coefs.shape[1] - 1
+    angles = 2 * np.pi * np.arange(n) / n + 0.4
+    return root_bounds(coefs)[:, None] * np.exp(1j * angles)[None, :]
+
+
+def simultaneous_roots(coefs, stop_value, max_iter, method='aberth', record=None):
+    """All the roots of many polynomials of the same degree
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, one polynomial of degree n >= 1 per row
+    stop_value : float
+        A root has converged when the absolute value of it's correction is below stop_value
+    max_iter : int
+        Maximum number of iterations
+    method : str
+        One of 'aberth' and 'durand_kerner'
+    record : function, optional
+        Called with (converged, largest abs(f(z)), mean abs(f(z)), largest
+        correction) on every iteration, over all the rows
+
+    Returns
+    -------
+    roots, iterations, converged : numpy.ndarray
+        The (rows, n) complex roots, the number of iterations used per row and
+        whether every root of the row converged
+    """
+
+    if method not in METHODS:
+        raise Exception(f"The method must be one of {METHODS}")
+    coefs = np.asarray(coefs, dtype=np.float64)
+    coefs = coefs / coefs[:, :1]
+    n_poly, n = coefs.shape[0], coefs.shape[1] - 1
+    start = initial_estimates(coefs)
+    z = start
+    done = np.zeros((n_poly, n), dtype=bool)
+    iterations = np.zeros(n_poly, dtype=np.int64)
+    # The diagonal of the pairwise differences is left out of the products and sums
+    diagonal = np.eye(n, dtype=bool)[None, :, :]
+
+    for i in range(max_iter):
+        active = ~done.all(axis=1)
+        if not active.any():
+            break
+        iterations[active] += 1
+
+        # Horner's method on every estimate at once, with the derivative for Aberth's method,
+        # an estimate far out may overflow, which gives a step that is not finite (see below)
+        if METRICS.enabled:
+            METRICS.count('evaluations', z.size)
+        fz = np.repeat(coefs[:, :1].astype(complex), n, axis=1)
+        dfz = np.zeros_like(fz)
+        with np.errstate(over='ignore', invalid='ignore'):
+            for j in range(1, n + 1):
+                dfz = dfz * z + fz
+                fz = fz * z + coefs[:, j:j + 1]
+
+        differences = z[:, :, None] - z[:, None, :]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            if method == 'durand_kerner':
+                step = fz / np.where(diagonal, 1, differences).prod(axis=2)
+            else:
+                ratio = fz / dfz
+                step = ratio / (1 - ratio * np.where(diagonal, 0, 1 / differences).sum(axis=2))
+        # An overflow, a zero derivative or two equal estimates give no usable step, the
+        # estimate restarts on the circle at a new angle instead of being taken as converged
+        restart = ~np.isfinite(step) & ~done
+        step = np.where(np.isfinite(step), step, 0)
+        step[done] = 0
+        z = np.where(restart, start * np.exp(1j * RESTART_ANGLE * (i + 1)), z - step)
+        error = np.abs(step)
+        done |= (error < stop_value) & ~restart
+
+        if record is not None:
+            _residual = np.abs(fz)
+            record(float(done.sum()), float(_residual.max()), float(_residual.mean()), float(error.max()))
+
+    return z, iterations, done.all(axis=1)
+
+
+def solve_batch(problems, method='aberth'):
+    """All the roots of a list of problems given in the format of data.json
+
+    Parameters
+    ----------
+    problems : list
+        List of dictionaries with the keys 'coef', 'max_iter' and 'stop_value'
+    method : str
+        One of 'aberth' and 'durand_kerner'
+
+    Returns
+    -------
+    roots : list
+        The list of complex roots of each problem, None where the iteration did not converge
+    """
+
+    roots = [None] * len(problems)
+    groups = {}
+    for i, problem in enumerate(problems):
+        coef = np.trim_zeros(np.asarray(problem['coef'], dtype=np.float64), 'f')
+        if len(coef) < 2:
+            roots[i] = []
+            continue
+        groups.setdefault(len(coef), []).append((i, coef))
+
+    # One lockstep iteration per degree, with the strictest criteria and the most iterations of the group
+    for members in groups.values():
+        _index = [i for i, _ in members]
+        stop_value = min(problems[i]['stop_value'] for i in _index)
+        max_iter = max(problems[i]['max_iter'] for i in _index)
+        z, _, converged = simultaneous_roots(np.array([coef for _, coef in members]), stop_value, max_iter, method)
+        for i, row, ok in zip(_index, z, converged):
+            roots[i] = row.tolist() if ok else None
+    return roots
+
+
+class DurandKerner:
+    """It represents the simultaneous iteration for all the roots of a polynomial
+         It has the following methods
+                *solve(): Finds every complex root and prints them out
+                *data: The recorded iterations as a list of dictionaries
+                *solve_batch(): Finds every root of many problems at once
+    """
+
+    def __init__(self, max_iter: int, stop_value: float, coef: list, trace: str = 'full', trace_size: int = 100,
+                 trace_sink=None, method: str = 'aberth'):
+        self.coef = coef
+        self.stop_value = stop_value
+        self.max_iter = max_iter
+        self.deg = len(np.trim_zeros(np.asarray(coef, dtype=np.float64), 'f')) - 1
+        # The trace keeps one record per iteration, for all the roots together
+        self.trace = IterationTrace(trace, trace_size, trace_sink, FIELDS)
+        if method not in METHODS:
+            raise Exception(f"The method must be one of {METHODS}")
+        self.method = method
+        self.iterations = 0
+
+    def solve(self):
+        """
+        Finds every complex root of the given polynomial and prints them out
+
+        Returns
+        -------
+        roots : list
+            The complex roots, sorted by real part
+        """
+        if self.deg < 1:
+            raise Exception("The polynomial has no roots")
+        _record = self.trace.record if self.trace.level != 'off' else None
+        _coef = np.trim_zeros(np.asarray(self.coef, dtype=np.float64), 'f')
+        _z, _iterations, _converged = simultaneous_roots(_coef[None, :], self.stop_value, self.max_iter,
+                                                         self.method, _record)
+        self.iterations = int(_iterations[0])
+        if not _converged[0]:
+            raise Exception("Exceeded maximum iterations")
+        roots = sorted(_z[0].tolist(), key=lambda root: (root.real, root.imag))
+        print(f'The roots of the equation are : {[complex(round(r.real, 5), round(r.imag, 5)) for r in roots]}')
+        return roots
+
+    @property
+    def data(self):
+        """The kept iterations of the trace, as a list of dictionaries of rounded values"""
+        return [{key: round(value, 5) for key, value in zip(FIELDS, values)} for _, values in self.trace.records()]
+
+    @staticmethod
+    def solve_batch(problems, method='aberth'):
+        """Finds every root of many problems at once, see solve_batch"""
+        return solve_batch(problems, method)
+
+    def __str__(self):
+        return str(self.trace)
+
+
+def main():
+    """
+    Main function to find every root of the polynomial of a json file
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--method', action='store', type=str, default='aberth', choices=METHODS)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    solver = DurandKerner(data['max_iter'], data['stop_value'], data['coef'], method=args.method)
+    solver.solve()
+    print(solver)
+
+
+if __name__ == '__main__':
+    main()
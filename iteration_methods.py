@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+""" Newton, Halley and Laguerre iterations for finding a real root
+
+This script allows the user to pick the iteration used to find a root of a
+Nth degree polynomial. The higher order methods use the fused evaluation of
+the function and it's derivatives (see polynomial.Polynomial), so each of
+their iterations costs about one Horner pass, but they need fewer iterations:
+
+    * newton - x = xn - f/f', quadratic convergence
+    * halley - x = xn - 2ff' / (2f'^2 - ff''), cubic convergence
+    * laguerre - x = xn - n / (G +- sqrt((n-1)(nH - G^2))), cubic convergence and a much larger basin
+
+This file contains the following functions:
+
+    * newton_step - One iteration of Newton's method
+    * halley_step - One iteration of Halley's method
+    * laguerre_step - One iteration of Laguerre's method
+    * solve - Iterates one of the methods until the stopping criteria is met
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+from polynomial import Polynomial
+
+
+def newton_step(poly, xn):
+    """One iteration of Newton's method
+
+    Parameters
+    ----------
+    poly : polynomial.Polynomial
+        The polynomial whose root is searched for
+    xn : float
+        The current approximation
+
+    Returns
+    -------
+    fxn, dfxn, nxn : float
+        The function and derivative values at xn and the next approximation,
+        nxn is None when the step is undefined (zero derivative)
+    """
+
+    fxn, dfxn = poly.value_and_derivative(xn)
+    if dfxn == 0:
+        return fxn, dfxn, None
+    return fxn, dfxn, xn - fxn / dfxn
+
+
+def halley_step(poly, xn):
+    """One iteration of Halley's method, see newton_step"""
+
+    fxn, dfxn, d2fxn = poly.value_and_derivative(xn, second=True)
+    _denominator = 2 * dfxn * dfxn - fxn * d2fxn
+    if _denominator == 0:
+        return fxn, dfxn, None
+    return fxn, dfxn, xn - 2 * fxn * dfxn / _denominator
+
+
+def _sqrt(value):
+    """Square root in the number type of value
+
+    A Decimal root is taken at the precision of the current context, a
+    Fraction root is only as precise as a float
+    """
+
+    if isinstance(value, Decimal):
+        return value.sqrt()
+    if isinstance(value, Fraction):
+        return Fraction(math.sqrt(value))
+    return math.sqrt(value)
+
+
+def laguerre_step(poly, xn):
+    """One iteration of Laguerre's method, see newton_step
+
+    Only real iterates are followed: a negative value under the square root
+    (the nearest roots are complex) is taken as zero.
+    """
+
+    fxn, dfxn, d2fxn = poly.value_and_derivative(xn, second=True)
+    if fxn == 0:
+        return fxn, dfxn, xn
+    n = poly.deg
+    _g = dfxn / fxn
+    _h = _g * _g - d2fxn / fxn
+    _root = _sqrt(max((n - 1) * (n * _h - _g * _g), 0 * _g))
+    # The sign is chosen to make the denominator as large as possible, which gives the smaller step
+    _denominator = _g + _root if _g >= 0 else _g - _root
+    if _denominator == 0:
+        return fxn, dfxn, None
+    return fxn, dfxn, xn - n / _denominator
+
+
+METHODS = {
+    'newton': newton_step,
+    'halley': halley_step,
+    'laguerre': laguerre_step,
+}
+
+
+def solve(poly, x0, stop_value, max_iter, method='newton', record=None):
+    """Iterates one of the methods until abs(x(n+1)-x(n)) < stop_value
+
+    Parameters
+    ----------
+    poly : polynomial.Polynomial
+        The polynomial whose root is searched for
+    x0 : float
+        Initial guess
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations
+    method : str
+        One of 'newton', 'halley' and 'laguerre'
+    record : function, optional
+        Called with (xn, fxn, dfxn, error) on every iteration
+
+    Returns
+    -------
+    root, iterations : float, int
+        The root found (None if the step was undefined or the maximum number of
+        iterations was exceeded) and the number of iterations used
+    """
+
+    step = METHODS[method]
+    xn = x0
+    for i in range(max_iter):
+        fxn, dfxn, _nxn = step(poly, xn)
+        if _nxn is None:
+            return None, i + 1
+        error = abs(xn - _nxn)
+        if record is not None:
+            record(xn, fxn, dfxn, error)
+        if error < stop_value:
+            return _nxn, i + 1
+        xn = _nxn
+    return None, max_iter
+
+
+def main():
+    """
+    Main function to find a root with each of the methods
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--x0', action='store', type=float, default=2)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    poly = Polynomial([float(c) for c in data['coef']])
+    for method in METHODS:
+        root, iterations = solve(poly, args.x0, data['stop_value'], data['max_iter'], method)
+        print(f'{method:<9}: root {root} after {iterations} iterations')
+
+
+if __name__ == '__main__':
+    main()
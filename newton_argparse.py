@@ -9,6 +9,14 @@ environment you are running this script in:
     * math - To perform mathematical operations such as finding the factorial
     * argparse - CLI module to import a json file for the variables
     * json - To parse json files
+    * concurrent.futures - To spread many polynomials across worker processes (--workers)
+    * newton_batch - To solve chunks of polynomials in lockstep (--batch mode)
+    * sturm - To count the real roots with the cached Sturm sequence
+    * polynomial - To evaluate the function and it's derivative in one pass
+    * seeding - To start Newton's method near a real root instead of x0 = 2
+    * sparse_polynomial - To solve polynomials given by their non zero terms ("terms" instead of "coef")
+    * root_engines - To find every real root with an automatically selected engine (--all mode)
+    * result_cache - To reuse the results of problems solved in earlier runs (--cache)
 
 This script requires that `math` be installed within the Python
 environment you are running this script in.
@@ -16,21 +24,41 @@ environment you are running this script in.
 This file contains the following function:
 
     * eval_horner - This function allows the user to evaluate a given polynomial in O(n) time
-    * poly_div - This function allows the user to perform synthetic division on polynomials
     * poly_eval - Evaluating a given polynomial and returns it's sign for x= infinity and -infinity
     * no_real_roots - This function allows the user to find the number of real roots
     * newton - Approximate solution of f(x)=0 by Newton's method.
+    * collect_problems - Reads the problems of many JSON files, JSONL files and directories
+    * solve_chunk - Solves a chunk of problems in lockstep, run inside the worker processes
+    * split_cached - Splits a chunk into the results found in the cache and the problems left to solve
+    * merge_cached - Puts the solved problems back between the cached results and caches them
+    * solve_parallel - Solves every problem across a process pool and writes the results in input order
+    * solve_one - Solves one problem in debug mode
+    * run - Solves the problems of the command line arguments
     * main - the main function of the script
 
 """
 
 # Built-in library
 import math
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # External libraries
 import argparse
 import json
 
+# Local modules
+from newton_batch import SPARSE_ERROR, read_problems, solve_batch
+from polynomial import Polynomial
+from result_cache import DEFAULT_FILE, MAX_ENTRIES, ResultCache, cache_key
+from root_engines import real_roots
+from seeding import initial_guess, initial_guess_sparse
+from sparse_polynomial import SparsePolynomial
+from sturm import cached_sturm_sequence, count_roots
+
 
 def eval_horner(coef, x):
     """Horner's method for polynomial evaluation
@@ -58,49 +86,6 @@ def eval_horner(coef, x):
     return result
 
 
-def poly_div(dividend, divisor):
-    """Polynomial synthetic division
-
-    This function allows the user to perform synthetic division on polynomials and return the
-    quotient and remainder, which will further be used for finding the sturm's sequence
-
-    Parameters
-    ----------
-    dividend : list
-        The list which contains the coefficient value of the dividend polynomial.
-        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
-
-    divisor : list
-        The list which contains the coefficient value of the divisor polynomial.
-
-    Returns
-    -------
-    result : list
-        list of coefficients of the quotient and remainder
-
-    """
-
-    out = list(dividend)
-    normalizer = divisor[0]
-    for i in range(len(dividend) - (len(divisor) - 1)):
-        # For general polynomial division (when polynomials are non-monic),
-        # we need to normalize by dividing the coefficient with the divisor's first coefficient
-        out[i] /= normalizer
-        coef = out[i]
-        if coef != 0:
-            # In synthetic division, we always skip the first coefficient of the divisor,
-            # because it's only used to normalize the dividend coefficients
-            for j in range(1, len(divisor)):
-                out[i + j] += -divisor[j] * coef
-
-    # The resulting out contains both the quotient and the remainder,
-    # the remainder being the size of the divisor (the remainder has necessarily
-    # the same degree as the divisor since it's what we couldn't divide from the dividend),
-    # so we compute the index where this separation is, and return the quotient and remainder.
-    separator = -(len(divisor) - 1)
-    return out[:separator], out[separator:]  # return quotient, remainder.
-
-
 def poly_eval(coef):
     """Evaluating a given polynomial and returns it's sign
 
@@ -140,7 +125,7 @@ def poly_eval(coef):
     return result_pos, result_neg
 
 
-def no_real_roots(coef, dfun_terms):
+def no_real_roots(coef, exact=False):
     """Find the number of real roots using sturm's theorem
 
     This function allows the user to find the number of real roots
@@ -151,8 +136,8 @@ def no_real_roots(coef, dfun_terms):
     coef : coefficients -> List
         The list which contains the coefficient values.
         A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
-    dfun_terms : coefficients -> List
-        The list which contains the coefficient values of the derivative of the given polynomial.
+    exact : boolean
+        When set to True the Sturm sequence is built over the integers
 
     Returns
     -------
@@ -165,16 +150,14 @@ def no_real_roots(coef, dfun_terms):
     """
 
     # Sturm list stores the sequence of sturm terms
-    sturm = [coef, dfun_terms]
-
     # The first two terms of strum's sequence are the function itself and it's derivative
     # The 3rd term is found out by dividing the first term with the second term
     # And multiplied by -1 and so on for the remaining terms until the polynomial has only one term
-    while len(sturm[-1]) != 1:
-        remainder = poly_div(sturm[-2], sturm[-1])[-1]
-        for i in range(len(remainder)):
-            remainder[i] = -1 * remainder[i]
-        sturm.append(remainder)
+    # The sequence is built once per polynomial and then reused from the cache
+    sturm = cached_sturm_sequence(coef, exact)
+    if exact:
+        # The int terms can be too large for the float evaluation at infinity
+        return count_roots(sturm)
 
     # Eva evaluates all the sturm terms with x= infinity and -infinity and generates a list of sign changes
     # in the strum's sequence
@@ -195,7 +178,7 @@ def no_real_roots(coef, dfun_terms):
     return c2 - c1
 
 
-def newton(f, df, e, n, x0, debug=False):
+def newton(f, df, e, n, x0, debug=False, fdf=None):
     """Approximate solution of f(x)=0 by Newton's method.
 
     Parameters
@@ -216,6 +199,8 @@ def newton(f, df, e, n, x0, debug=False):
             * Function value
             * Gradient value
             * Residual error
+    fdf : function, optional
+        Returns f(x) and df(x) together in one pass, used instead of f and df when given.
 
     Returns
     -------
@@ -230,8 +215,11 @@ def newton(f, df, e, n, x0, debug=False):
 
     xn = x0
     for i in range(0, n):
-        fxn = f(xn)
-        dfxn = df(xn)
+        if fdf is not None:
+            fxn, dfxn = fdf(xn)
+        else:
+            fxn = f(xn)
+            dfxn = df(xn)
         if dfxn == 0:
             print('Zero derivative. No solution found.')
             return None
@@ -254,46 +242,324 @@ def newton(f, df, e, n, x0, debug=False):
     return None
 
 
-def main():
+def collect_problems(paths):
+    """Reads the problems of many JSON files, JSONL files and directories
+
+    Parameters
+    ----------
+    paths : list
+        Paths of JSON files holding one problem, JSONL files holding one problem
+        per line, or directories whose *.json and *.jsonl files are read in
+        sorted order
+
+    Returns
+    -------
+    result : generator
+        Yields (source, problem) tuples in input order, the source being the
+        file name (with the line number for JSONL files)
     """
-    Main function to Check the balance, using the count of the opening and closing braces
+
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                     if name.endswith(('.json', '.jsonl'))]
+            yield from collect_problems(files)
+        elif path.endswith('.jsonl'):
+            for line, problem in enumerate(read_problems(path), 1):
+                yield f'{path}:{line}', problem
+        else:
+            with open(path) as f:
+                yield path, json.load(f)
+
+
+def solve_chunk(chunk, x0=None):
+    """Solves a chunk of problems in lockstep
+
+    This function runs inside the worker processes, a whole chunk is sent
+    per task so the pickling overhead is paid once per chunk.
+
+    Parameters
+    ----------
+    chunk : list
+        List of (source, problem) tuples, the problems given by their 'terms' are rejected
+    x0 : float
+        Initial guess for every problem, None seeds each one from it's root bounds
+
+    Returns
+    -------
+    results : list
+        One dictionary per problem with the keys 'source', 'root' and 'iterations'
     """
 
-    my_parser = argparse.ArgumentParser(allow_abbrev=False)
-    my_parser.add_argument('--file', action='store', type=str, required=True)
+    for source, problem in chunk:
+        if 'terms' in problem:
+            raise Exception(f'{source}: {SPARSE_ERROR}')
+    roots, iterations, converged = solve_batch([problem for _, problem in chunk], x0)
+    return [{"source": source, "root": float(root) if ok else None, "iterations": int(iters)}
+            for (source, _), root, iters, ok in zip(chunk, roots, iterations, converged)]
 
-    args = my_parser.parse_args()
 
-    with open(args.file) as f:
-        data = json.load(f)
+def split_cached(chunk, x0=None, cache=None):
+    """Splits a chunk into the results found in the cache and the problems left to solve
+
+    Parameters
+    ----------
+    chunk : list
+        List of (source, problem) tuples
+    x0 : float
+        Initial guess for every problem, part of the cache keys
+    cache : result_cache.ResultCache
+        The cache to look the problems up in, None solves every problem
+
+    Returns
+    -------
+    keys, cached, misses : list
+        The cache key of every problem (None without a cache), the cached
+        result of every problem (None for the misses) and the chunk of the
+        problems which were not found
+    """
+
+    if cache is None:
+        return [None] * len(chunk), [None] * len(chunk), chunk
+    keys = [cache_key(problem, mode='batch', x0=x0) for _, problem in chunk]
+    cached = cache.get_many(keys)
+    return keys, cached, [item for item, result in zip(chunk, cached) if result is None]
+
+
+def merge_cached(chunk, keys, cached, solved, cache=None):
+    """Puts the solved problems back between the cached results and caches them
+
+    Parameters
+    ----------
+    chunk : list
+        List of (source, problem) tuples
+    keys, cached : list
+        The keys and cached results returned by split_cached
+    solved : list
+        The results of solve_chunk for the misses of split_cached, in order
+    cache : result_cache.ResultCache
+        The cache the solved results are stored in
+
+    Returns
+    -------
+    results : list
+        One dictionary per problem of the chunk with the keys 'source', 'root' and 'iterations'
+    """
+
+    solved = iter(solved)
+    results = []
+    for (source, _), result in zip(chunk, cached):
+        results.append({"source": source, **result} if result is not None else next(solved))
+    if cache is not None:
+        cache.put_many([(key, {"root": result["root"], "iterations": result["iterations"]})
+                        for key, result, hit in zip(keys, results, cached) if hit is None])
+    return results
+
+
+def solve_parallel(paths, output, workers=1, chunk_size=1000, x0=None, cache=None):
+    """Solves every problem across a process pool
+
+    At most two chunks per worker are in flight at a time, and the results are
+    written to the output file in input order as soon as they are ready.
+
+    Parameters
+    ----------
+    paths : list
+        Paths of the input files and directories, see collect_problems
+    output : str
+        Path of the JSONL file to write one result per line
+    workers : int
+        Number of worker processes, 1 solves in the current process
+    chunk_size : int
+        Number of problems sent to a worker per task
+    x0 : float
+        Initial guess for every problem, see solve_chunk
+    cache : result_cache.ResultCache
+        The problems found there are not solved again, only the others are
+        sent to the workers. The cache is only used by this process.
+
+    Returns
+    -------
+    count, seconds : int, float
+        Number of problems solved and the wall time taken
+    """
+
+    start = time.perf_counter()
+    problems = collect_problems(paths)
+    chunks = iter(lambda: list(itertools.islice(problems, chunk_size)), [])
+    count = 0
+    with open(output, 'w') as out:
+        if workers <= 1:
+            for chunk in chunks:
+                keys, cached, misses = split_cached(chunk, x0, cache)
+                results = merge_cached(chunk, keys, cached, solve_chunk(misses, x0) if misses else [], cache)
+                out.writelines(json.dumps(result) + '\n' for result in results)
+                count += len(results)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk in itertools.chain(chunks, [None]):
+                    if chunk is not None:
+                        keys, cached, misses = split_cached(chunk, x0, cache)
+                        future = executor.submit(solve_chunk, misses, x0) if misses else None
+                        pending.append((chunk, keys, cached, future))
+                    # Waiting on the oldest chunk keeps the output in input order
+                    while pending and (chunk is None or len(pending) >= 2 * workers):
+                        _chunk, keys, cached, future = pending.popleft()
+                        results = merge_cached(_chunk, keys, cached, future.result() if future else [], cache)
+                        out.writelines(json.dumps(result) + '\n' for result in results)
+                        count += len(results)
+    return count, time.perf_counter() - start
+
+
+def solve_one(data, x0=None, all_roots=False, engine='sturm', exact=False):
+    """Solves one problem in debug mode
+
+    Parameters
+    ----------
+    data : dict
+        Problem in the format of data.json, with either 'coef' or 'terms'
+    x0 : float
+        Initial guess, seeded near a real root from the root bounds when None
+    all_roots : boolean
+        When set to True every real root is found with the given engine
+    engine : str
+        Engine used to find every real root, see root_engines.real_roots
+    exact : boolean
+        When set to True the real roots are counted with the exact integer Sturm sequence
+
+    Returns
+    -------
+    result : dict
+        {'root': root}, {'roots': roots} with all_roots, or {'error': message}
+        when the polynomial has no real roots
+    """
 
-    coef = data['coef']
-    deg = len(coef) - 1
     max_iter = data['max_iter']
     stop_value = data['stop_value']
-    print('\n-------------------------------------------------\n')
+
+    if 'terms' in data:
+        # A sparse polynomial is solved term by term, it's terms mostly tell
+        # if it has a real root without the dense Sturm sequence
+        poly = SparsePolynomial(data['terms'])
+        if not poly.has_real_root(exact):
+            return {'error': "The polynomial has no real roots"}
+        x0 = x0 if x0 is not None else initial_guess_sparse(poly)
+        return {'root': newton(poly, poly.derivative, stop_value, max_iter, x0, True, poly.value_and_derivative)}
+
+    coef = data['coef']
+    deg = len(coef) - 1
 
     # Converting the string values of coefficients to float value
     coef = list(map((lambda x: float(x)), coef))
 
-    # Finding the derivative of the given function
-    dfun_terms = [coef[i] * (deg - i) for i in range(deg)]
-
-    # Defining the function which returns the evaluated value
-    fun = lambda x, coe=coef: sum((coe[i] * (x ** (deg - i)) for i in range(deg + 1)))
-    dfun = lambda x, coe=coef: sum((coe[i] * (deg - i) * (x ** (deg - i - 1)) for i in range(deg)))
+    # Defining the polynomial, which evaluates the function and it's derivative in one Horner pass
+    poly = Polynomial(coef)
 
     # Checking if real roots exist, It is to be noted that a polynomial of odd degree must have
     # atleast one real root, hence we need to check for existence of real roots only for even number degree
     if deg % 2 == 0:
-        no_real = no_real_roots(coef, dfun_terms)
+        no_real = no_real_roots(coef, exact)
         if no_real == 0:
-            raise Exception("The polynomial has no real roots")
+            return {'error': "The polynomial has no real roots"}
+
+    if all_roots:
+        return {'roots': real_roots(coef, stop_value, max_iter, engine, exact=exact)}
+
+    # Finding the root from the given initial value, or from the seed of the sign scan inside the root bounds
+    x0 = x0 if x0 is not None else initial_guess(coef)
+    return {'root': newton(poly, poly.derivative, stop_value, max_iter, x0, True, poly.value_and_derivative)}
+
+
+def run(args, cache=None):
+    """Solves the problems of the command line arguments
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed arguments of main
+    cache : result_cache.ResultCache
+        The results found there are printed without solving the problem again
+    """
+
+    # Many problems (or more than one worker) always go through the batch mode
+    if (args.batch or args.workers > 1 or len(args.file) > 1 or os.path.isdir(args.file[0])
+            or args.file[0].endswith('.jsonl')):
+        count, seconds = solve_parallel(args.file, args.output, args.workers, args.chunk_size, args.x0, cache)
+        print(f'Solved {count} polynomials in {seconds:.3f} s with {args.workers} worker(s): '
+              f'{count / seconds:.0f} polynomials per second, results written to {args.output}')
+        return
+
+    with open(args.file[0]) as f:
+        data = json.load(f)
 
-    # Finding the root with initial value of 2
-    x0 = 2
-    root = newton(fun, dfun, stop_value, max_iter, x0, True)
-    print(f'The root of the equation is : {root}')
+    print('\n-------------------------------------------------\n')
+
+    key = None
+    result = None
+    if cache is not None:
+        key = cache_key(data, mode='all' if args.all else 'root', x0=args.x0,
+                        engine=args.engine if args.all else None, exact=args.exact or None)
+        result = cache.get(key)
+    if result is None:
+        result = solve_one(data, args.x0, args.all, args.engine, args.exact)
+        if cache is not None:
+            cache.put(key, result)
+
+    if 'error' in result:
+        raise Exception(result['error'])
+    if 'roots' in result:
+        print(f'The roots of the equation are : {result["roots"]}')
+    else:
+        print(f'The root of the equation is : {result["root"]}')
+
+
+def main():
+    """
+    Main function to Check the balance, using the count of the opening and closing braces
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, nargs='+', required=True,
+                           help='JSON files, JSONL files with one polynomial per line, or directories of them')
+    my_parser.add_argument('--batch', action='store_true',
+                           help='solve every polynomial of --file in lockstep chunks instead of one in debug mode')
+    my_parser.add_argument('--output', action='store', type=str, default='roots.jsonl',
+                           help='JSONL file the roots and iteration counts are streamed to in --batch mode')
+    my_parser.add_argument('--chunk-size', action='store', type=int, default=1000,
+                           help='number of polynomials solved in lockstep per task in --batch mode')
+    my_parser.add_argument('--workers', action='store', type=int, default=1,
+                           help='number of worker processes in --batch mode')
+    my_parser.add_argument('--all', action='store_true',
+                           help='find every real root instead of a single one')
+    my_parser.add_argument('--engine', action='store', type=str, default='sturm',
+                           choices=['auto', 'sturm', 'eigen'],
+                           help='engine used in --all mode')
+    my_parser.add_argument('--exact', action='store_true',
+                           help='count the real roots with the exact integer Sturm sequence')
+    my_parser.add_argument('--x0', action='store', type=float, default=None,
+                           help='initial guess, seeded near a real root from the root bounds when not given')
+
+    my_parser.add_argument('--cache', action='store', type=str, nargs='?', const=DEFAULT_FILE, default=None,
+                           help='reuse the results of the problems solved in earlier runs, stored in this SQLite file')
+    my_parser.add_argument('--cache-size', action='store', type=int, default=MAX_ENTRIES,
+                           help='number of results kept in the cache, the least recently used ones are evicted')
+    my_parser.add_argument('--cache-stats', action='store_true',
+                           help='print the hit rate of the cache given with --cache')
+
+    args = my_parser.parse_args()
+    # The statistics only report on a cache, they do not turn one on
+    if args.cache_stats and args.cache is None:
+        my_parser.error('--cache-stats needs --cache')
+
+    cache = ResultCache(args.cache, args.cache_size) if args.cache else None
+    try:
+        run(args, cache)
+    finally:
+        if cache is not None:
+            if args.cache_stats:
+                print(cache)
+            cache.close()
 
 
 if __name__ == '__main__':
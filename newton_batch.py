@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+""" Batched Newton-Raphson method for many polynomials at once
+
+This script allows the user to find a real root of thousands of polynomials
+per call. The coefficients are packed into a 2-D array and the Newton update
+runs for every polynomial in lockstep, lanes that converged (or failed) are
+masked out of the following iterations.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * pack_coefficients - Packs a list of coefficient lists into a 2-D array
+    * newton_batch - Approximate solution of f(x)=0 for every row of a 2-D coefficient array
+    * solve_batch - Solves a list of problems given in the format of data.json
+    * read_problems - Reads problems from a JSONL file lazily
+    * solve_jsonl - Solves a JSONL file chunk by chunk and streams the results to a JSONL file
+    * main - the main function of the script
+
+"""
+
+import argparse
+import itertools
+import json
+
+import numpy as np
+
+from seeding import initial_guess_batch
+from solver_metrics import METRICS
+
+# The batch modes pack every polynomial densely, a sparse one of high degree would not fit
+SPARSE_ERROR = "The batch mode needs the dense 'coef', a polynomial given by it's 'terms' is solved on it's own"
+
+
+def pack_coefficients(coefs):
+    """Packs the coefficients of many polynomials into a 2-D array
+
+    Polynomials of lower degree are padded with leading zeros, which does not
+    change their value or derivative in Horner's method.
+
+    Parameters
+    ----------
+    coefs : list
+        List of coefficient lists. A polynomial 2x^2 + 3x -1 is given as [2, 3, -1]
+
+    Returns
+    -------
+    result : numpy.ndarray
+        Array of shape (number of polynomials, maximum degree + 1)
+    """
+
+    width = max(len(coef) for coef in coefs)
+    packed = np.zeros((len(coefs), width))
+    for row, coef in enumerate(coefs):
+        packed[row, width - len(coef):] = coef
+    return packed
+
+
+def newton_batch(coefs, stop_value, max_iter, x0=None):
+    """Approximate solution of f(x)=0 by Newton's method for many polynomials
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, one polynomial per row (see pack_coefficients)
+    stop_value : float, numpy.ndarray
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value, either one value for
+        all polynomials or one value per polynomial
+    max_iter : int, numpy.ndarray
+        Maximum number of iterations, either one value or one value per polynomial
+    x0 : float, numpy.ndarray
+        Initial guess, either one value or one value per polynomial. With None
+        each polynomial starts from the seed of it's sign scan (see seeding.py)
+
+    Returns
+    -------
+    roots, iterations, converged : numpy.ndarray
+        The root found for each polynomial (nan where no root was found), the
+        number of iterations used and whether the iteration converged. A lane
+        fails on a zero derivative or when it exceeds it's maximum iterations.
+    """
+
+    coefs = np.asarray(coefs, dtype=np.float64)
+    n_poly = coefs.shape[0]
+    stop_value = np.broadcast_to(np.asarray(stop_value, dtype=np.float64), (n_poly,))
+    max_iter = np.broadcast_to(np.asarray(max_iter, dtype=np.int64), (n_poly,))
+
+    if x0 is None:
+        x0 = initial_guess_batch(coefs)
+    xn = np.array(np.broadcast_to(np.asarray(x0, dtype=np.float64), (n_poly,)))
+    roots = np.full(n_poly, np.nan)
+    iterations = np.zeros(n_poly, dtype=np.int64)
+    converged = np.zeros(n_poly, dtype=bool)
+
+    # Indices of the lanes which are still iterating
+    active = np.flatnonzero(max_iter > 0)
+    while active.size:
+        _coefs = coefs[active]
+        _x = xn[active]
+
+        # Fused Horner pass for the value and the derivative of every active lane
+        if METRICS.enabled:
+            METRICS.count('evaluations', active.size)
+        fxn = _coefs[:, 0].copy()
+        dfxn = np.zeros(active.size)
+        for j in range(1, coefs.shape[1]):
+            dfxn = dfxn * _x + fxn
+            fxn = fxn * _x + _coefs[:, j]
+
+        zero_derivative = dfxn == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nxn = _x - fxn / dfxn
+        error = np.abs(_x - nxn)
+        iterations[active] += 1
+        xn[active] = nxn
+
+        done = (error < stop_value[active]) & ~zero_derivative
+        roots[active[done]] = nxn[done]
+        converged[active[done]] = True
+
+        # Masking out the converged lanes and the ones which failed
+        keep = ~done & ~zero_derivative & (iterations[active] < max_iter[active])
+        active = active[keep]
+
+    return roots, iterations, converged
+
+
+def solve_batch(problems, x0=None):
+    """Solves a list of problems given in the format of data.json
+
+    Parameters
+    ----------
+    problems : list
+        List of dictionaries with the keys 'coef', 'max_iter' and 'stop_value',
+        the sparse 'terms' are rejected as they would be packed densely
+    x0 : float
+        Initial guess for every polynomial, None seeds each one (see newton_batch)
+
+    Returns
+    -------
+    roots, iterations, converged : numpy.ndarray
+        See newton_batch
+    """
+
+    for problem in problems:
+        if 'coef' not in problem:
+            raise Exception(SPARSE_ERROR if 'terms' in problem else "Every problem needs the key 'coef'")
+    coefs = pack_coefficients([problem['coef'] for problem in problems])
+    stop_value = np.array([problem['stop_value'] for problem in problems], dtype=np.float64)
+    max_iter = np.array([problem['max_iter'] for problem in problems], dtype=np.int64)
+    return newton_batch(coefs, stop_value, max_iter, x0)
+
+
+def read_problems(file):
+    """Reads problems from a JSONL file, one problem per line
+
+    Parameters
+    ----------
+    file : str
+        Path of the JSONL file
+
+    Returns
+    -------
+    result : generator
+        Yields one dictionary per non-empty line
+    """
+
+    with open(file) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def solve_jsonl(input_file, output_file, chunk_size=10000, x0=None):
+    """Solves a JSONL file of problems and streams the results to a JSONL file
+
+    Only one chunk of problems is held in memory at a time, and the results
+    are written in the order of the input as soon as a chunk is solved.
+
+    Parameters
+    ----------
+    input_file : str
+        Path of the JSONL file with one problem per line
+    output_file : str
+        Path of the JSONL file to write one result per line
+    chunk_size : int
+        Number of polynomials solved in lockstep per call of newton_batch
+    x0 : float
+        Initial guess for every polynomial, None seeds each one (see newton_batch)
+
+    Returns
+    -------
+    count : int
+        Number of problems solved
+    """
+
+    count = 0
+    problems = read_problems(input_file)
+    with open(output_file, 'w') as out:
+        while True:
+            chunk = list(itertools.islice(problems, chunk_size))
+            if not chunk:
+                break
+            roots, iterations, converged = solve_batch(chunk, x0)
+            out.writelines(json.dumps({"root": float(root) if ok else None, "iterations": int(iters)}) + '\n'
+                           for root, iters, ok in zip(roots, iterations, converged))
+            count += len(chunk)
+    return count
+
+
+def main():
+    """
+    Main function to solve a JSONL file of polynomials
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--output', action='store', type=str, required=True)
+    my_parser.add_argument('--chunk-size', action='store', type=int, default=10000)
+    my_parser.add_argument('--x0', action='store', type=float, default=None,
+                           help='initial guess, seeded from the root bounds when not given')
+
+    args = my_parser.parse_args()
+
+    count = solve_jsonl(args.file, args.output, args.chunk_size, args.x0)
+    print(f'Solved {count} polynomials, results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+""" Long running solver service
+
+This script allows the user to keep a Newton solver running in the
+background, so a solve does not pay the interpreter startup, the imports and
+the logging configuration every time. The server listens on a Unix socket or
+on a localhost TCP port, and every connection is a stream of JSONL lines:
+
+    * request - one problem per line in the format of data.json ('coef',
+      'stop_value' and 'max_iter'), with an optional 'id', the sparse 'terms'
+      are not accepted
+    * response - one line per request, in the order of the requests, with the
+      keys 'source' (the 'id' of the request, or it's line number on the
+      connection starting at 1), 'root' and 'iterations', or 'source' and
+      'error' for a request which could not be read
+
+The lines received together are solved together in lockstep (see
+newton_batch.py). Small batches are solved right away in the server process,
+which keeps the latency of a single request well below a millisecond, larger
+ones are split into chunks solved on a pool of worker processes started (and
+warmed up) with the server. The next batches of a connection are read and
+solved while the results of the earlier ones are sent.
+
+This script requires that `asyncio` be installed within the Python
+environment you are running this script in.
+
+This file contains the class SolverServer and the following functions:
+
+    * request - Sends problems to a running server and returns the results
+    * main - the main function of the script
+
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from newton_argparse import merge_cached, solve_chunk, split_cached
+from newton_batch import SPARSE_ERROR
+from result_cache import DEFAULT_FILE, MAX_ENTRIES, ResultCache
+from solver_metrics import METRICS
+
+# Batches of at most this many problems are solved in the server process, without a round trip to a worker
+INLINE_SIZE = 64
+# Number of bytes read from a connection at a time, the complete lines among them make a batch
+READ_SIZE = 1 << 16
+# Number of batches of a connection being solved while the results of an earlier one are sent
+PIPELINE = 8
+# The problem the workers solve once at startup, so the first request does not pay for the imports
+WARM_UP = {"coef": [1, 0, -2], "stop_value": 1e-12, "max_iter": 50}
+
+
+def _parse(line, source):
+    """Reads one request line, returns the (source, problem) tuple or a result with the error
+
+    The values are checked and converted here, coef to a list of floats, so a
+    malformed request gets it's own error and never fails the other requests
+    of it's batch.
+    """
+
+    try:
+        problem = json.loads(line)
+        if not isinstance(problem, dict):
+            raise ValueError('a request must be a JSON object')
+        source = problem.get('id', source)
+        if 'terms' in problem:
+            raise ValueError(SPARSE_ERROR)
+        for name in ('coef', 'stop_value', 'max_iter'):
+            if name not in problem:
+                raise ValueError(f"the key '{name}' is missing")
+        coef = problem['coef']
+        if not isinstance(coef, list) or not coef or not all(_is_number(c) for c in coef):
+            raise ValueError("'coef' must be a non empty list of finite numbers")
+        if not _is_number(problem['stop_value']):
+            raise ValueError("'stop_value' must be a finite number")
+        if not _is_number(problem['max_iter']) or problem['max_iter'] != int(problem['max_iter']):
+            raise ValueError("'max_iter' must be an integer")
+        problem = {"coef": [float(c) for c in coef], "stop_value": float(problem['stop_value']),
+                   "max_iter": int(problem['max_iter'])}
+    except (ValueError, OverflowError) as error:
+        return {"source": source, "error": str(error)}
+    return source, problem
+
+
+def _is_number(value):
+    """True for the finite int and float values of JSON, bool excluded"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class SolverServer:
+    """It represents the long running solver service
+         It has the following methods
+                *start(): Starts the worker pool and listens on a Unix socket or a TCP port
+                *serve_forever(): Serves the connections until the server is closed
+                *close(): Stops listening and shuts the worker pool down
+                *solve(): Solves a batch of (source, problem) tuples
+    """
+
+    def __init__(self, workers=os.cpu_count(), chunk_size=1000, inline_size=INLINE_SIZE, x0=None, cache=None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.inline_size = inline_size
+        self.x0 = x0
+        self.cache = cache
+        self.executor = None
+        self.server = None
+        self.address = None
+        self.connections = 0
+        self.problems = 0
+
+    async def start(self, unix=None, host='127.0.0.1', port=8765):
+        """Starts the worker pool and listens on a Unix socket or a TCP port
+
+        Parameters
+        ----------
+        unix : str
+            Path of the Unix socket, when given host and port are not used
+        host : str
+            Address of the TCP port, keep it on localhost as there is no authentication
+        port : int
+            TCP port, 0 picks a free one
+        """
+
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            _loop = asyncio.get_running_loop()
+            # One warm up task per worker, each worker imports numpy and the solvers before the first request
+            await asyncio.gather(*(_loop.run_in_executor(self.executor, solve_chunk, [(None, WARM_UP)])
+                                   for _ in range(self.workers)))
+        else:
+            solve_chunk([(None, WARM_UP)])
+        if unix is not None:
+            if os.path.exists(unix):
+                os.remove(unix)
+            self.server = await asyncio.start_unix_server(self._serve, path=unix)
+            self.address = unix
+        else:
+            self.server = await asyncio.start_server(self._serve, host=host, port=port)
+            self.address = self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        """Serves the connections until the server is closed"""
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        """Stops listening and shuts the worker pool down"""
+        if self.server is not None:
+            self.server.close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def solve(self, items):
+        """Solves a batch of (source, problem) tuples
+
+        Parameters
+        ----------
+        items : list
+            List of (source, problem) tuples, and of results with an 'error'
+            which are passed through
+
+        Returns
+        -------
+        results : list
+            One dictionary per item, in order, see solve_chunk
+        """
+
+        chunk = [item for item in items if isinstance(item, tuple)]
+        try:
+            keys, cached, misses = split_cached(chunk, self.x0, self.cache)
+            if len(misses) <= self.inline_size or self.executor is None:
+                solved = solve_chunk(misses, self.x0) if misses else []
+            else:
+                _loop = asyncio.get_running_loop()
+                _parts = [misses[i:i + self.chunk_size] for i in range(0, len(misses), self.chunk_size)]
+                _solved = await asyncio.gather(*(_loop.run_in_executor(self.executor, solve_chunk, part, self.x0)
+                                                 for part in _parts))
+                solved = list(itertools.chain.from_iterable(_solved))
+        except Exception:
+            # The problems were checked by _parse, if one still fails they are solved one by one, so only it fails
+            return [self._solve_one(item) if isinstance(item, tuple) else item for item in items]
+        results = iter(merge_cached(chunk, keys, cached, solved, self.cache))
+        self.problems += len(items)
+        METRICS.count('server_problems', len(items))
+        return [next(results) if isinstance(item, tuple) else item for item in items]
+
+    def _solve_one(self, item):
+        """Solves one (source, problem) tuple in the server process, an error only fails this item"""
+
+        try:
+            result = solve_chunk([item], self.x0)[0]
+        except Exception as error:
+            return {"source": item[0], "error": str(error)}
+        self.problems += 1
+        METRICS.count('server_problems', 1)
+        return result
+
+    async def _serve(self, reader, writer):
+        """Reads the batches of a connection and solves them while the results of the earlier ones are sent"""
+
+        self.connections += 1
+        pending = asyncio.Queue(PIPELINE)
+        sender = asyncio.create_task(self._send(pending, writer))
+        line_number = 0
+        _rest = b''
+        try:
+            while True:
+                try:
+                    data = await reader.read(READ_SIZE)
+                except ConnectionError:
+                    break
+                *lines, _rest = (_rest + data).split(b'\n') if data else (_rest, b'')
+                items = []
+                for line in lines:
+                    if line.strip():
+                        line_number += 1
+                        items.append(_parse(line, line_number))
+                if items:
+                    await pending.put(asyncio.ensure_future(self.solve(items)))
+                if not data or sender.done():
+                    break
+        finally:
+            await pending.put(None)
+            await sender
+            writer.close()
+
+    @staticmethod
+    async def _send(pending, writer):
+        """Writes the results of the batches of a connection in order"""
+
+        try:
+            while True:
+                batch = await pending.get()
+                if batch is None:
+                    break
+                results = await batch
+                writer.write(''.join(json.dumps(result) + '\n' for result in results).encode())
+                await writer.drain()
+        except ConnectionError:
+            # The client went away, the batches still queued are dropped
+            while batch is not None:
+                batch = await pending.get()
+                if batch is not None:
+                    batch.cancel()
+
+    def __str__(self):
+        return (f"Solver server on {self.address}: {self.workers} worker(s), "
+                f"{self.connections} connection(s), {self.problems} problem(s) solved")
+
+
+async def request(problems, unix=None, host='127.0.0.1', port=8765):
+    """Sends problems to a running server and returns the results
+
+    Parameters
+    ----------
+    problems : list
+        Problems in the format of data.json
+    unix : str
+        Path of the Unix socket of the server, when given host and port are not used
+    host : str
+        Address of the TCP port of the server
+    port : int
+        TCP port of the server
+
+    Returns
+    -------
+    results : list
+        One dictionary per problem, in order, see SolverServer
+    """
+
+    if unix is not None:
+        reader, writer = await asyncio.open_unix_connection(unix, limit=READ_SIZE)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=READ_SIZE)
+
+    async def _write():
+        # Written while the results are read, so neither side waits on a full buffer
+        for problem in problems:
+            writer.write((json.dumps(problem) + '\n').encode())
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.create_task(_write())
+    results = [json.loads(line) async for line in reader]
+    await sender
+    writer.close()
+    return results
+
+
+def main():
+    """
+    Main function to run the solver server, or to send a JSONL file of polynomials to it
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--unix', action='store', type=str, default=None,
+                           help='path of the Unix socket, the TCP port is used when not given')
+    my_parser.add_argument('--host', action='store', type=str, default='127.0.0.1')
+    my_parser.add_argument('--port', action='store', type=int, default=8765)
+    my_parser.add_argument('--workers', action='store', type=int, default=os.cpu_count())
+    my_parser.add_argument('--chunk-size', action='store', type=int, default=1000,
+                           help='number of polynomials sent to a worker per task')
+    my_parser.add_argument('--inline-size', action='store', type=int, default=INLINE_SIZE,
+                           help='batches of at most this many polynomials are solved without the worker pool')
+    my_parser.add_argument('--x0', action='store', type=float, default=None,
+                           help='initial guess, seeded from the root bounds when not given')
+    my_parser.add_argument('--cache', action='store', type=str, nargs='?', const=DEFAULT_FILE, default=None,
+                           help='reuse the results of the problems solved earlier, stored in this SQLite file')
+    my_parser.add_argument('--send', action='store', type=str, default=None,
+                           help='send the polynomials of this JSONL file to a running server and print the results')
+
+    args = my_parser.parse_args()
+
+    if args.send is not None:
+        with open(args.send) as f:
+            problems = [json.loads(line) for line in f if line.strip()]
+        start = time.perf_counter()
+        results = asyncio.run(request(problems, args.unix, args.host, args.port))
+        seconds = time.perf_counter() - start
+        for result in results:
+            print(json.dumps(result))
+        print(f'Solved {len(results)} polynomials in {seconds * 1000:.3f} ms')
+        return
+
+    cache = ResultCache(args.cache, MAX_ENTRIES) if args.cache else None
+    server = SolverServer(args.workers, args.chunk_size, args.inline_size, args.x0, cache)
+
+    async def _run():
+        await server.start(args.unix, args.host, args.port)
+        print(f'Listening on {server.address} with {args.workers} worker(s)', flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if cache is not None:
+            cache.close()
+        print(server)
+
+
+if __name__ == '__main__':
+    main()
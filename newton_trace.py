@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+""" Bounded iteration trace of the Newton solver
+
+This script allows the Newton class to record it's iterations at one of
+the following levels:
+
+    * off - nothing is recorded
+    * summary - only the number of iterations and the last iteration are kept
+    * ring - the last N iterations are kept in a ring buffer
+    * full - every iteration is kept, or streamed to a sink (a file or a callback) when one is given
+
+Iterations are stored as four packed floats in an `array`, no dictionary
+is built while solving, values are only rounded when the trace is printed.
+
+This file contains the following class:
+
+    * IterationTrace - Records (Xn, Function(Xn), Derivative-Function(Xn), residual error) per iteration
+
+"""
+
+from array import array
+
+LEVELS = ('off', 'summary', 'ring', 'full')
+
+# Names of the recorded values, in the order they are stored
+FIELDS = ("Value of Xn", "Value of Function(Xn)", "Value of Derivative-Function(Xn)", "The residual error")
+
+
+class IterationTrace:
+    """It represents the recorded iterations of one solve
+         It has the following methods
+                *record(): Records one iteration
+                *clear(): Removes every recorded iteration
+                *records(): Returns the kept iterations as (iteration, values) tuples
+    """
+
+    def __init__(self, level='full', size=100, sink=None, fields=FIELDS):
+        if level not in LEVELS:
+            raise Exception(f"Trace level must be one of {LEVELS}")
+        if level == 'ring' and size < 1:
+            raise Exception("The ring trace must keep at least 1 iteration")
+        self.level = level
+        # Names of the four recorded values, used when the trace is printed
+        self.fields = fields
+        self.size = size
+        self.sink = sink
+        self.count = 0
+        self._values = array('d')
+        if level == 'ring':
+            self._values = array('d', bytes(8 * 4 * size))
+
+    def record(self, xn, fxn, dfxn, error):
+        """Records one iteration
+
+        Parameters
+        ----------
+        xn, fxn, dfxn, error : float
+            The point, the function and derivative values at it and the residual error
+        """
+
+        if self.level == 'off':
+            return
+        if self.level == 'ring':
+            _start = 4 * (self.count % self.size)
+            self._values[_start:_start + 4] = array('d', (xn, fxn, dfxn, error))
+        elif self.level == 'summary':
+            self._values = array('d', (xn, fxn, dfxn, error))
+        elif self.sink is None:
+            self._values.extend((xn, fxn, dfxn, error))
+        elif callable(self.sink):
+            self.sink(self.count, xn, fxn, dfxn, error)
+        else:
+            self.sink.write(f"{self.count},{xn!r},{fxn!r},{dfxn!r},{error!r}\n")
+        self.count += 1
+
+    def clear(self):
+        """Removes every recorded iteration"""
+        self.count = 0
+        if self.level != 'ring':
+            self._values = array('d')
+
+    def records(self):
+        """Returns the kept iterations
+
+        Returns
+        -------
+        result : list
+            List of (iteration, (xn, fxn, dfxn, error)) tuples, oldest first.
+            Iterations which were streamed to a sink are not kept.
+        """
+
+        if self.level == 'ring':
+            _first = max(0, self.count - self.size)
+            return [(i, tuple(self._values[4 * (i % self.size):4 * (i % self.size) + 4]))
+                    for i in range(_first, self.count)]
+        _first = self.count - len(self._values) // 4
+        return [(_first + i, tuple(self._values[4 * i:4 * i + 4])) for i in range(len(self._values) // 4)]
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        _blocks = []
+        if self.level == 'summary' and self.count:
+            _blocks.append(f"\nNumber of iterations: {self.count}")
+        for i, values in self.records():
+            _blocks.append(f"\nIteration: {i}\n")
+            _blocks.extend(f"{key}: {round(value, 5)}\n" for key, value in zip(self.fields, values))
+            _blocks.append("----------------------------------------")
+        return "".join(_blocks)
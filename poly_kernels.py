@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+""" Polynomial kernels for very high degree polynomials
+
+This script allows the user to evaluate, multiply and divide polynomials of
+degree in the thousands without a Python loop over the coefficients:
+
+    * Estrin's scheme evaluates the polynomial as a tree of pairs, every
+      level of the tree is one vectorized operation, so there are log2(n)
+      NumPy operations instead of the n steps of Horner's method
+    * the FFT multiplies two polynomials in O(n log n)
+    * the division multiplies the dividend with the power series inverse of
+      the divisor, found by Newton's iteration g = g(2 - bg), which doubles
+      the number of correct terms per step, so the division is O(n log n) too.
+      The inverse grows like the powers of the largest root of the divisor,
+      so it is only accurate for divisors whose roots are not much larger
+      than 1 in absolute value, poly_divmod_long is exact up to rounding
+
+The kernel is picked by degree from the thresholds of kernel_thresholds.json
+(written by benchmarks/bench_kernels.py), below them the plain kernels win.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * load_thresholds - Loads the kernel selection thresholds
+    * eval_estrin - Estrin's scheme for polynomial evaluation
+    * poly_mul_fft - Multiplies two polynomials with the FFT
+    * poly_mul - Multiplies two polynomials with the kernel picked by degree
+    * poly_inverse - Power series inverse by Newton's iteration
+    * poly_divmod_long - Long division with one vectorized step per quotient coefficient
+    * poly_divmod_newton - Division through the power series inverse of the divisor
+    * poly_divmod - Divides two polynomials with the kernel picked by degree
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel_thresholds.json')
+
+# Used when there is no thresholds file, measured with benchmarks/bench_kernels.py
+DEFAULT_THRESHOLDS = {
+    # Smallest degree evaluated with Estrin's scheme at a single point
+    'estrin_min_degree': 2048,
+    # Smallest degree of the shorter factor multiplied with the FFT
+    'fft_min_degree': 1024,
+    # Smallest dividend degree divided with NumPy instead of the Python synthetic division
+    'vector_div_min_degree': 64,
+    # Smallest quotient degree divided through the power series inverse
+    'newton_div_min_quotient': 256,
+}
+
+
+def load_thresholds(file=THRESHOLDS_FILE):
+    """Loads the kernel selection thresholds
+
+    Parameters
+    ----------
+    file : str
+        Path of the JSON file written by benchmarks/bench_kernels.py
+
+    Returns
+    -------
+    thresholds : dict
+        The thresholds of the file, missing keys take the default values
+    """
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        with open(file) as f:
+            thresholds.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    return thresholds
+
+
+THRESHOLDS = load_thresholds()
+
+
+def eval_estrin(coef, x):
+    """Estrin's scheme for polynomial evaluation
+
+    The coefficients are paired as (c0 + c1 x) + (c2 + c3 x) x^2 + ..., every
+    level halves the number of terms and squares the power of x, and all the
+    pairs of a level are computed in one vectorized operation.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient value.
+        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
+
+    x : int, float, numpy.ndarray
+        The values for which the function needs to be evaluated f(x).
+
+    Returns
+    -------
+    result : numpy.ndarray
+        f(x) for every x value (0-dimensional if a scalar was given)
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    terms = np.asarray(coef, dtype=np.float64)[::-1]
+    if x.ndim:
+        # Lowest degree first, one column of terms per x value
+        terms = np.multiply.outer(terms, np.ones(x.shape))
+        power = x
+    else:
+        power = float(x)
+    while len(terms) > 1:
+        pairs = terms[0:len(terms) - 1:2] + terms[1::2] * power
+        if len(terms) % 2:
+            # The odd term out moves up a level unchanged, which also keeps an
+            # overflowing power away from a padding zero
+            pairs = np.concatenate([pairs, terms[-1:]])
+        terms = pairs
+        if len(terms) > 1:
+            power = power * power
+    if len(terms) == 0:
+        return np.zeros(x.shape)
+    return np.asarray(terms[0])
+
+
+def poly_mul_fft(a, b):
+    """Multiplies two polynomials with the FFT
+
+    Parameters
+    ----------
+    a, b : list, numpy.ndarray
+        The coefficient values of the factors, leading coefficient first
+
+    Returns
+    -------
+    result : numpy.ndarray
+        The coefficient values of the product
+    """
+
+    size = len(a) + len(b) - 1
+    n_fft = 1 << (size - 1).bit_length()
+    return np.fft.irfft(np.fft.rfft(a, n_fft) * np.fft.rfft(b, n_fft), n_fft)[:size]
+
+
+def poly_mul(a, b, thresholds=None):
+    """Multiplies two polynomials with the kernel picked by degree
+
+    Parameters
+    ----------
+    a, b : list, numpy.ndarray
+        The coefficient values of the factors, leading coefficient first
+    thresholds : dict
+        Kernel selection thresholds, by default the ones of kernel_thresholds.json
+
+    Returns
+    -------
+    result : numpy.ndarray
+        The coefficient values of the product
+    """
+
+    thresholds = THRESHOLDS if thresholds is None else thresholds
+    if min(len(a), len(b)) - 1 >= thresholds['fft_min_degree']:
+        return poly_mul_fft(a, b)
+    return np.convolve(a, b)
+
+
+def poly_inverse(coef, n, thresholds=None):
+    """Power series inverse by Newton's iteration
+
+    Parameters
+    ----------
+    coef : list, numpy.ndarray
+        Coefficients of the power series, lowest degree first, coef[0] != 0
+    n : int
+        Number of terms of the inverse
+    thresholds : dict
+        Kernel selection thresholds, see poly_mul
+
+    Returns
+    -------
+    result : numpy.ndarray
+        The first n terms of 1 / coef, lowest degree first
+    """
+
+    coef = np.asarray(coef, dtype=np.float64)
+    inverse = np.array([1 / coef[0]])
+    terms = 1
+    while terms < n:
+        terms = min(2 * terms, n)
+        # g = g(2 - bg), the error term bg - 1 is zero up to the terms already known
+        error = -poly_mul(coef[:terms], inverse, thresholds)[:terms]
+        error[0] += 2
+        inverse = poly_mul(inverse, error, thresholds)[:terms]
+    return inverse
+
+
+def poly_divmod_long(dividend, divisor):
+    """Long division with one vectorized step per quotient coefficient
+
+    Parameters
+    ----------
+    dividend, divisor : list, numpy.ndarray
+        The coefficient values, leading coefficient first
+
+    Returns
+    -------
+    result : list
+        list of coefficients of the quotient and remainder, as sturm.poly_div
+    """
+
+    out = np.array(dividend, dtype=np.float64)
+    divisor = np.asarray(divisor, dtype=np.float64)
+    tail = divisor[1:]
+    if len(out) < len(divisor):
+        return [], out.tolist()
+    for i in range(len(out) - len(tail)):
+        out[i] /= divisor[0]
+        if out[i] != 0:
+            out[i + 1:i + len(divisor)] -= tail * out[i]
+    separator = len(out) - len(tail)
+    return out[:separator].tolist(), out[separator:].tolist()
+
+
+def poly_divmod_newton(dividend, divisor, thresholds=None):
+    """Division through the power series inverse of the divisor
+
+    Read backwards (lowest degree first) the quotient is the first terms of
+    the dividend times the inverse of the divisor, and the remainder is what
+    is left of the dividend after subtracting the quotient times the divisor.
+
+    Parameters
+    ----------
+    dividend, divisor : list, numpy.ndarray
+        The coefficient values, leading coefficient first
+    thresholds : dict
+        Kernel selection thresholds, see poly_mul
+
+    Returns
+    -------
+    result : list
+        list of coefficients of the quotient and remainder, as sturm.poly_div
+    """
+
+    dividend = np.asarray(dividend, dtype=np.float64)
+    divisor = np.asarray(divisor, dtype=np.float64)
+    n_quotient = len(dividend) - len(divisor) + 1
+    if n_quotient <= 0:
+        return [], dividend.tolist()
+    # A list of coefficients, leading first, is the reversed polynomial lowest degree first
+    quotient = poly_mul(dividend[:n_quotient], poly_inverse(divisor, n_quotient, thresholds),
+                        thresholds)[:n_quotient]
+    separator = len(dividend) - (len(divisor) - 1)
+    remainder = dividend[separator:] - poly_mul(quotient, divisor, thresholds)[separator:]
+    return quotient.tolist(), remainder.tolist()
+
+
+def poly_divmod(dividend, divisor, thresholds=None):
+    """Divides two polynomials with the kernel picked by degree
+
+    Parameters
+    ----------
+    dividend, divisor : list, numpy.ndarray
+        The coefficient values, leading coefficient first
+    thresholds : dict
+        Kernel selection thresholds, by default the ones of kernel_thresholds.json
+
+    Returns
+    -------
+    result : list
+        list of coefficients of the quotient and remainder, as sturm.poly_div
+    """
+
+    thresholds = THRESHOLDS if thresholds is None else thresholds
+    if len(dividend) - len(divisor) >= thresholds['newton_div_min_quotient']:
+        return poly_divmod_newton(dividend, divisor, thresholds)
+    return poly_divmod_long(dividend, divisor)
+
+
+def main():
+    """
+    Main function to evaluate and divide a polynomial with the fast kernels
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--x', action='store', type=float, default=2)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    coef = [float(c) for c in data['coef']]
+    deg = len(coef) - 1
+    d_coef = [coef[i] * (deg - i) for i in range(deg)]
+    print(f'f({args.x}) = {float(eval_estrin(coef, args.x))}')
+    quotient, remainder = poly_divmod(coef, d_coef)
+    print(f'f / df: quotient {quotient}, remainder {remainder}')
+
+
+if __name__ == '__main__':
+    main()
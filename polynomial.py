@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+""" Polynomial evaluation
+
+This script allows the user to evaluate a given polynomial together with
+it's derivatives in a single Horner pass, and to evaluate it (and it's
+derivative) for a whole array of x values in a single vectorized pass.
+Every evaluation point is counted in the 'evaluations' metric (see
+solver_metrics.py), whichever solver asks for it.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the class Polynomial, shared by the Newton solvers, and the following functions:
+
+    * as_points - Converts a list, NumPy array or raw buffer of x values to a float array
+    * eval_horner_vector - Evaluates a polynomial (and it's derivative) for many x values at once
+    * main - the main function of the script
+
+"""
+
+import numpy as np
+
+from poly_kernels import THRESHOLDS as KERNEL_THRESHOLDS, eval_estrin
+from solver_metrics import METRICS
+
+
+def as_points(x):
+    """Converts the given x values to a float array
+
+    Parameters
+    ----------
+    x : int, float, list, numpy.ndarray, bytes, bytearray, memoryview
+        The values for which the polynomial needs to be evaluated. Raw byte
+        buffers are read as packed float64 values without copying.
+
+    Returns
+    -------
+    result : numpy.ndarray
+        Array of float values (0-dimensional if a scalar was given)
+    """
+
+    if isinstance(x, (bytes, bytearray)):
+        return np.frombuffer(x, dtype=np.float64)
+    return np.asarray(x, dtype=np.float64)
+
+
+def eval_horner_vector(coef, x, derivative=False):
+    """Horner's method for polynomial evaluation over an array of x values
+
+    The loop runs over the coefficients only, every step updates all the
+    x values at once, so the cost is O(n) NumPy operations instead of
+    O(n * len(x)) Python operations.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient value.
+        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
+
+    x : list, numpy.ndarray, buffer
+        The values for which the function needs to be evaluated f(x).
+
+    derivative : boolean
+        When set to True the derivative f'(x) is computed in the same pass
+
+    Returns
+    -------
+    result : numpy.ndarray or tuple of numpy.ndarray
+        f(x) for every x value, or (f(x), f'(x)) when derivative is True
+    """
+
+    x = as_points(x)
+    if METRICS.enabled:
+        METRICS.count('evaluations', x.size)
+    result = np.full(x.shape, float(coef[0]))
+    if not derivative:
+        for i in range(1, len(coef)):
+            result *= x
+            result += coef[i]
+        return result
+
+    # The derivative follows the same recurrence as the value,
+    # using the value of the previous step as it's coefficient
+    d_result = np.zeros(x.shape)
+    for i in range(1, len(coef)):
+        d_result *= x
+        d_result += result
+        result *= x
+        result += coef[i]
+    return result, d_result
+
+
+class Polynomial:
+    """It represents a polynomial given by it's coefficients, leading coefficient first
+         It has the following methods
+                *__call__(): Evaluates f(x)
+                *derivative(): Evaluates f'(x)
+                *value_and_derivative(): Evaluates f(x), f'(x) and optionally f''(x) in one fused pass
+                *evaluate(): Evaluates f(x) (and f'(x)) for an array of x values
+    """
+
+    def __init__(self, coef):
+        # The coefficients are kept as given, so int, float, Fraction and Decimal all work
+        self.coef = list(coef)
+        self.deg = len(self.coef) - 1
+        self.dfun_terms = [self.coef[i] * (self.deg - i) for i in range(self.deg)]
+        # Float polynomials of high degree are evaluated at a point with Estrin's scheme (see poly_kernels.py)
+        self._estrin = (self.deg >= KERNEL_THRESHOLDS['estrin_min_degree']
+                        and all(isinstance(c, (int, float)) for c in self.coef))
+        self._arrays = None
+
+    def __call__(self, x):
+        if METRICS.enabled:
+            METRICS.count('evaluations')
+        if self._estrin and isinstance(x, (int, float)):
+            return float(eval_estrin(self._terms(0), x))
+        result = self.coef[0]
+        for c in self.coef[1:]:
+            result = (result * x) + c
+        return result
+
+    def derivative(self, x):
+        """Evaluates the derivative f'(x)"""
+        if METRICS.enabled:
+            METRICS.count('evaluations')
+        if self._estrin and isinstance(x, (int, float)):
+            return float(eval_estrin(self._terms(1), x))
+        result = self.dfun_terms[0] if self.dfun_terms else 0 * x
+        for c in self.dfun_terms[1:]:
+            result = (result * x) + c
+        return result
+
+    def value_and_derivative(self, x, second=False):
+        """Evaluates f(x), f'(x) and optionally f''(x) in one fused Horner pass
+
+        Each derivative follows the Horner recurrence of the value, using the
+        previous step of the lower derivative as it's coefficient, so the three
+        values cost one loop over the coefficients. Float polynomials of high
+        degree use one Estrin evaluation per value instead.
+
+        Parameters
+        ----------
+        x : int, float
+            The value for which the function needs to be evaluated
+        second : boolean
+            When set to True the second derivative is returned as well
+
+        Returns
+        -------
+        result : tuple
+            (f(x), f'(x)) or (f(x), f'(x), f''(x))
+        """
+
+        if METRICS.enabled:
+            METRICS.count('evaluations')
+        if self._estrin and isinstance(x, (int, float)):
+            return tuple(float(eval_estrin(self._terms(i), x)) for i in range(3 if second else 2))
+
+        fx = self.coef[0]
+        dfx = 0 * fx
+        if not second:
+            for c in self.coef[1:]:
+                dfx = dfx * x + fx
+                fx = fx * x + c
+            return fx, dfx
+
+        half_d2fx = dfx
+        for c in self.coef[1:]:
+            half_d2fx = half_d2fx * x + dfx
+            dfx = dfx * x + fx
+            fx = fx * x + c
+        return fx, dfx, 2 * half_d2fx
+
+    def _terms(self, order):
+        """Coefficients of f, f' and f'' as float arrays for eval_estrin, built on first use"""
+        if self._arrays is None:
+            _coef = np.asarray(self.coef, dtype=np.float64)
+            _dfun = np.asarray(self.dfun_terms, dtype=np.float64)
+            self._arrays = (_coef, _dfun, _dfun[:-1] * np.arange(self.deg - 1, 0, -1))
+        return self._arrays[order]
+
+    def evaluate(self, x, derivative=False):
+        """Evaluates the polynomial for an array of x values, see eval_horner_vector"""
+        return eval_horner_vector(self.coef, x, derivative)
+
+    def __repr__(self):
+        return f"Polynomial({self.coef})"
+
+
+def main():
+    """
+    Main function to evaluate the polynomial function over a range of values
+    """
+
+    coef = [1, 0, 0, -1, -10]
+    x = np.linspace(-2, 2, 5)
+
+    value, d_value = eval_horner_vector(coef, x, derivative=True)
+    for point, fx, dfx in zip(x, value, d_value):
+        print(f'x: {point} -- f(x): {fx} -- df(x): {dfx}')
+
+
+if __name__ == '__main__':
+    main()
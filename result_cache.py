@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+""" Persistent result cache for solved polynomials
+
+This script allows the user to keep the results of solved polynomials on
+disk, so a problem which was already solved in an earlier run is looked up
+instead of solved again. The results are stored in a SQLite file, keyed by
+the SHA-256 hash of the normalized inputs:
+
+    * the coefficients as floats without the leading zeros, or the merged and
+      sorted (exponent, coefficient) terms of a sparse polynomial
+    * stop_value, max_iter and every option which changes the result, like
+      the iteration method, the initial guess or the engine
+
+The cache holds at most max_entries results, the least recently used ones
+are evicted first.
+
+This script requires that `sqlite3` be installed within the Python
+environment you are running this script in.
+
+This file contains the class ResultCache and the following functions:
+
+    * cache_key - Hash of the normalized inputs of a problem
+    * main - the main function of the script
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+
+from sparse_polynomial import SparsePolynomial
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'newton_cache.sqlite')
+
+# Number of results kept by default
+MAX_ENTRIES = 100000
+
+# Number of keys per SELECT, below the SQLite limit on the number of parameters
+LOOKUP_SIZE = 500
+
+
+def cache_key(problem, **options):
+    """Hash of the normalized inputs of a problem
+
+    Parameters
+    ----------
+    problem : dict
+        Problem in the format of data.json, with either 'coef' or 'terms'
+    options : dict
+        The options which change the result, like method='halley' or x0=2.
+        Options set to None are left out.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal SHA-256 digest
+    """
+
+    if 'terms' in problem:
+        polynomial = {'terms': [[e, float(c)] for e, c in SparsePolynomial(problem['terms']).terms]}
+    else:
+        _coef = [float(c) for c in problem['coef']]
+        while len(_coef) > 1 and _coef[0] == 0:
+            _coef.pop(0)
+        polynomial = {'coef': _coef}
+    inputs = dict(polynomial, stop_value=float(problem['stop_value']), max_iter=int(problem['max_iter']),
+                  **{name: value for name, value in options.items() if value is not None})
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """It represents the on-disk cache of the results of solved problems
+         It has the following methods
+                *get(): Looks up the result of one key
+                *get_many(): Looks up the results of many keys at once
+                *put(): Stores the result of one key
+                *put_many(): Stores the results of many keys at once
+                *stats(): Hits and misses of this session and of every session
+                *clear(): Removes every cached result and counter
+                *close(): Saves the pending changes and closes the file
+    """
+
+    def __init__(self, file=DEFAULT_FILE, max_entries=MAX_ENTRIES):
+        self.file = file
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(file)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, used INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+        # The LRU clock, every lookup and store takes the next tick
+        self._clock = self._db.execute("SELECT COALESCE(MAX(used), 0) FROM results").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Looks up the result of one key, None when it is not cached"""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        """Looks up the results of many keys at once
+
+        Parameters
+        ----------
+        keys : list
+            Keys made by cache_key
+
+        Returns
+        -------
+        results : list
+            The cached result of every key, None for the ones which are not cached
+        """
+
+        found = {}
+        for i in range(0, len(keys), LOOKUP_SIZE):
+            _keys = keys[i:i + LOOKUP_SIZE]
+            _query = f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(_keys))})"
+            found.update(self._db.execute(_query, _keys))
+        self._clock += 1
+        self._db.executemany("UPDATE results SET used = ? WHERE key = ?", ((self._clock, key) for key in found))
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return [json.loads(found[key]) if key in found else None for key in keys]
+
+    def put(self, key, result):
+        """Stores the result of one key, see put_many"""
+        self.put_many([(key, result)])
+
+    def put_many(self, items):
+        """Stores the results of many keys at once and evicts the least recently used ones
+
+        Parameters
+        ----------
+        items : list
+            List of (key, result) tuples, the results being anything json can write
+        """
+
+        self._clock += 1
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                                 ((key, json.dumps(result), self._clock) for key, result in items))
+            _excess = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if _excess > 0:
+                self._db.execute("DELETE FROM results WHERE key IN "
+                                 "(SELECT key FROM results ORDER BY used LIMIT ?)", (_excess,))
+
+    def stats(self):
+        """Hits and misses of this session and of every session
+
+        Returns
+        -------
+        stats : dict
+            The hits, misses and hit rate of this session, the ones of every
+            session using this file, and the number of cached results
+        """
+
+        _total = dict(self._db.execute("SELECT name, value FROM counters"))
+        _hits = _total.get('hits', 0) + self.hits
+        _misses = _total.get('misses', 0) + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                'total_hits': _hits, 'total_misses': _misses,
+                'total_hit_rate': _hits / (_hits + _misses) if _hits + _misses else 0.0,
+                'entries': self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]}
+
+    def clear(self):
+        """Removes every cached result and counter"""
+        with self._db:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM counters")
+        self.hits = self.misses = 0
+
+    def close(self):
+        """Adds the counters of this session to the file, saves the pending changes and closes the file"""
+        with self._db:
+            for name, value in (('hits', self.hits), ('misses', self.misses)):
+                self._db.execute("INSERT OR IGNORE INTO counters VALUES (?, 0)", (name,))
+                self._db.execute("UPDATE counters SET value = value + ? WHERE name = ?", (value, name))
+        self.hits = self.misses = 0
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self):
+        _stats = self.stats()
+        return (f"Cache {self.file}: {_stats['hits']} hits, {_stats['misses']} misses "
+                f"(hit rate {_stats['hit_rate']:.1%}), {_stats['total_hits']} hits and "
+                f"{_stats['total_misses']} misses over every run (hit rate {_stats['total_hit_rate']:.1%}), "
+                f"{_stats['entries']} of at most {self.max_entries} results cached")
+
+
+def main():
+    """
+    Main function to print the statistics of a cache file or clear it
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--cache', action='store', type=str, default=DEFAULT_FILE)
+    my_parser.add_argument('--clear', action='store_true', help='remove every cached result and counter')
+
+    args = my_parser.parse_args()
+
+    with ResultCache(args.cache) as cache:
+        if args.clear:
+            cache.clear()
+        print(cache)
+
+
+if __name__ == '__main__':
+    main()
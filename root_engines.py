@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+""" Root finding engines and automatic engine selection
+
+This script allows the user to find the real roots of Nth degree polynomials
+with one of three engines:
+
+    * newton - Newton's method from the seed of seeding.py, finds a single root
+    * sturm - Sturm based root isolation polished by Newton's method, finds every real root
+    * eigen - Eigenvalues of the companion matrix, finds every root at once
+
+The engine is picked from the degree and the batch size, using the
+thresholds in engine_thresholds.json which are written by
+benchmarks/bench_engines.py
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * load_thresholds - Loads the engine selection thresholds
+    * companion_matrix - Builds the companion matrix (or a stack of them)
+    * eigen_roots - Finds the roots from the eigenvalues of the companion matrix
+    * polished_eigen_roots - The distinct real roots from the polished eigenvalues
+    * newton_roots - Finds a single root with Newton's method
+    * select_engine - Picks the engine for a given degree and batch size
+    * real_roots - Finds the real roots of a polynomial with the given (or selected) engine
+    * solve_many - Finds the real roots of many polynomials with the given (or selected) engine
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+import iteration_methods
+import newton_batch
+import sturm
+from polynomial import Polynomial
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engine_thresholds.json')
+
+# Used when engine_thresholds.json is missing
+DEFAULT_THRESHOLDS = {
+    # Newton's method from the seeds is only trusted up to this degree
+    "newton_max_degree": 20,
+    # Above this degree the companion matrix is faster than Sturm isolation
+    "sturm_max_degree": 2,
+    # From this batch size on the stacked eigenvalue solve is faster than Sturm isolation
+    "eigen_min_batch": 4,
+}
+
+# Eigenvalues with a smaller imaginary part (relative to their magnitude) are taken as real
+IMAG_TOLERANCE = 1e-7
+
+
+def load_thresholds(file=THRESHOLDS_FILE):
+    """Loads the engine selection thresholds
+
+    Parameters
+    ----------
+    file : str
+        Path of the JSON file written by benchmarks/bench_engines.py
+
+    Returns
+    -------
+    thresholds : dict
+        The thresholds of the file, missing keys take the default values
+    """
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        with open(file) as f:
+            thresholds.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    return thresholds
+
+
+THRESHOLDS = load_thresholds()
+
+
+def companion_matrix(coef):
+    """Builds the companion matrix of a polynomial
+
+    Parameters
+    ----------
+    coef : list, numpy.ndarray
+        The coefficient values, the leading one non zero. A 2-D array of
+        polynomials of the same degree gives a stack of companion matrices.
+
+    Returns
+    -------
+    matrix : numpy.ndarray
+        Matrix (or stack of matrices) whose eigenvalues are the roots
+    """
+
+    coef = np.asarray(coef, dtype=np.float64)
+    deg = coef.shape[-1] - 1
+    matrix = np.zeros(coef.shape[:-1] + (deg, deg))
+    matrix[..., 0, :] = -coef[..., 1:] / coef[..., :1]
+    matrix[..., np.arange(1, deg), np.arange(deg - 1)] = 1
+    return matrix
+
+
+def _real(eigenvalues):
+    """Returns the sorted real parts of the eigenvalues which are real"""
+
+    real = np.abs(eigenvalues.imag) <= IMAG_TOLERANCE * (1 + np.abs(eigenvalues))
+    return sorted(eigenvalues.real[real].tolist())
+
+
+def eigen_roots(coef, real_only=True):
+    """Finds the roots from the eigenvalues of the companion matrix
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    real_only : boolean
+        When set to True only the real roots are returned, sorted
+
+    Returns
+    -------
+    roots : list, numpy.ndarray
+        The sorted real roots, or every complex root when real_only is False.
+        Unlike the 'sturm' engine, a repeated root appears once per multiplicity.
+    """
+
+    coef = sturm.normalize(coef)
+    if len(coef) < 2:
+        return [] if real_only else np.zeros(0, dtype=complex)
+    eigenvalues = np.linalg.eigvals(companion_matrix(coef))
+    return _real(eigenvalues) if real_only else eigenvalues
+
+
+def polished_eigen_roots(coef, stop_value=1e-12, max_iter=100, exact=False):
+    """The distinct real roots from the polished eigenvalues of the companion matrix
+
+    Every real eigenvalue is polished with Newton's method on the
+    polynomial, then the closest neighbours are merged until there are as
+    many roots as the Sturm sequence counts, so a repeated root is returned
+    once, like with the 'sturm' engine. When there are fewer real
+    eigenvalues than real roots (a multiple root may split into a complex
+    pair) the roots are isolated with the Sturm sequence instead.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    stop_value : float
+        Stopping criteria of the polishing Newton's method
+    max_iter : int
+        Maximum number of polishing iterations per root
+    exact : boolean
+        When set to True the roots are counted with the exact integer Sturm sequence
+
+    Returns
+    -------
+    roots : list
+        Sorted list of the distinct real roots
+    """
+
+    coef = sturm.normalize(coef)
+    return _polished(coef, eigen_roots(coef), stop_value, max_iter, exact)
+
+
+def _polished(coef, values, stop_value, max_iter, exact):
+    """The distinct real roots of a normalized polynomial from it's sorted real eigenvalues"""
+
+    poly = Polynomial(coef)
+    count = sturm.count_roots(sturm.cached_sturm_sequence(coef, exact))
+    roots = []
+    for value in values:
+        polished, _ = iteration_methods.solve(poly, value, stop_value, max_iter)
+        # Near a multiple root the derivative is tiny and the step may jump to another root, the
+        # polished root is only kept while it stays nearer to it's own eigenvalue than to any other
+        if polished is None or any(abs(polished - other) < abs(polished - value) for other in values):
+            polished = value
+        roots.append(polished)
+    roots.sort()
+    if len(roots) < count:
+        return sturm.real_roots(coef, stop_value, max_iter, exact=exact)
+    while len(roots) > count:
+        # The two closest roots are the copies of one root, the one with the smaller abs(f(x)) is kept
+        i = min(range(len(roots) - 1), key=lambda j: roots[j + 1] - roots[j])
+        del roots[i if abs(poly(roots[i])) > abs(poly(roots[i + 1])) else i + 1]
+    return roots
+
+
+def newton_roots(coef, stop_value, max_iter, x0=None):
+    """Finds a single root with Newton's method
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations
+    x0 : float
+        Initial guess, None picks one near a real root (see seeding.initial_guess_batch)
+
+    Returns
+    -------
+    roots : list
+        The root found, or an empty list
+    """
+
+    roots, _, converged = newton_batch.newton_batch(np.asarray([coef], dtype=np.float64), stop_value, max_iter, x0)
+    return [float(roots[0])] if converged[0] else []
+
+
+def select_engine(degree, batch_size=1, all_roots=True, thresholds=None):
+    """Picks the engine for a given degree and batch size
+
+    Parameters
+    ----------
+    degree : int
+        Degree of the polynomials
+    batch_size : int
+        Number of polynomials solved together
+    all_roots : boolean
+        When set to False a single root is enough, which allows Newton's method
+    thresholds : dict
+        The thresholds to use, by default the ones of engine_thresholds.json
+
+    Returns
+    -------
+    engine : str
+        One of 'newton', 'sturm' and 'eigen'
+    """
+
+    thresholds = THRESHOLDS if thresholds is None else thresholds
+    if not all_roots and degree <= thresholds['newton_max_degree']:
+        return 'newton'
+    if batch_size < thresholds['eigen_min_batch'] and degree <= thresholds['sturm_max_degree']:
+        return 'sturm'
+    return 'eigen'
+
+
+def real_roots(coef, stop_value=1e-12, max_iter=100, engine='auto', all_roots=True, exact=False):
+    """Finds the real roots of a polynomial
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    stop_value : float
+        Stopping criteria of Newton's method
+    max_iter : int
+        Maximum number of iterations of Newton's method
+    engine : str
+        One of 'newton', 'sturm', 'eigen' or 'auto'
+    all_roots : boolean
+        Passed to select_engine when the engine is 'auto'
+    exact : boolean
+        When set to True the roots are counted with the exact integer Sturm
+        sequence, by the 'sturm' and 'eigen' engines (see polished_eigen_roots)
+
+    Returns
+    -------
+    roots : list
+        The sorted distinct real roots (only one root for the 'newton' engine)
+    """
+
+    if engine == 'auto':
+        engine = select_engine(len(sturm.normalize(coef)) - 1, 1, all_roots)
+    if engine == 'newton':
+        if exact:
+            raise Exception("The 'newton' engine does not count the roots, it can not be exact")
+        return newton_roots(coef, stop_value, max_iter)
+    if engine == 'sturm':
+        return sturm.real_roots(coef, stop_value, max_iter, exact=exact)
+    if engine == 'eigen':
+        return polished_eigen_roots(coef, stop_value, max_iter, exact)
+    raise Exception(f"Unknown engine: {engine}")
+
+
+def solve_many(coefs, stop_value=1e-12, max_iter=100, engine='auto', all_roots=True):
+    """Finds the real roots of many polynomials
+
+    Parameters
+    ----------
+    coefs : list
+        List of coefficient lists
+    stop_value : float
+        Stopping criteria of Newton's method
+    max_iter : int
+        Maximum number of iterations of Newton's method
+    engine : str
+        One of 'newton', 'sturm', 'eigen' or 'auto'
+    all_roots : boolean
+        Passed to select_engine when the engine is 'auto'
+
+    Returns
+    -------
+    roots : list
+        One sorted list of the distinct real roots per polynomial (only one
+        root for the 'newton' engine), the same with the 'sturm' and 'eigen' engines
+    """
+
+    coefs = [sturm.normalize(coef) for coef in coefs]
+    if engine == 'auto':
+        engine = select_engine(max(len(coef) for coef in coefs) - 1, len(coefs), all_roots)
+    if engine == 'newton':
+        roots, _, converged = newton_batch.newton_batch(newton_batch.pack_coefficients(coefs), stop_value, max_iter)
+        return [[float(root)] if ok else [] for root, ok in zip(roots, converged)]
+    if engine == 'sturm':
+        return [sturm.real_roots(coef, stop_value, max_iter) for coef in coefs]
+    if engine != 'eigen':
+        raise Exception(f"Unknown engine: {engine}")
+
+    # Polynomials of the same degree share one stacked eigenvalue solve
+    results = [[] for _ in coefs]
+    by_degree = {}
+    for i, coef in enumerate(coefs):
+        if len(coef) > 1:
+            by_degree.setdefault(len(coef), []).append(i)
+    for rows in by_degree.values():
+        eigenvalues = np.linalg.eigvals(companion_matrix([coefs[i] for i in rows]))
+        for i, values in zip(rows, eigenvalues):
+            results[i] = _polished(coefs[i], _real(values), stop_value, max_iter, False)
+    return results
+
+
+def main():
+    """
+    Main function to find the real roots of a polynomial with a chosen engine
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--engine', action='store', type=str, default='auto',
+                           choices=['auto', 'newton', 'sturm', 'eigen'])
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    roots = real_roots(data['coef'], data['stop_value'], data['max_iter'], args.engine)
+    print(f'The real roots of the equation are : {[round(root, 5) for root in roots]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+""" Initial guesses for Newton's method from root bounds
+
+This script allows the user to pick starting points close to the real roots
+of a polynomial instead of a fixed x0 = 2. Every root lies inside the
+Cauchy / Fujiwara bound (see sturm.root_bound), so the polynomial is
+evaluated on a coarse grid over that interval in one vectorized pass, and
+the sign changes of the grid give brackets of the real roots. The seed of a
+bracket is the point where the secant through it's ends crosses zero.
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the following functions:
+
+    * initial_guesses - Every seed found by the sign scan of one polynomial
+    * initial_guess - The seed of one polynomial
+    * initial_guess_sparse - The seed of a sparse polynomial
+    * root_bounds - Root bounds of many polynomials at once
+    * initial_guess_batch - One seed per row of a 2-D coefficient array
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from polynomial import eval_horner_vector
+from solver_metrics import METRICS
+from sturm import normalize, root_bound
+
+# Number of grid points of the sign scan
+SAMPLES = 64
+# Number of scans of initial_guess_batch, each one zooms in on the roots found by the previous one
+SCANS = 3
+# Number of bisection steps inside the bracket picked by initial_guess_batch
+BISECTIONS = 8
+
+
+def _scan(evaluate, bound, samples):
+    """Sign scans over [-bound, bound], each one over the span of the sign changes of the previous one
+
+    Returns the grid and the values of the last scan, the indices of it's
+    grid intervals with a sign change and the index of the smallest abs(f(x))
+    """
+
+    lo, hi = -bound, bound
+    for _ in range(SCANS):
+        x = np.linspace(lo, hi, samples)
+        fx = evaluate(x)
+        change = np.flatnonzero(np.sign(fx[:-1]) * np.sign(fx[1:]) < 0)
+        best = np.argmin(np.abs(fx))
+        step = (hi - lo) / (samples - 1)
+        lo = max(x[change[0] if change.size else best] - step, lo)
+        hi = min(x[change[-1] + 1 if change.size else best] + step, hi)
+    return x, fx, change, best
+
+
+def initial_guesses(coef, samples=SAMPLES):
+    """Every seed found by the sign scan of one polynomial
+
+    The scan is repeated SCANS times, each time over the span of the sign
+    changes of the previous one (see initial_guess_batch).
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    samples : int
+        Number of grid points per scan
+
+    Returns
+    -------
+    seeds : list
+        Sorted seeds, the secant zero of every grid interval with a sign change.
+        When the scan finds no sign change (no real roots, or roots of even
+        multiplicity) the grid point with the smallest abs(f(x)) is returned alone.
+    """
+
+    coef = list(normalize(coef))
+    if len(coef) < 2:
+        return []
+    x, fx, change, best = _scan(lambda points: eval_horner_vector(coef, points), root_bound(coef), samples)
+    if change.size == 0:
+        return [float(x[best])]
+    x0, x1, f0, f1 = x[change], x[change + 1], fx[change], fx[change + 1]
+    return sorted((x0 - f0 * (x1 - x0) / (f1 - f0)).tolist())
+
+
+def initial_guess(coef, samples=SAMPLES):
+    """The seed of one polynomial, see initial_guess_batch
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    samples : int
+        Number of grid points per scan
+
+    Returns
+    -------
+    x0 : float
+        Initial guess for Newton's method, 0 for a constant polynomial
+    """
+
+    if len(normalize(coef)) < 2:
+        return 0.0
+    return float(initial_guess_batch(np.asarray([coef], dtype=np.float64), samples)[0])
+
+
+def initial_guess_sparse(poly, samples=SAMPLES):
+    """The seed of a sparse polynomial, see initial_guess_batch
+
+    The scans evaluate the polynomial term by term, so the cost depends on
+    the number of terms and not on the degree.
+
+    Parameters
+    ----------
+    poly : sparse_polynomial.SparsePolynomial
+        The polynomial whose root is searched for
+    samples : int
+        Number of grid points per scan
+
+    Returns
+    -------
+    x0 : float
+        Initial guess for Newton's method, 0 for a constant polynomial, moved
+        by a grid step when f'(x) = 0 there (see initial_guess_batch)
+    """
+
+    if poly.deg < 1:
+        return 0.0
+    x0 = _sparse_seed(poly, samples)
+    if poly.derivative(x0) == 0:
+        x0 += 2 * poly.root_bound() / (samples - 1) ** SCANS
+    return x0
+
+
+def _sparse_seed(poly, samples):
+    """The seed of a sparse polynomial of degree 1 or more, before the check of the derivative"""
+
+    # The high powers overflow on the outer grid points, their sign is all the scan needs
+    with np.errstate(over='ignore', invalid='ignore'):
+        x, fx, change, best = _scan(poly.evaluate, poly.root_bound(), samples)
+    if change.size == 0:
+        return float(x[best])
+    left = change[0] if abs(x[change[0]]) <= abs(x[change[-1] + 1]) else change[-1]
+    xa, xb, fa, fb = float(x[left]), float(x[left + 1]), float(fx[left]), float(fx[left + 1])
+    for _ in range(BISECTIONS):
+        xm = (xa + xb) / 2
+        fm = poly(xm)
+        if np.sign(fa) * np.sign(fm) <= 0:
+            xb, fb = xm, fm
+        else:
+            xa, fa = xm, fm
+    if fb == fa:
+        return (xa + xb) / 2
+    return xa - fa * (xb - xa) / (fb - fa)
+
+
+def root_bounds(coefs):
+    """Root bounds of many polynomials at once
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, one polynomial per row, which may be padded
+        with leading zeros (see newton_batch.pack_coefficients)
+
+    Returns
+    -------
+    bounds : numpy.ndarray
+        The smaller of Cauchy's and Fujiwara's bound for every row, widened
+        like sturm.root_bound so it stays positive for x^n
+    """
+
+    coefs = np.asarray(coefs, dtype=np.float64)
+    n_poly, width = coefs.shape
+    rows = np.arange(n_poly)
+    lead_index = np.argmax(coefs != 0, axis=1)
+    lead = coefs[rows, lead_index]
+    lead = np.where(lead == 0, 1, lead)
+    ratios = np.abs(coefs / lead[:, None])
+
+    # Power of x below the leading term, 0 (and masked out) for the padding and the leading term
+    below = np.arange(width)[None, :] - lead_index[:, None]
+    valid = below > 0
+    exponent = np.where(valid, 1 / np.where(valid, below, 1), 0)
+    # Fujiwara's bound halves the constant term before taking the root
+    halved = np.where(np.arange(width)[None, :] == width - 1, ratios / 2, ratios)
+    fujiwara = 2 * np.max(np.where(valid, halved ** exponent, 0), axis=1)
+    cauchy = 1 + np.max(np.where(valid, ratios, 0), axis=1)
+    # Both bounds are 0 when every root is 0, the scan needs an interval around them
+    return np.minimum(cauchy, fujiwara) * (1 + 1e-6) + 1e-12
+
+
+def _horner_rows(coefs, x):
+    """Evaluates every row of coefs at the points of the same row of x"""
+
+    if METRICS.enabled:
+        METRICS.count('evaluations', x.size)
+    fx = np.repeat(coefs[:, :1], x.shape[1], axis=1)
+    for j in range(1, coefs.shape[1]):
+        fx = fx * x + coefs[:, j:j + 1]
+    return fx
+
+
+def initial_guess_batch(coefs, samples=SAMPLES):
+    """One seed per row of a 2-D coefficient array
+
+    Every row is scanned on it's own grid over [-bound, bound], all the rows
+    in one vectorized Horner pass, then SCANS - 1 more times over the span of
+    the sign changes found.
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray
+        2-D array of coefficients, one polynomial per row
+    samples : int
+        Number of grid points per row
+
+    Returns
+    -------
+    x0 : numpy.ndarray
+        Per row, the secant zero of the outermost grid interval with a sign
+        change nearest to 0, or the grid point with the smallest
+        abs(f(x)) when there is no sign change. A seed where f'(x) = 0 is
+        moved by a grid step, as Newton's method can not start from it.
+    """
+
+    coefs = np.asarray(coefs, dtype=np.float64)
+    rows = np.arange(coefs.shape[0])
+    bounds = root_bounds(coefs)
+    grid = np.linspace(0, 1, samples)[None, :]
+    lo, hi = -bounds, bounds
+    for _ in range(SCANS):
+        x = lo[:, None] + (hi - lo)[:, None] * grid
+        fx = _horner_rows(coefs, x)
+        change = np.sign(fx[:, :-1]) * np.sign(fx[:, 1:]) < 0
+        found = change.any(axis=1)
+        first = np.argmax(change, axis=1)
+        last = samples - 2 - np.argmax(change[:, ::-1], axis=1)
+        best = np.argmin(np.abs(fx), axis=1)
+        # The bounds are loose when the roots are far from 0, the next scan only covers
+        # the span of the sign changes (or the grid point with the smallest abs(f(x))
+        # when there is none), widened by a grid step on each side for the pairs of
+        # roots which share a grid interval
+        step = (hi - lo) / (samples - 1)
+        lo = np.maximum(x[rows, np.where(found, first, best)] - step, lo)
+        hi = np.minimum(x[rows, np.where(found, last + 1, best)] + step, hi)
+
+    # The grid point with the smallest abs(f(x)) is the fallback seed
+    x0 = x[rows, best]
+
+    # Brackets of the sign changes, the outermost ones hold the best conditioned roots
+    # (the ones Newton's method reaches from far away), the one nearer to 0 wins
+    left = np.where(np.abs(x[rows, first]) <= np.abs(x[rows, last + 1]), first, last)
+    xa, xb = x[rows, left], x[rows, left + 1]
+    fa, fb = fx[rows, left], fx[rows, left + 1]
+
+    # A grid interval may still hold a cluster of roots, a few bisection steps split it
+    for _ in range(BISECTIONS):
+        xm = (xa + xb) / 2
+        fm = _horner_rows(coefs, xm[:, None])[:, 0]
+        left_half = np.sign(fa) * np.sign(fm) <= 0
+        xb, fb = np.where(left_half, xm, xb), np.where(left_half, fm, fb)
+        xa, fa = np.where(left_half, xa, xm), np.where(left_half, fa, fm)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        secant = xa - fa * (xb - xa) / (fb - fa)
+    x0 = np.where(found, secant, x0)
+
+    # The seed may land right on a multiple root (x = 0 for x^3) or on an extremum
+    d_coefs = coefs[:, :-1] * np.arange(coefs.shape[1] - 1, 0, -1)
+    flat = _horner_rows(d_coefs, x0[:, None])[:, 0] == 0 if d_coefs.shape[1] else np.zeros(rows.size, bool)
+    return np.where(flat, x0 + step, x0)
+
+
+def main():
+    """
+    Main function to print the seeds of a polynomial
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    print(f'Root bound: {root_bound(list(normalize(data["coef"])))}')
+    print(f'Seeds: {initial_guesses(data["coef"])}')
+    print(f'Best seed: {initial_guess(data["coef"])}')
+
+
+if __name__ == '__main__':
+    main()
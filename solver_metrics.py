@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+""" Counters and timers of the solver phases
+
+This script allows the user to see where the solve time goes. The solvers
+report to the shared METRICS object:
+
+    * counters - solves, iterations, convergence failures, polynomials
+      without real roots, calls of the synthetic division, evaluations of
+      the Sturm sequence terms ('eval_horner_calls') and points where the
+      polynomial is evaluated ('evaluations'). The evaluations are counted
+      by the shared routines of polynomial.py and sparse_polynomial.py and
+      by the lockstep loops of newton_batch.py, seeding.py and
+      durand_kerner.py, so every solver path reports them.
+    * timers - wall time of every solve and of the Sturm sequence construction,
+      with the number of calls, the total, mean, smallest and largest time
+
+The metrics are disabled by default, a disabled counter costs one attribute
+lookup and a timer one method call. They are enabled in process with
+METRICS.enable(), or for a whole run by setting the environment variable
+NEWTON_METRICS to the path of the JSON file the summary is written to at
+exit ('-' prints it).
+
+This file contains the class Metrics and the following functions:
+
+    * main - the main function of the script
+
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+# Environment variable which enables the metrics and names the file of the summary at exit
+ENVIRONMENT = 'NEWTON_METRICS'
+
+
+class Metrics:
+    """It represents the counters and timers of the solver phases
+         It has the following methods
+                *enable(): Starts recording, optionally writing the summary at exit
+                *disable(): Stops recording
+                *count(): Adds to a counter
+                *timer(): Context manager timing a phase
+                *add_time(): Adds the duration of one call of a phase
+                *summary(): Returns the counters and timers as a dictionary
+                *write(): Writes the summary as JSON to a file or stdout
+                *reset(): Removes every counter and timer
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        # Per phase: [calls, total seconds, smallest, largest]
+        self.timers = {}
+        self._exit_file = None
+
+    def enable(self, file=None):
+        """Starts recording
+
+        Parameters
+        ----------
+        file : str
+            When given the summary is written there at exit, '-' prints it
+        """
+
+        self.enabled = True
+        if file is not None:
+            if self._exit_file is None:
+                atexit.register(self._write_at_exit)
+            self._exit_file = file
+
+    def disable(self):
+        """Stops recording, the values recorded so far are kept"""
+        self.enabled = False
+
+    def count(self, name, value=1):
+        """Adds value to the counter name, callers on hot paths check enabled first"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name, seconds):
+        """Adds the duration of one call of the phase name"""
+        if not self.enabled:
+            return
+        _timer = self.timers.get(name)
+        if _timer is None:
+            self.timers[name] = [1, seconds, seconds, seconds]
+        else:
+            _timer[0] += 1
+            _timer[1] += seconds
+            _timer[2] = min(_timer[2], seconds)
+            _timer[3] = max(_timer[3], seconds)
+
+    def timer(self, name):
+        """Context manager timing the phase name, it does nothing while disabled"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        _start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - _start)
+
+    def summary(self):
+        """Returns the counters and timers as a dictionary
+
+        Returns
+        -------
+        summary : dict
+            {'counters': {name: value}, 'timers': {name: {'calls', 'total',
+            'mean', 'min', 'max'}}}, times in seconds
+        """
+
+        return {'counters': dict(sorted(self.counters.items())),
+                'timers': {name: {'calls': calls, 'total': total, 'mean': total / calls, 'min': low, 'max': high}
+                           for name, (calls, total, low, high) in sorted(self.timers.items())}}
+
+    def write(self, file='-'):
+        """Writes the summary as JSON to the file, '-' prints it"""
+        if file == '-':
+            json.dump(self.summary(), sys.stdout, indent=2)
+            print()
+            return
+        with open(file, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def reset(self):
+        """Removes every counter and timer"""
+        self.counters.clear()
+        self.timers.clear()
+
+    def _write_at_exit(self):
+        if self._exit_file is not None:
+            self.write(self._exit_file)
+
+    def __str__(self):
+        return json.dumps(self.summary(), indent=2)
+
+
+METRICS = Metrics()
+if os.environ.get(ENVIRONMENT):
+    METRICS.enable(os.environ[ENVIRONMENT])
+
+
+def main():
+    """
+    Main function to solve the polynomial of a json file and print the metrics
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--repeat', action='store', type=int, default=1)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    # The Newton class lives in Q2, next to it's logging configuration
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Q2'))
+    from NewtonClassLog import Newton
+    # Run as a script this module is __main__, the solvers report to the imported one
+    from solver_metrics import METRICS as metrics
+
+    metrics.enable()
+    for _ in range(args.repeat):
+        try:
+            Newton(**dict(data, trace='off')).solve()
+        except Exception as error:
+            print(error)
+    metrics.write()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+""" Sparse polynomials
+
+This script allows the user to work with polynomials given by their non zero
+terms only, as (exponent, coefficient) pairs. A polynomial like
+x^5000 - 3x + 1 has three terms, and every operation below costs time
+proportional to the number of terms (times the log of the gaps between the
+exponents) instead of the degree:
+
+    * evaluation runs Horner's method over the terms, the power of x across
+      each gap between two exponents is taken by exponentiation by squaring
+    * the derivative of a term is one term
+    * the root bound and Descartes' rule of signs only look at the terms
+    * a real root is proven by a sign change of f(x) over the root bound, the
+      dense Sturm sequence is only built when neither that nor Descartes'
+      rule of signs decides
+
+In data.json a sparse polynomial is given as "terms": [[5000, 1], [1, -3], [0, 1]]
+instead of "coef".
+
+This script requires that `numpy` be installed within the Python
+environment you are running this script in.
+
+This file contains the class SparsePolynomial and the following functions:
+
+    * power - Exponentiation by squaring
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+import sturm
+from polynomial import as_points
+from solver_metrics import METRICS
+
+# Number of grid points where has_real_root looks for a sign change
+SIGN_SAMPLES = 64
+
+
+def power(x, n):
+    """Exponentiation by squaring
+
+    Parameters
+    ----------
+    x : int, float, Fraction, numpy.ndarray
+        The base, anything which can be multiplied
+    n : int
+        The exponent, n >= 0
+
+    Returns
+    -------
+    result : same type as x
+        x^n after about 2 log2(n) multiplications
+    """
+
+    result = None
+    while n:
+        if n & 1:
+            result = x if result is None else result * x
+        n >>= 1
+        if n:
+            x = x * x
+    return x * 0 + 1 if result is None else result
+
+
+class SparsePolynomial:
+    """It represents a polynomial given by it's non zero (exponent, coefficient) terms
+         It has the following methods
+                *__call__(): Evaluates f(x)
+                *derivative(): Evaluates f'(x)
+                *value_and_derivative(): Evaluates f(x), f'(x) and optionally f''(x) in one pass over the terms
+                *evaluate(): Evaluates f(x) (and f'(x)) for an array of x values
+                *differentiate(): Returns the derivative as a SparsePolynomial
+                *root_bound(): Bound on the absolute value of the roots
+                *descartes_bound(): Upper bound on the number of real roots by Descartes' rule of signs
+                *has_real_root(): Tells if the polynomial has a real root
+                *from_dense(): Builds the sparse polynomial of a list of coefficients
+    """
+
+    def __init__(self, terms):
+        _merged = {}
+        for exponent, c in terms:
+            if int(exponent) != exponent or exponent < 0:
+                raise Exception("The exponents must be non negative integers")
+            _merged[int(exponent)] = _merged.get(int(exponent), 0) + c
+        # Highest exponent first, like the dense coefficient lists
+        self.terms = sorted(((e, c) for e, c in _merged.items() if c != 0), reverse=True)
+        self.deg = self.terms[0][0] if self.terms else 0
+        self._coef = None
+        self._dfun = None
+
+    @classmethod
+    def from_dense(cls, coef):
+        """Builds the sparse polynomial of a list of coefficients, leading coefficient first"""
+        _deg = len(coef) - 1
+        return cls((_deg - i, c) for i, c in enumerate(coef) if c != 0)
+
+    @property
+    def coef(self):
+        """The dense list of coefficients, built on first use in O(degree)"""
+        if self._coef is None:
+            self._coef = [0] * (self.deg + 1)
+            for e, c in self.terms:
+                self._coef[self.deg - e] = c
+        return self._coef
+
+    @property
+    def dfun_terms(self):
+        """The dense list of coefficients of the derivative, see coef"""
+        if self._dfun is None:
+            self._dfun = self.differentiate().coef if self.deg > 0 else []
+        return self._dfun
+
+    def differentiate(self):
+        """The derivative as a SparsePolynomial, one term per term of positive exponent"""
+        return SparsePolynomial([(e - 1, c * e) for e, c in self.terms if e > 0])
+
+    def value_and_derivative(self, x, second=False):
+        """Evaluates f(x), f'(x) and optionally f''(x) in one pass over the terms
+
+        Going from one term to the next, the partial sum p becomes
+        p * x^g + c where g is the gap between the exponents, and it's
+        derivatives follow by the product rule, so each term costs one power
+        of x by squaring.
+
+        Parameters
+        ----------
+        x : int, float, numpy.ndarray
+            The value for which the function needs to be evaluated
+        second : boolean
+            When set to True the second derivative is returned as well
+
+        Returns
+        -------
+        result : tuple
+            (f(x), f'(x)) or (f(x), f'(x), f''(x))
+        """
+
+        if METRICS.enabled:
+            METRICS.count('evaluations', np.size(x))
+        fx = x * 0
+        dfx = fx
+        d2fx = fx
+        _previous = self.deg
+        # The last gap goes down to exponent 0, with a zero coefficient
+        for e, c in self.terms + [(0, 0)]:
+            _gap = _previous - e
+            _previous = e
+            if _gap == 0:
+                fx = fx + c
+                continue
+            # x^(g-2), x^(g-1) and x^g from one exponentiation by squaring
+            _xg2 = power(x, _gap - 2) if _gap >= 2 else x * 0
+            _xg1 = _xg2 * x if _gap >= 2 else x * 0 + 1
+            _xg = _xg1 * x
+            if second:
+                d2fx = d2fx * _xg + 2 * _gap * dfx * _xg1 + _gap * (_gap - 1) * fx * _xg2
+            dfx = dfx * _xg + _gap * fx * _xg1
+            fx = fx * _xg + c
+        if second:
+            return fx, dfx, d2fx
+        return fx, dfx
+
+    def __call__(self, x):
+        return self.value_and_derivative(x)[0]
+
+    def derivative(self, x):
+        """Evaluates the derivative f'(x)"""
+        return self.value_and_derivative(x)[1]
+
+    def evaluate(self, x, derivative=False):
+        """Evaluates the polynomial for an array of x values
+
+        Parameters
+        ----------
+        x : list, numpy.ndarray, buffer
+            The values for which the function needs to be evaluated f(x).
+        derivative : boolean
+            When set to True the derivative f'(x) is returned as well
+
+        Returns
+        -------
+        result : numpy.ndarray or tuple of numpy.ndarray
+            f(x) for every x value, or (f(x), f'(x)) when derivative is True
+        """
+        fx, dfx = self.value_and_derivative(as_points(x))
+        return (fx, dfx) if derivative else fx
+
+    def root_bound(self):
+        """Bound on the absolute value of the roots, the smaller of Cauchy's and Fujiwara's bound
+
+        The same bound as sturm.root_bound, where only the non zero terms contribute
+        """
+        if self.deg < 1:
+            return 0.0
+        _lead = self.terms[0][1]
+        _ratios = [(e, abs(c / _lead)) for e, c in self.terms[1:]]
+        if not _ratios:
+            return 1e-12
+        cauchy = 1 + max(r for _, r in _ratios)
+        fujiwara = 2 * max((r / 2 if e == 0 else r) ** (1 / (self.deg - e)) for e, r in _ratios)
+        return min(cauchy, fujiwara) * (1 + 1e-6) + 1e-12
+
+    def descartes_bound(self):
+        """Upper bound on the number of distinct real roots by Descartes' rule of signs
+
+        The positive roots are at most the sign changes of the coefficients
+        (and differ from them by an even number), the negative roots are
+        counted the same way on f(-x), and x = 0 is a root when there is no
+        constant term.
+
+        Returns
+        -------
+        bound : int
+            0 proves that there are no real roots
+        """
+        _positive = [c for _, c in self.terms]
+        _negative = [-c if e % 2 else c for e, c in self.terms]
+        _changes = sum(1 for signs in (_positive, _negative)
+                       for a, b in zip(signs, signs[1:]) if (a > 0) != (b > 0))
+        _zero = 1 if self.terms and self.terms[-1][0] > 0 else 0
+        return _changes + _zero
+
+    def has_real_root(self, exact=False):
+        """Tells if the polynomial has a real root
+
+        Descartes' rule of signs is only an upper bound, 0 proves there is no
+        real root but a positive bound does not prove there is one. A sign
+        change of f(x) on a grid over [-bound, bound] does, and when the grid
+        shows none the roots are counted with the Sturm sequence of the dense
+        coefficients.
+
+        Parameters
+        ----------
+        exact : boolean
+            When set to True the Sturm sequence is built over the integers
+
+        Returns
+        -------
+        result : boolean
+        """
+        if self.deg % 2 == 1:
+            return True
+        if self.descartes_bound() == 0:
+            return False
+        if self.terms[-1][0] > 0:
+            # No constant term, x = 0 is a root
+            return True
+        _bound = self.root_bound()
+        # The high powers overflow on the outer grid points, their sign is all the check needs
+        with np.errstate(over='ignore', invalid='ignore'):
+            _signs = np.sign(self.evaluate(np.linspace(-_bound, _bound, SIGN_SAMPLES)))
+        if np.any(_signs == 0) or np.any(_signs[:-1] * _signs[1:] < 0):
+            return True
+        return sturm.count_roots(sturm.cached_sturm_sequence(self.coef, exact)) > 0
+
+    def __repr__(self):
+        return f"SparsePolynomial({self.terms})"
+
+
+def main():
+    """
+    Main function to evaluate a sparse polynomial given in a json file
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+    my_parser.add_argument('--x', action='store', type=float, default=1)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    poly = SparsePolynomial(data['terms'])
+    fx, dfx = poly.value_and_derivative(args.x)
+    print(f'{poly} -- f({args.x}): {fx} -- df({args.x}): {dfx}')
+    print(f'Root bound: {poly.root_bound()} -- Descartes bound: {poly.descartes_bound()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,581 @@
+# -*- coding: utf-8 -*-
+""" Real root isolation using Sturm's theorem
+
+This script allows the user to find every real root of a Nth degree
+polynomial. The Sturm sequence is evaluated at finite points to count the
+roots inside an interval, the intervals are bisected until each of them holds
+exactly one root, and each root is then polished with a safeguarded Newton's
+method which never leaves it's interval.
+
+This file contains the following functions:
+
+    * eval_horner - This function allows the user to evaluate a given polynomial in O(n) time
+    * poly_div - This function allows the user to perform synthetic division on polynomials
+    * sturm_sequence - Builds the Sturm sequence of a polynomial
+    * integer_coefficients - Converts the coefficients into exact primitive integer coefficients
+    * sturm_sequence_exact - Builds the Sturm sequence with a primitive pseudo-remainder sequence over the integers
+    * normalize - Normalizes the coefficients into the key of the Sturm sequence cache
+    * SturmCache - Bounded LRU cache of Sturm sequences with hit and miss counters
+    * cached_sturm_sequence - Looks up the Sturm sequence of a polynomial in the default cache
+    * sign_changes - Counts the sign changes of a Sturm sequence at a point (or at +-infinity)
+    * count_roots - Counts the distinct real roots inside an interval
+    * root_bound - Bound on the absolute value of the roots (Cauchy and Fujiwara)
+    * isolate_roots - Bisects an interval until each sub-interval holds exactly one root
+    * polish_root - Safeguarded Newton's method inside an isolating interval
+    * real_roots - Finds every real root of a polynomial
+    * main - the main function of the script
+
+"""
+
+import argparse
+import json
+import math
+from collections import OrderedDict
+from fractions import Fraction
+from functools import reduce
+
+from poly_kernels import THRESHOLDS as KERNEL_THRESHOLDS, poly_divmod
+from solver_metrics import METRICS
+
+# Coefficients smaller than this, relative to the largest coefficient of the
+# dividend, are treated as zero when building the Sturm sequence
+ZERO_TOLERANCE = 1e-10
+
+# Number of Sturm sequences kept by the default cache
+STURM_CACHE_SIZE = 1024
+
+
+def eval_horner(coef, x):
+    """Horner's method for polynomial evaluation
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient value.
+        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
+
+    x : int, float
+        The value for which the function needs to be evaluated f(x).
+
+    Returns
+    -------
+    result : integer, float
+        Implements horner's method to evaluate the given polynomial
+    """
+
+    if METRICS.enabled:
+        METRICS.count('eval_horner_calls')
+    result = coef[0]
+    for i in range(1, len(coef)):
+        result = (result * x) + coef[i]
+    return result
+
+
+def poly_div(dividend, divisor):
+    """Polynomial synthetic division
+
+    Parameters
+    ----------
+    dividend : list
+        The list which contains the coefficient value of the dividend polynomial.
+        A polynomial 2x^2 + 3x -1 is given as a list of coefficients as: [2, 3, -1]
+
+    divisor : list
+        The list which contains the coefficient value of the divisor polynomial.
+
+    Returns
+    -------
+    result : list
+        list of coefficients of the quotient and remainder
+    """
+
+    out = list(dividend)
+    normalizer = divisor[0]
+    for i in range(len(dividend) - (len(divisor) - 1)):
+        out[i] /= normalizer
+        coef = out[i]
+        if coef != 0:
+            for j in range(1, len(divisor)):
+                out[i + j] += -divisor[j] * coef
+
+    separator = -(len(divisor) - 1)
+    return out[:separator], out[separator:]  # return quotient, remainder.
+
+
+def _strip(poly, tolerance):
+    """Removes the leading coefficients whose absolute value is below the tolerance"""
+
+    for i in range(len(poly)):
+        if abs(poly[i]) > tolerance:
+            return poly[i:]
+    return []
+
+
+def sturm_sequence(coef):
+    """Builds the Sturm sequence of a polynomial
+
+    The first two terms are the polynomial itself and it's derivative, every
+    next term is the negated remainder of the division of the previous two.
+    The sequence ends with a constant, or with the last non zero remainder
+    when the polynomial has repeated roots. High degree polynomials are
+    divided with the vectorized kernel of poly_kernels.py.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+
+    Returns
+    -------
+    sturm : list
+        List of the coefficient lists of the Sturm sequence
+    """
+
+    coef = _strip([float(c) for c in coef], 0)
+    deg = len(coef) - 1
+    sturm = [coef]
+    if deg < 1:
+        return sturm
+    sturm.append([coef[i] * (deg - i) for i in range(deg)])
+
+    # Above this degree the vectorized division beats the Python loop (see poly_kernels.py)
+    divide = poly_divmod if deg >= KERNEL_THRESHOLDS['vector_div_min_degree'] else poly_div
+    while len(sturm[-1]) > 1:
+        _tolerance = ZERO_TOLERANCE * max(abs(c) for c in sturm[-2])
+        if METRICS.enabled:
+            METRICS.count('poly_div_calls')
+        remainder = _strip(divide(sturm[-2], sturm[-1])[-1], _tolerance)
+        if not remainder:
+            break
+        sturm.append([-c for c in remainder])
+    return sturm
+
+
+def integer_coefficients(coef):
+    """Converts the coefficients into exact primitive integer coefficients
+
+    Every float is converted exactly (a float is a fraction with a power of
+    two denominator), the coefficients are scaled by the lcm of the
+    denominators and divided by their gcd.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values, int, float or Fraction
+
+    Returns
+    -------
+    coef : list
+        List of int coefficients without leading zeros, with the same roots and
+        a leading coefficient of the same sign
+    """
+
+    fractions = _strip([Fraction(c) for c in coef], 0)
+    if not fractions:
+        return []
+    scale = reduce(math.lcm, (c.denominator for c in fractions), 1)
+    return _primitive([int(c * scale) for c in fractions])
+
+
+def _primitive(poly):
+    """Divides an int polynomial by the gcd of it's coefficients"""
+
+    content = reduce(math.gcd, poly, 0)
+    return [c // content for c in poly] if content > 1 else poly
+
+
+def sturm_sequence_exact(coef):
+    """Builds the Sturm sequence over the integers
+
+    The chain is computed with a primitive pseudo-remainder sequence: the
+    pseudo-remainder only multiplies the dividend by powers of the leading
+    coefficient of the divisor, so no division is needed, and every term is
+    divided by the gcd of it's coefficients to keep them from blowing up.
+    The sign of every term is the same as in the float sequence, so the sign
+    changes are counted exactly whatever the degree.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+
+    Returns
+    -------
+    sturm : list
+        List of the int coefficient lists of the Sturm sequence
+    """
+
+    coef = integer_coefficients(coef)
+    deg = len(coef) - 1
+    sturm = [coef]
+    if deg < 1:
+        return sturm
+    sturm.append(_primitive([coef[i] * (deg - i) for i in range(deg)]))
+
+    while len(sturm[-1]) > 1:
+        _remainder = list(sturm[-2])
+        _divisor = sturm[-1]
+        _lead = _divisor[0]
+        _steps = 0
+        while len(_remainder) >= len(_divisor):
+            _factor = _remainder[0]
+            _remainder = [_lead * _remainder[j] - _factor * (_divisor[j] if j < len(_divisor) else 0)
+                          for j in range(1, len(_remainder))]
+            _steps += 1
+            # Dropping the new leading zeros, each one lowers the degree without another step
+            while _remainder and _remainder[0] == 0 and len(_remainder) >= len(_divisor):
+                _remainder.pop(0)
+        _remainder = _strip(_remainder, 0)
+        if not _remainder:
+            break
+        # The remainder was multiplied by _lead ** _steps, the negative sign of the
+        # Sturm sequence is applied to the true remainder
+        _sign = -1 if _lead > 0 or _steps % 2 == 0 else 1
+        sturm.append(_primitive([_sign * c for c in _remainder]))
+    return sturm
+
+
+def _value(poly, x):
+    """Evaluates a Sturm sequence term at a finite point, exactly for int terms"""
+
+    if not isinstance(poly[0], int):
+        return eval_horner(poly, x)
+    # Homogeneous Horner's method on x = p / q, the result is q^n * f(x) with q > 0
+    x = Fraction(x)
+    p, q = x.numerator, x.denominator
+    result = poly[0]
+    q_power = 1
+    for c in poly[1:]:
+        q_power *= q
+        result = result * p + c * q_power
+    return result
+
+
+def normalize(coef):
+    """Normalizes the coefficients of a polynomial
+
+    Leading zeros are removed and the polynomial is divided by it's leading
+    coefficient, so polynomials with the same roots share the same key.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+
+    Returns
+    -------
+    key : tuple
+        Tuple of float coefficients of the monic polynomial
+    """
+
+    coef = _strip([float(c) for c in coef], 0)
+    if not coef:
+        return ()
+    return tuple(c / coef[0] for c in coef)
+
+
+class SturmCache:
+    """It stores the Sturm sequences of the normalized polynomials
+         It has the following methods
+                *get(): Returns the Sturm sequence of a polynomial, building it on a miss
+                *info(): Returns the hit and miss counters and the current size
+                *clear(): Removes every entry and resets the counters
+    """
+
+    def __init__(self, maxsize=STURM_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._chains = OrderedDict()
+
+    def get(self, coef, exact=False):
+        """Returns the Sturm sequence of the given polynomial
+
+        Parameters
+        ----------
+        coef : list
+            The list which contains the coefficient values.
+        exact : boolean
+            When set to True the sequence is built over the integers, see sturm_sequence_exact
+
+        Returns
+        -------
+        sturm : list
+            The Sturm sequence of the normalized polynomial, it has the same
+            sign changes as the sequence of the polynomial itself. It is shared
+            between callers and must not be modified.
+        """
+
+        key = ('exact',) + tuple(integer_coefficients(coef)) if exact else normalize(coef)
+        try:
+            chain = self._chains[key]
+        except KeyError:
+            self.misses += 1
+            with METRICS.timer('sturm_construction'):
+                chain = sturm_sequence_exact(key[1:]) if exact else sturm_sequence(key)
+            self._chains[key] = chain
+            # Evicting the least recently used sequence once the cache is full
+            if len(self._chains) > self.maxsize:
+                self._chains.popitem(last=False)
+            return chain
+        self.hits += 1
+        self._chains.move_to_end(key)
+        return chain
+
+    def info(self):
+        """Returns the hit and miss counters and the current size"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._chains), "maxsize": self.maxsize}
+
+    def clear(self):
+        """Removes every entry and resets the counters"""
+        self._chains.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+STURM_CACHE = SturmCache()
+
+
+def cached_sturm_sequence(coef, exact=False):
+    """Looks up the Sturm sequence of a polynomial in the default cache
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    exact : boolean
+        When set to True the sequence is built over the integers
+
+    Returns
+    -------
+    sturm : list
+        The Sturm sequence, see SturmCache.get
+    """
+
+    return STURM_CACHE.get(coef, exact)
+
+
+def sign_changes(sturm, x):
+    """Counts the sign changes of a Sturm sequence evaluated at x
+
+    Parameters
+    ----------
+    sturm : list
+        The Sturm sequence, see sturm_sequence and sturm_sequence_exact
+    x : int, float
+        The point of evaluation, math.inf and -math.inf are allowed
+
+    Returns
+    -------
+    count : int
+        Number of sign changes, terms which evaluate to zero are skipped
+    """
+
+    count = 0
+    previous = 0
+    for poly in sturm:
+        if math.isinf(x):
+            # Only the leading term matters at infinity
+            value = poly[0] if x > 0 or (len(poly) - 1) % 2 == 0 else -poly[0]
+        else:
+            value = _value(poly, x)
+        if value == 0:
+            continue
+        if previous and (value > 0) != (previous > 0):
+            count += 1
+        previous = value
+    return count
+
+
+def count_roots(sturm, a=-math.inf, b=math.inf):
+    """Counts the distinct real roots inside the interval (a, b]
+
+    Parameters
+    ----------
+    sturm : list
+        The Sturm sequence, see sturm_sequence
+    a, b : int, float
+        The ends of the interval, by default the whole real line
+
+    Returns
+    -------
+    count : int
+        The number of distinct real roots according to Sturm's theorem
+    """
+
+    return sign_changes(sturm, a) - sign_changes(sturm, b)
+
+
+def root_bound(coef):
+    """Bound on the absolute value of the roots
+
+    The smaller of Cauchy's bound and Fujiwara's bound is used, Fujiwara's
+    bound is much tighter when the coefficients grow with the degree.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values, the leading one non zero
+
+    Returns
+    -------
+    bound : float
+        Every root satisfies abs(root) <= bound
+    """
+
+    deg = len(coef) - 1
+    if deg < 1:
+        return 0.0
+    ratios = [abs(coef[i] / coef[0]) for i in range(1, deg + 1)]
+    cauchy = 1 + max(ratios)
+    fujiwara = 2 * max([ratios[i - 1] ** (1 / i) for i in range(1, deg)] + [(ratios[-1] / 2) ** (1 / deg)])
+    # The bound is widened slightly so that no root lies exactly on an end of the interval
+    return min(cauchy, fujiwara) * (1 + 1e-6) + 1e-12
+
+
+def isolate_roots(sturm, a, b, max_depth=60):
+    """Bisects the interval (a, b] until each sub-interval holds exactly one root
+
+    Parameters
+    ----------
+    sturm : list
+        The Sturm sequence, see sturm_sequence
+    a, b : int, float
+        The ends of the interval
+    max_depth : int
+        Maximum number of bisections, an interval which still holds more than one
+        root at this depth is a cluster narrower than the float resolution and is
+        returned as it is
+
+    Returns
+    -------
+    intervals : list
+        Sorted list of (a, b) tuples, each holding one root
+    """
+
+    intervals = []
+    stack = [(a, b, sign_changes(sturm, a), sign_changes(sturm, b), 0)]
+    while stack:
+        _a, _b, _va, _vb, _depth = stack.pop()
+        _count = _va - _vb
+        if _count == 0:
+            continue
+        if _count == 1 or _depth >= max_depth:
+            intervals.append((_a, _b))
+            continue
+        _mid = (_a + _b) / 2
+        if _value(sturm[0], _mid) == 0:
+            # A root exactly on the split point would sit on the end of both halves
+            _mid = _a + (_b - _a) * 0.5078125
+        _vmid = sign_changes(sturm, _mid)
+        stack.append((_mid, _b, _vmid, _vb, _depth + 1))
+        stack.append((_a, _mid, _va, _vmid, _depth + 1))
+    return sorted(intervals)
+
+
+def polish_root(coef, a, b, stop_value=1e-12, max_iter=100):
+    """Safeguarded Newton's method inside an isolating interval
+
+    A Newton step which leaves the interval, or a zero derivative, falls back
+    to a bisection step, so the iteration can never diverge.
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    a, b : float
+        The ends of an interval holding exactly one root
+    stop_value : float
+        Stopping criteria is abs(x(n+1)-x(n)) < stop_value
+    max_iter : int
+        Maximum number of iterations
+
+    Returns
+    -------
+    xn : float
+        The root found inside the interval
+    """
+
+    deg = len(coef) - 1
+    dfun_terms = [coef[i] * (deg - i) for i in range(deg)]
+    fa = eval_horner(coef, a)
+    fb = eval_horner(coef, b)
+    if fb == 0:
+        return b
+    # Without a sign change (a root of even multiplicity) there is nothing to bisect on
+    bracket = (fa > 0) != (fb > 0)
+
+    xn = (a + b) / 2
+    for i in range(max_iter):
+        fxn = eval_horner(coef, xn)
+        if fxn == 0:
+            return xn
+        if bracket:
+            if (fxn > 0) == (fa > 0):
+                a, fa = xn, fxn
+            else:
+                b = xn
+        dfxn = eval_horner(dfun_terms, xn)
+        _nxn = xn - fxn / dfxn if dfxn != 0 else None
+        if _nxn is None or not a < _nxn < b:
+            _nxn = (a + b) / 2
+        if abs(xn - _nxn) < stop_value:
+            return _nxn
+        xn = _nxn
+    return xn
+
+
+def real_roots(coef, stop_value=1e-12, max_iter=100, sturm=None, a=None, b=None, exact=False):
+    """Finds every real root of a polynomial, or every root inside (a, b]
+
+    Parameters
+    ----------
+    coef : list
+        The list which contains the coefficient values.
+    stop_value : float
+        Stopping criteria of the polishing Newton's method
+    max_iter : int
+        Maximum number of polishing iterations per root
+    sturm : list
+        A Sturm sequence of the polynomial, by default it is taken from the cache
+    a, b : float
+        The ends of the interval to search, by default the bound on the roots
+    exact : boolean
+        When set to True the roots are isolated with the exact integer Sturm sequence
+
+    Returns
+    -------
+    roots : list
+        Sorted list of the distinct real roots
+    """
+
+    coef = _strip([float(c) for c in coef], 0)
+    if len(coef) < 2:
+        return []
+    if sturm is None:
+        sturm = cached_sturm_sequence(coef, exact)
+    bound = root_bound(coef)
+    a = -bound if a is None else a
+    b = bound if b is None else b
+    return [polish_root(coef, _a, _b, stop_value, max_iter) for _a, _b in isolate_roots(sturm, a, b)]
+
+
+def main():
+    """
+    Main function to find every real root of a polynomial
+    """
+
+    my_parser = argparse.ArgumentParser(allow_abbrev=False)
+    my_parser.add_argument('--file', action='store', type=str, required=True)
+
+    args = my_parser.parse_args()
+
+    with open(args.file) as f:
+        data = json.load(f)
+
+    roots = real_roots(data['coef'], data['stop_value'], data['max_iter'])
+    print(f'The real roots of the equation are : {[round(root, 5) for root in roots]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+""" Makes the modules of the repository and of Q2 importable from the tests """
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'Q2'))
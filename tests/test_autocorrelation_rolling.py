@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+""" Tests of the array mode of autocorrelation_rolling.py against the direct formula """
+
+import numpy as np
+import pytest
+
+from autocorrelation_rolling import rolling_autocorrelation
+
+WINDOW = 64
+LAGS = [1, 5, 20]
+
+
+def _direct(window, k):
+    window = window - window.mean()
+    return np.dot(window[:-k], window[k:]) / np.dot(window, window)
+
+
+def test_quiet_windows_after_loud_samples():
+    rng = np.random.default_rng(0)
+    signal = np.concatenate((rng.standard_normal(100000) * 1e4, rng.standard_normal(100000) * 1e-3))
+    corrs = rolling_autocorrelation(signal, WINDOW, LAGS)
+    for t in range(100000, signal.size - WINDOW + 1, 4999):
+        assert corrs[t] == pytest.approx([_direct(signal[t:t + WINDOW], k) for k in LAGS], abs=1e-6)
+
+
+@pytest.mark.parametrize('size', [3, 4, 7, 65, 130])
+def test_every_window_matches_direct(size):
+    signal = np.random.default_rng(size).standard_normal(size)
+    corrs = rolling_autocorrelation(signal, 3, 1)
+    assert corrs == pytest.approx([_direct(signal[t:t + 3], 1) for t in range(size - 2)])
+
+
+def test_constant_window_is_nan():
+    corrs = rolling_autocorrelation([1, 1, 1, 2, 3, 4], 3, 1)
+    assert np.isnan(corrs[0]) and not np.isnan(corrs[1:]).any()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+""" Tests of the convergence flags of durand_kerner.py """
+
+import numpy as np
+import pytest
+
+import durand_kerner
+
+# f(z) overflows on the starting circle, so every correction is nan or inf
+OVERFLOWING = [1, -1e10] + [0] * 38 + [1]
+
+
+@pytest.mark.parametrize('method', durand_kerner.METHODS)
+def test_overflowing_roots_are_not_converged(method):
+    _, _, converged = durand_kerner.simultaneous_roots(np.array([OVERFLOWING], float), 1e-12, 50, method)
+    assert not converged[0]
+
+
+@pytest.mark.parametrize('method', durand_kerner.METHODS)
+def test_batch_reports_overflowing_problem_as_none(method):
+    problems = [{'coef': OVERFLOWING, 'stop_value': 1e-12, 'max_iter': 50},
+                {'coef': [1, -3, 2], 'stop_value': 1e-12, 'max_iter': 50}]
+    roots = durand_kerner.solve_batch(problems, method)
+    assert roots[0] is None
+    assert sorted(root.real for root in roots[1]) == pytest.approx([1, 2])
+
+
+def test_solve_raises_when_not_converged():
+    with pytest.raises(Exception, match='Exceeded maximum iterations'):
+        durand_kerner.DurandKerner(50, 1e-12, OVERFLOWING, trace='off').solve()
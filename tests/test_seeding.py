@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+""" Tests of the seeds of seeding.py on polynomials whose roots are all 0 """
+
+import numpy as np
+import pytest
+
+import newton_batch
+import root_engines
+import seeding
+from NewtonClassLog import Newton
+from sparse_polynomial import SparsePolynomial
+
+MONOMIALS = [[1, 0, 0], [1, 0, 0, 0], [2, 0, 0, 0, 0], [1, 0, 0, 0, 0, 0], [-3, 0, 0, 0, 0, 0, 0, 0]]
+
+
+def _derivative(coef, x):
+    deg = len(coef) - 1
+    return sum(c * (deg - i) * x ** (deg - i - 1) for i, c in enumerate(coef[:-1]))
+
+
+def test_root_bounds_of_monomials_are_positive():
+    assert np.all(seeding.root_bounds(newton_batch.pack_coefficients(MONOMIALS)) > 0)
+
+
+@pytest.mark.parametrize('coef', MONOMIALS)
+def test_seed_of_monomial_has_non_zero_derivative(coef):
+    x0 = seeding.initial_guess(coef)
+    assert np.isfinite(x0)
+    assert _derivative(coef, x0) != 0
+
+
+def test_newton_batch_solves_monomials():
+    roots, _, converged = newton_batch.newton_batch(newton_batch.pack_coefficients(MONOMIALS), 1e-12, 100)
+    assert converged.all()
+    assert np.all(np.abs(roots) < 1e-6)
+
+
+@pytest.mark.parametrize('coef', MONOMIALS)
+def test_newton_class_solves_monomials(coef):
+    assert abs(Newton(100, 1e-12, coef, trace='off').solve()) < 1e-6
+
+
+@pytest.mark.parametrize('coef', MONOMIALS)
+def test_newton_engine_solves_monomials(coef):
+    roots = root_engines.newton_roots(coef, 1e-12, 100)
+    assert len(roots) == 1 and abs(roots[0]) < 1e-6
+
+
+@pytest.mark.parametrize('n', [2, 3, 4, 7])
+def test_sparse_seed_of_monomial_has_non_zero_derivative(n):
+    poly = SparsePolynomial([[n, 1]])
+    assert poly.derivative(seeding.initial_guess_sparse(poly)) != 0
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+""" Tests of the evaluation counter of solver_metrics.py on every solver path """
+
+import numpy as np
+import pytest
+
+import durand_kerner
+import newton_batch
+from NewtonClassLog import Newton
+from solver_metrics import METRICS
+
+# Odd degree, solved by Polynomial.value_and_derivative rather than _eval_horner
+ODD = [1, 0, -2, 1]
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+def test_odd_degree_newton_counts_evaluations(metrics):
+    Newton(100, 1e-12, ODD, trace='off').solve()
+    assert metrics.counters.get('evaluations', 0) > 0
+
+
+def test_newton_batch_counts_evaluations(metrics):
+    newton_batch.newton_batch(newton_batch.pack_coefficients([ODD]), 1e-12, 100)
+    assert metrics.counters.get('evaluations', 0) > 0
+
+
+def test_durand_kerner_counts_evaluations(metrics):
+    durand_kerner.simultaneous_roots(np.array([ODD], float), 1e-12, 100)
+    assert metrics.counters.get('evaluations', 0) > 0
+
+
+def test_disabled_metrics_count_nothing():
+    METRICS.reset()
+    Newton(100, 1e-12, ODD, trace='off').solve()
+    assert 'evaluations' not in METRICS.counters
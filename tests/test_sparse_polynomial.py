@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+""" Tests of the real root check of sparse polynomials """
+
+import pytest
+
+import newton_argparse
+import newton_batch
+from NewtonClassLog import Newton
+from sparse_polynomial import SparsePolynomial
+
+
+@pytest.mark.parametrize('terms, expected', [
+    ([[2, 1], [1, -1], [0, 1]], False),
+    ([[4, 1], [0, 1]], False),
+    ([[6, 1], [3, -2], [0, 1.01]], False),
+    ([[2, 1], [1, -2], [0, 1]], True),
+    ([[6, 1], [3, -2], [0, 0.99]], True),
+    ([[1000, 1], [1, -3], [0, 1]], True),
+    ([[4, 1], [2, -1]], True),
+])
+def test_has_real_root(terms, expected):
+    assert SparsePolynomial(terms).has_real_root() is expected
+
+
+def test_sparse_newton_reports_no_real_roots():
+    with pytest.raises(Exception, match='no real roots'):
+        Newton(100, 1e-12, terms=[[2, 1], [1, -1], [0, 1]], trace='off').solve()
+
+
+def test_sparse_solve_one_reports_no_real_roots():
+    result = newton_argparse.solve_one({'terms': [[2, 1], [1, -1], [0, 1]], 'stop_value': 1e-12, 'max_iter': 100})
+    assert result == {'error': "The polynomial has no real roots"}
+
+
+def test_batch_rejects_terms():
+    with pytest.raises(Exception, match="'terms'"):
+        newton_batch.solve_batch([{'terms': [[2, 1], [0, -2]], 'stop_value': 1e-12, 'max_iter': 50}])